@@ -0,0 +1,56 @@
+"""
+General description
+-------------------
+This benchmark compares the current formulation of the inertia commitment
+with the tight formulation of tools/formulation.py.
+
+Examples 1 to 4 are solved with both formulations for horizons of one
+day, one week and one month; the input data is repeated to cover the
+longer horizons. The build and solve times, the number of branch-and-bound
+nodes and the objective of every run are printed and written to
+benchmarks/results_formulation.csv. Both formulations have to reach the
+same objective.
+
+Installation requirements
+-------------------------
+You need a working Python 3 environment and OpInMod to run the benchmark.
+Run it from the repository root so that the shared tools can be imported.
+"""
+
+
+# package import
+import os
+import sys
+
+# get current working directory
+path = os.getcwd()
+
+# make the shared tools importable
+sys.path.append(path)
+
+from tools.formulation import benchmark
+
+
+# set up solver
+solver = 'cbc'
+
+# run all examples and horizons with both formulations
+resultsDf = benchmark(
+    numbers=(1, 2, 3, 4),
+    periods=(24, 168, 720),
+    solver=solver
+)
+
+# save and print
+resultsDf.to_csv(
+    path + '/benchmarks/results_formulation.csv',
+    index=False
+)
+
+print(
+    resultsDf.pivot_table(
+        index=['example', 'periods'],
+        columns='formulation',
+        values=['solve', 'nodes', 'objective']
+    )
+)
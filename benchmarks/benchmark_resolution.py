@@ -0,0 +1,46 @@
+"""
+General description
+-------------------
+This benchmark measures the construction time of the model of Example 4
+at hourly, 15 minute and 5 minute resolution.
+
+All resolutions cover one week; the hourly input data is repeated to
+cover the week and resampled with tools/resample.py. The construction
+time should grow with the number of timesteps, i.e. 4x resolution should
+cost close to 4x construction time. The results are printed and written to
+benchmarks/results_resolution.csv.
+
+Installation requirements
+-------------------------
+You need a working Python 3 environment and OpInMod to run the benchmark.
+Run it from the repository root so that the shared tools can be imported.
+"""
+
+
+# package import
+import os
+import sys
+
+# get current working directory
+path = os.getcwd()
+
+# make the shared tools importable
+sys.path.append(path)
+
+from tools.resample import benchmark
+
+
+# construct the model of one week at all resolutions
+resultsDf = benchmark(
+    freqs=('H', '15min', '5min'),
+    hours=168,
+    number=4
+)
+
+# save and print
+resultsDf.to_csv(
+    path + '/benchmarks/results_resolution.csv',
+    index=False
+)
+
+print(resultsDf)
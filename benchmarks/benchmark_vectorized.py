@@ -0,0 +1,53 @@
+"""
+General description
+-------------------
+This benchmark compares the term by term construction of the inertia
+requirement rows with the array based construction of
+tools/vectorized.py.
+
+The synchronous and total system requirement rows of Examples 1 and 4 are
+built both ways for horizons of one week, one month and one year; the
+input data is repeated to cover the longer horizons. The construction
+time and the peak of the memory allocated by python during the
+construction are printed and written to
+benchmarks/results_vectorized.csv.
+
+Installation requirements
+-------------------------
+You need a working Python 3 environment and OpInMod to run the benchmark.
+Run it from the repository root so that the shared tools can be imported.
+"""
+
+
+# package import
+import os
+import sys
+
+# get current working directory
+path = os.getcwd()
+
+# make the shared tools importable
+sys.path.append(path)
+
+from tools.vectorized import benchmark
+
+
+# build the requirement rows of all examples and horizons both ways
+resultsDf = benchmark(
+    numbers=(1, 4),
+    periods=(168, 720, 8760)
+)
+
+# save and print
+resultsDf.to_csv(
+    path + '/benchmarks/results_vectorized.csv',
+    index=False
+)
+
+print(
+    resultsDf.pivot_table(
+        index=['example', 'periods'],
+        columns='construction',
+        values=['build', 'memory']
+    )
+)
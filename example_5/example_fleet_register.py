@@ -0,0 +1,146 @@
+"""
+General description
+-------------------
+This example shows how to build the energy system of the fourth example
+from a fleet register instead of writing one object per unit.
+
+The fleet register (fleet_register.csv) holds one row per unit with the
+parameters of its electricity flow and its inertia provision. The fuel
+buses and fuel sources of the transformers are created from the 'fuel'
+column. All units are added to the energy system with one call. The same
+approach scales to registers with thousands of units.
+
+Data
+----
+* input_data.csv and tranformer specifications from oemof's `simple dispatch example <https://github.com/oemof/oemof-examples/tree/master/oemof_examples/oemof.solph/v0.4.x/simple_dispatch>`_
+* inertia constant per generation type from `Thiesen et al. <https://doi.org/10.3390/en14051255>`_
+
+Installation requirements
+-------------------------
+You need a working Python 3 environment and OpInMod to run the examples.
+Please check `'Installation' <https://github.com/hnnngt/OpInMod/README.rst>`_
+section of the OpInMode documentation. Run the example from the repository
+root so that the shared tools can be imported.
+"""
+
+
+# package import
+import os
+import sys
+import pandas as pd
+
+import opinmod as oim
+
+# get current working directory
+path = os.getcwd()
+
+# make the shared tools importable
+sys.path.append(path)
+
+from tools.fleet import add_fleet
+
+
+# model initialisation
+
+# import data
+dataDf = pd.read_csv(
+    path + '/example_5/input_data.csv'
+)
+
+# set up time series
+timePeriods = len(dataDf)
+timeIdx = pd.date_range(
+    start='20/8/2020',
+    periods=timePeriods,
+    freq='H'
+)
+
+# set up solver
+solver = 'cbc'
+
+# build energy system
+energysystem = oim.EnergySystem(
+    timeindex=timeIdx,
+    minimum_system_synchronous_inertia=1963.6,
+    minimum_system_inertia=3963.3,
+    emulated_inertia_constant=3.5
+)
+
+# electricity
+busElectricity = oim.Bus(
+    label='bus_electricity'
+)
+
+# bus inertia
+busInertia = oim.Bus(
+    label='bus_inertia',
+    balanced=False
+)
+
+energysystem.add(
+    busElectricity,
+    busInertia
+)
+
+# add all units of the fleet register including fuel buses and sources
+units = add_fleet(
+    energysystem,
+    path + '/example_5/fleet_register.csv',
+    busElectricity,
+    busInertia,
+    profiles=dataDf
+)
+
+# build sinks
+sinkDemand = oim.Sink(
+    label='sink_load',
+    inputs={
+        busElectricity: oim.Flow(
+            nominal_value=85*10**6,
+            fix=dataDf['demand_el'].to_list()
+        )
+    }
+)
+
+sinkExcess = oim.Sink(
+    label='sink_excess',
+    inputs={
+        busElectricity: oim.Flow(
+            variable_costs=1
+        )
+    }
+)
+
+# add sinks to energysystem
+energysystem.add(
+    sinkDemand,
+    sinkExcess
+)
+
+# create an optimisation problem
+om = oim.Model(
+    energysystem
+)
+
+# solve the energy model using solver
+om.solve(
+    solver=solver,
+    solve_kwargs={
+        'tee': False
+    }
+)
+
+# extract results
+results = om.results()
+
+# import additional package for easier result access
+from oemof.solph.processing import convert_keys_to_strings
+
+# convert result key to strings
+results = convert_keys_to_strings(results)
+
+# print
+for label in units:
+    if (label, 'bus_electricity') in results:
+        flow = results[(label, 'bus_electricity')]['sequences']['flow']
+        print('Electricity ' + label + ': ' + str(flow.sum()))
@@ -0,0 +1,107 @@
+"""
+Shared fixtures of the tests of the tools.
+
+The tests are run from the repository root, e.g. `python -m pytest`. The
+fixtures describe a system small enough to check every number by hand:
+two hourly timesteps, one hard coal transformer with its fuel source, one
+wind source and an excess sink.
+"""
+
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pytest
+
+import opinmod as oim
+
+# make the shared tools importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def _entry(**sequences):
+    return {
+        'scalars': pd.Series(dtype=float),
+        'sequences': pd.DataFrame(
+            sequences,
+            index=pd.date_range('1/1/2020', periods=2, freq='H')
+        )
+    }
+
+
+@pytest.fixture
+def results():
+    """Results with string keys; the storage entry has scalars only."""
+    return {
+        ('storage_battery', 'None'): {
+            'scalars': pd.Series({'invest': 1.0}),
+            'sequences': pd.DataFrame()
+        },
+        ('source_hard_coal', 'bus_hard_coal'): _entry(flow=[100.0, 200.0]),
+        ('bus_hard_coal', 'transformer_hard_coal'): _entry(
+            flow=[100.0, 200.0]
+        ),
+        ('transformer_hard_coal', 'bus_electricity'): _entry(
+            flow=[40.0, 80.0]
+        ),
+        ('source_wind', 'bus_electricity'): _entry(flow=[60.0, 20.0]),
+        ('bus_electricity', 'sink_excess'): _entry(flow=[0.0, 10.0]),
+        ('transformer_hard_coal', 'bus_inertia'): _entry(
+            apparent_power=[10.0, 10.0], source_inertia=[1.0, 0.0],
+            inertia_constant=[4.0, 4.0]
+        ),
+        ('source_wind', 'bus_inertia'): _entry(
+            apparent_power=[5.0, 5.0], source_inertia=[1.0, 1.0],
+            inertia_constant=[2.0, 2.0]
+        )
+    }
+
+
+@pytest.fixture
+def energysystem():
+    """The energy system of :func:`results`."""
+    es = oim.EnergySystem(
+        timeindex=pd.date_range('1/1/2020', periods=2, freq='H')
+    )
+    busElectricity = oim.Bus(label='bus_electricity')
+    busInertia = oim.Bus(label='bus_inertia', balanced=False)
+    busCoal = oim.Bus(label='bus_hard_coal')
+    es.add(
+        busElectricity,
+        busInertia,
+        busCoal,
+        oim.Source(label='source_hard_coal', outputs={busCoal: oim.Flow()}),
+        oim.Transformer(
+            label='transformer_hard_coal',
+            inputs={busCoal: oim.Flow()},
+            outputs={
+                busElectricity: oim.Flow(nominal_value=80),
+                busInertia: oim.Inertia(
+                    inertia_constant=4, apparent_power=10,
+                    provision_type='synchronous_generator'
+                )
+            },
+            conversion_factors={busElectricity: 0.4}
+        ),
+        oim.Source(
+            label='source_wind',
+            outputs={
+                busElectricity: oim.Flow(nominal_value=60),
+                busInertia: oim.Inertia(
+                    apparent_power=5, provision_type='synthetic_wind'
+                )
+            }
+        ),
+        oim.Sink(label='sink_excess', inputs={busElectricity: oim.Flow()})
+    )
+    return es
+
+
+@pytest.fixture
+def cbc():
+    """The solver of the examples; skips the test if it is missing."""
+    if shutil.which('cbc') is None:
+        pytest.skip('cbc is not installed')
+    return 'cbc'
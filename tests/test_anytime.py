@@ -0,0 +1,46 @@
+import json
+import math
+
+import pytest
+
+from tools.anytime import Anytime, relative_gap, solve_anytime
+from tools.examples import build_model
+
+
+def test_relative_gap():
+    assert relative_gap(100, 90) == pytest.approx(0.1)
+    assert relative_gap(100, 100) == 0
+    assert relative_gap(None, 90) == math.inf
+
+
+@pytest.mark.parametrize('solver', ['glpk', 'cplex_persistent'])
+def test_unsupported_solvers(solver):
+    om = build_model(1, periods=3)
+
+    with pytest.raises(ValueError, match=solver):
+        Anytime(om, solver=solver)
+
+    anytime = Anytime(om)
+    anytime.solver = solver
+    with pytest.raises(ValueError, match=solver):
+        anytime.solve()
+
+
+def test_solve_anytime(cbc, tmp_path):
+    stream = str(tmp_path / 'incumbents.jsonl')
+    entries = []
+    om = build_model(1, periods=3)
+
+    results = solve_anytime(
+        om, budget=30, gap=0, solver=cbc, callback=entries.append,
+        stream=stream
+    )
+
+    with open(stream) as f:
+        streamed = [json.loads(line) for line in f]
+    assert results
+    assert streamed == entries
+    assert len(entries[-1]['inertia_synchronous']) == 3
+    assert entries[-1]['objective'] == pytest.approx(
+        om.objective(), rel=1e-9
+    )
@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+from oemof.solph.processing import convert_keys_to_strings
+from pyomo import environ as po
+
+from tools.artifact import (_column, _read_glpk, read_names, resolve, solve,
+                            write_artifact)
+from tools.examples import build_model
+
+
+MPS = """NAME
+ROWS
+ N obj
+ G r1
+COLUMNS
+    x1 obj 1 r1 1
+    x2 obj 2 r1 1
+RHS
+    rhs r1 1
+ENDATA
+"""
+
+
+@pytest.fixture
+def model():
+    return build_model(4, periods=3)
+
+
+def test_columns_of_time_indexed_variables(model):
+    timesets = [model.TIMESTEPS]
+    i, o = next(iter(model.flows))
+
+    assert _column(model.flow[i, o, 2], timesets) == [
+        'flow', [str(i.label), str(o.label)], 2
+    ]
+    # an integer index of another set is no timestep
+    model.Other = po.Var([i], [0, 1, 2])
+    assert _column(model.Other[i, 1], timesets) == ['Other', None, None]
+    model.Scalar = po.Var([i])
+    assert _column(model.Scalar[i], timesets) == [
+        'Scalar', [str(i.label), None], None
+    ]
+
+
+def test_name_map(model, tmp_path):
+    artifact = str(tmp_path / 'runs' / 'example_4')
+    write_artifact(model, artifact)
+    names = read_names(artifact)
+
+    assert names['sense'] == 'min'
+    assert len(names['timeindex']) == 3
+    assert {c[0] for c in names['columns'].values()} >= {
+        'flow', 'source_inertia'
+    }
+    assert 'system_inertia[1]' in names['rows'].values()
+    # the fixed load is no column
+    assert any(
+        c[:2] == ['flow', ['bus_electricity', 'sink_load']]
+        for c in names['fixed']
+    )
+
+
+def test_resolve_reproduces_the_results(model, tmp_path, cbc):
+    artifact = str(tmp_path / 'example_4')
+    solve(model, artifact=artifact, solver=cbc)
+    expected = convert_keys_to_strings(model.results())
+
+    results, info = resolve(artifact, solver=cbc)
+
+    assert info['status'] == 'Optimal'
+    assert info['objective'] == pytest.approx(model.objective())
+    for key in (('source_wind', 'bus_electricity'),
+                ('transformer_hard_coal', 'bus_inertia')):
+        for column in expected[key]['sequences']:
+            pd.testing.assert_series_equal(
+                results[key]['sequences'][column],
+                expected[key]['sequences'][column],
+                check_freq=False, check_names=False, check_dtype=False
+            )
+
+
+def test_read_glpk_basic_solution(tmp_path):
+    model = tmp_path / 'model.mps'
+    model.write_text(MPS)
+    solution = tmp_path / 'model.sol'
+    # j COL STAT PRIM DUAL; the status must not be read as value
+    solution.write_text(
+        'c Problem: model\n'
+        's bas 1 2 f f 1\n'
+        'i 1 b 1 0\n'
+        'j 1 b 1 0\n'
+        'j 2 l 0 1\n'
+        'e o f\n'
+    )
+
+    status, objective, values = _read_glpk(str(solution), str(model))
+
+    assert (status, objective) == ('Optimal', 1.0)
+    assert values == {'x1': 1.0, 'x2': 0.0}
+
+
+def test_read_glpk_mip_solution(tmp_path):
+    model = tmp_path / 'model.mps'
+    model.write_text(MPS)
+    solution = tmp_path / 'model.sol'
+    solution.write_text('s mip 1 2 o 2\ni 1 1\nj 1 0\nj 2 1\ne o f\n')
+
+    status, objective, values = _read_glpk(str(solution), str(model))
+
+    assert (status, objective) == ('Optimal', 2.0)
+    assert values == {'x1': 0.0, 'x2': 1.0}
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from tools.catalog import Catalog
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    with Catalog(str(tmp_path / 'catalog.db')) as c:
+        c.add_run(
+            'cheap', parameters={'number': np.int64(4), 'solver': 'cbc'},
+            termination='optimal', kpis={'co2': 10.0}
+        )
+        c.add_run(
+            'clean', parameters={'number': 3, 'solver': 'gurobi'},
+            termination='maxTimeLimit', kpis={'co2': 2.0}
+        )
+        yield c
+
+
+def _scenarios(runs):
+    return sorted(runs['scenario'])
+
+
+def test_find_by_numbers(catalog):
+    assert _scenarios(catalog.find(parameters={'number': ('>=', 4)})) == [
+        'cheap'
+    ]
+    assert _scenarios(catalog.find(kpis={'co2': ('<', 5)})) == ['clean']
+    assert _scenarios(catalog.find(status='optimal')) == ['cheap']
+
+
+def test_find_by_text(catalog):
+    runs = catalog.find(parameters={'solver': ('=', 'cbc')})
+
+    assert _scenarios(runs) == ['cheap']
+    assert _scenarios(
+        catalog.find(parameters={'solver': ('!=', 'cbc'), 'number': ('=', 3)})
+    ) == ['clean']
+
+
+def test_find_rejects_unknown_operators(catalog):
+    with pytest.raises(ValueError):
+        catalog.find(kpis={'co2': ('; DROP TABLE runs', 1)})
+
+
+def test_add_run_replaces_and_computes_kpis(catalog, results):
+    runId = catalog.add_run('cheap', results=results)
+
+    kpis = catalog.kpis([runId])
+    assert kpis.loc[runId, 'co2'] == pytest.approx(101.52)
+    assert kpis.loc[runId, 'excess'] == 10
+    assert catalog.find(parameters={'solver': ('=', 'cbc')}).empty
+    assert len(catalog.query('SELECT * FROM runs')) == 2
@@ -0,0 +1,49 @@
+import pytest
+
+from tools.checkpoint import Checkpoint, rolling_horizon, run_points
+from tools.examples import read_profiles
+
+
+def _square(point):
+    if point < 0:
+        raise ValueError('negative point')
+    return {'square': point**2}
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    with Checkpoint(str(tmp_path / 'checkpoint.db')) as c:
+        yield c
+
+
+def test_recorded_points_are_skipped(checkpoint):
+    checkpoint.record('a', {'square': -1})
+
+    payloads = run_points(_square, {'a': 1, 'b': 2}, checkpoint)
+
+    assert payloads == {'a': {'square': -1}, 'b': {'square': 4}}
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+def test_failing_points_do_not_lose_the_others(checkpoint, processes):
+    points = {'a': 1, 'bad': -1, 'b': 2, 'c': 3}
+
+    with pytest.raises(RuntimeError, match='1 of 4 points failed: bad'):
+        run_points(_square, points, checkpoint, processes=processes)
+
+    assert [k for k in points if checkpoint.done(k)] == ['a', 'b', 'c']
+    assert checkpoint.result('c') == {'square': 9}
+
+
+def test_rolling_horizon_resumes(checkpoint, cbc):
+    profiles = read_profiles(4, periods=4)
+
+    windows = rolling_horizon(checkpoint, 'run', profiles, 2, solver=cbc)
+    last, levels = checkpoint.last_window('run')
+
+    assert sorted(windows) == [0, 1]
+    assert last == 1
+    assert 0 <= levels['storage_battery'] <= 1
+    assert rolling_horizon(
+        checkpoint, 'run', profiles, 2, solver=cbc
+    ) == windows
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from tools.compact import CompactSequences, compact, expand, nbytes
+
+
+def _results():
+    index = pd.date_range('1/1/2020', periods=10, freq='H')
+    return {
+        ('transformer_oil', 'bus_inertia'): {
+            'scalars': pd.Series(dtype=float),
+            'sequences': pd.DataFrame({
+                'apparent_power': np.full(10, 5e6),
+                'source_inertia': [1.0, 0, 0, 1, 1, 1, 0, 1, 0, 1],
+                'inertia_constant': np.full(10, 3.5)
+            }, index=index)
+        },
+        ('transformer_oil', 'bus_electricity'): {
+            'scalars': pd.Series(dtype=float),
+            'sequences': pd.DataFrame(
+                {'flow': np.linspace(0, 1e6, 10) + 1 / 3}, index=index.copy()
+            )
+        }
+    }
+
+
+def test_compact_storage():
+    results = compact(_results())
+    inertia = results[('transformer_oil', 'bus_inertia')]['sequences']
+    flow = results[('transformer_oil', 'bus_electricity')]['sequences']
+
+    assert isinstance(inertia, CompactSequences)
+    assert inertia.constants == {'apparent_power': 5e6,
+                                 'inertia_constant': 3.5}
+    assert list(inertia.bits) == ['source_inertia']
+    assert list(flow.arrays) == ['flow']
+    # equal indices are shared
+    assert inertia.index is flow.index
+
+
+def test_round_trip():
+    original = _results()
+    restored = expand(compact(original))
+
+    for key, entry in original.items():
+        pd.testing.assert_frame_equal(
+            restored[key]['sequences'], entry['sequences'], check_freq=False
+        )
+
+
+def test_accessors():
+    results = compact(_results())
+    sequences = results[('transformer_oil', 'bus_inertia')]['sequences']
+
+    assert sequences['source_inertia'].tolist() == [
+        1, 0, 0, 1, 1, 1, 0, 1, 0, 1
+    ]
+    assert 'apparent_power' in sequences
+    assert list(sequences) == [
+        'apparent_power', 'source_inertia', 'inertia_constant'
+    ]
+    assert len(sequences) == 10
+
+
+def test_float32_and_size():
+    original = _results()
+    results = compact(original, float32=True)
+    flow = results[('transformer_oil', 'bus_electricity')]['sequences']
+
+    assert flow.arrays['flow'].dtype == np.float32
+    np.testing.assert_allclose(
+        flow['flow'].to_numpy(),
+        original[('transformer_oil', 'bus_electricity')]['sequences'][
+            'flow'].to_numpy(),
+        rtol=1e-7
+    )
+    assert nbytes(results) < nbytes(original)
@@ -0,0 +1,31 @@
+import pytest
+
+from tools.decomposition import Decomposition, add_boundary
+from tools.examples import build_model, read_profiles
+
+
+def test_add_boundary():
+    om = add_boundary(build_model(4, periods=3), ('storage_battery',))
+
+    assert om.price_start['storage_battery'].value == 0
+    assert not om.fix_end['storage_battery'].active
+    assert not om.objective.active
+    assert om.decomposition_objective.active
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+def test_decomposition(cbc, processes):
+    decomposition = Decomposition(
+        read_profiles(4, periods=6), 3, solver=cbc, processes=processes
+    )
+
+    results = decomposition.solve(iterations=5)
+
+    assert decomposition.history
+    assert decomposition.lower_bound <= decomposition.upper_bound * (
+        1 + 1e-6
+    )
+    content = results[('storage_battery', 'None')]['sequences'][
+        'storage_content'
+    ]
+    assert len(content) == 6
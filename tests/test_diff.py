@@ -0,0 +1,61 @@
+import copy
+
+import pytest
+
+from tools.diff import Comparison, compare
+
+
+@pytest.fixture
+def other(results):
+    """The results with more coal output and the coal unit committed in
+    both timesteps."""
+    other = copy.deepcopy(results)
+    other[('transformer_hard_coal', 'bus_electricity')]['sequences'][
+        'flow'] = [50.0, 80.0]
+    other[('transformer_hard_coal', 'bus_inertia')]['sequences'][
+        'source_inertia'] = [1.0, 1.0]
+    del other[('bus_electricity', 'sink_excess')]
+    return other
+
+
+def test_delta_table(results, other):
+    summary, table = compare(results, other)
+
+    coal = table.loc[('transformer_hard_coal', 'bus_electricity')]
+    assert coal['energy_delta'] == 10
+    assert coal['flow_max_abs_delta'] == 10
+    inertia = table.loc[('transformer_hard_coal', 'bus_inertia')]
+    assert inertia['committed_base'] == 1
+    assert inertia['committed_other'] == 2
+    assert inertia['commitment_changes'] == 1
+    excess = table.loc[('bus_electricity', 'sink_excess')]
+    assert excess['present_base'] and not excess['present_other']
+    assert ('source_wind', 'bus_electricity') not in table.index
+
+    assert summary['flows_removed'] == 1
+    assert summary['flows_added'] == 0
+    assert summary['commitment_changes'] == 1
+    assert summary['energy_abs_delta'] == 20
+    assert summary['co2_delta'] == 0
+
+
+def test_inertia_deltas(results, other, energysystem):
+    comparison = Comparison(
+        {'base': results, 'other': other},
+        {'base': energysystem, 'other': energysystem}
+    )
+    deltas = comparison.deltas('base', 'other')
+
+    assert deltas['kinetic_energy_synchronous'].tolist() == [0, 40]
+    assert deltas['committed_units'].tolist() == [0, 1]
+
+
+def test_common_index(results, other):
+    for entry in other.values():
+        if not entry['sequences'].empty:
+            entry['sequences'] = entry['sequences'].iloc[1:]
+
+    comparison = Comparison({'base': results, 'other': other})
+
+    assert len(comparison.index) == 1
+    assert comparison.summary()['energy_abs_delta'].iloc[0] == 10
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+import opinmod as oim
+
+from tools.fleet import add_fleet, read_fleet
+
+
+REGISTER = pd.DataFrame({
+    'label': ['transformer_hard_coal', 'source_wind'],
+    'component': [' Transformer', 'source'],
+    'fuel': ['hard_coal', None],
+    'nominal_value': [2, 3],
+    'conversion_factor': [0.4, None],
+    'inertia_constant': [4, None],
+    'apparent_power': [2, 3],
+    'provision_type': ['synchronous_generator', 'synthetic_wind'],
+    'profile': [None, 'wind']
+})
+
+
+def _electricity_nominal_values(fleet):
+    es = oim.EnergySystem(
+        timeindex=pd.date_range('1/1/2020', periods=2, freq='H')
+    )
+    busElectricity = oim.Bus(label='bus_electricity')
+    busInertia = oim.Bus(label='bus_inertia', balanced=False)
+    es.add(busElectricity, busInertia)
+    nodes = add_fleet(
+        es, fleet, busElectricity, busInertia,
+        profiles=pd.DataFrame({'wind': [0.5, 1.0]})
+    )
+    return {
+        label: node.outputs[busElectricity].nominal_value
+        for label, node in nodes.items()
+        if busElectricity in getattr(node, 'outputs', {})
+    }
+
+
+def test_read_fleet_scales_and_normalizes():
+    fleet = read_fleet(REGISTER)
+
+    assert list(fleet.index) == ['transformer_hard_coal', 'source_wind']
+    assert fleet.loc['transformer_hard_coal', 'component'] == 'transformer'
+    assert fleet['nominal_value'].tolist() == [2e6, 3e6]
+    assert fleet['apparent_power'].tolist() == [2e6, 3e6]
+    assert fleet.loc['transformer_hard_coal', 'inertia_constant'] == 4
+    assert fleet.attrs['validated']
+
+
+def test_read_fleet_custom_scale():
+    assert read_fleet(REGISTER, scale=1)['nominal_value'].tolist() == [2, 3]
+
+
+def test_read_fleet_rejects_invalid_rows():
+    register = REGISTER.copy()
+    register.loc[1, 'label'] = 'transformer_hard_coal'
+    register.loc[0, 'conversion_factor'] = 1.5
+
+    with pytest.raises(ValueError) as error:
+        read_fleet(register)
+    assert 'duplicated label: transformer_hard_coal' in str(error.value)
+    assert 'conversion_factor outside (0, 1]' in str(error.value)
+
+
+@pytest.mark.parametrize('fleet', [
+    REGISTER,
+    read_fleet(REGISTER),
+    read_fleet(REGISTER).loc[['transformer_hard_coal']]
+])
+def test_add_fleet_scales_once(fleet):
+    values = _electricity_nominal_values(fleet)
+
+    assert values['transformer_hard_coal'] == 2e6
+    if 'source_wind' in values:
+        assert values['source_wind'] == 3e6
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from pyomo import environ as po
+
+from tools.examples import build_model
+from tools.formulation import build_tight_model, cardinality, minimal_covers
+
+
+def test_minimal_covers():
+    # {5, 4}, {5, 3} and {4, 3} exceed 6, and are no covers without their
+    # smallest element; {5, 1} does not exceed 6, {4, 3, 1} is not minimal
+    coefficients = np.array([5.0, 4.0, 3.0, 1.0])
+
+    assert minimal_covers(coefficients, 6) == [(0, 1), (0, 2), (1, 2)]
+    assert minimal_covers(coefficients, 6, max_covers=2) == [(0, 1), (0, 2)]
+    assert minimal_covers(coefficients, 4.5) == [(0,), (1, 2), (1, 3)]
+    assert minimal_covers(coefficients, 13) == []
+
+
+def test_minimal_covers_order_and_zeros():
+    # indices are listed by decreasing coefficient, zeros never enter
+    coefficients = np.array([0.0, 3.0, 0.0, 4.0])
+
+    assert minimal_covers(coefficients, 3.5) == [(3,)]
+    assert minimal_covers(coefficients, 4.5) == [(3, 1)]
+
+
+def test_minimal_covers_max_size():
+    coefficients = np.ones(6)
+
+    assert minimal_covers(coefficients, 3.5, max_size=3) == []
+    assert len(minimal_covers(coefficients, 3.5, max_covers=100)) == 15
+
+
+def test_cardinality():
+    coefficients = np.array([5.0, 4.0, 3.0, 1.0])
+
+    assert cardinality(coefficients, 5) == 1
+    assert cardinality(coefficients, 8) == 2
+    assert cardinality(coefficients, 13) == 4
+    assert cardinality(coefficients, 14) is None
+
+
+def test_tight_model_keeps_the_optimum(cbc):
+    om = build_model(4, periods=3)
+    tight = build_tight_model(4, periods=3)
+
+    om.solve(solver=cbc)
+    tight.solve(solver=cbc)
+
+    assert len(tight.TightInertia.cuts) > 0
+    assert not hasattr(tight.TightInertia, 'LINKS')
+    assert po.value(tight.objective) == pytest.approx(
+        po.value(om.objective), rel=1e-6
+    )
@@ -0,0 +1,70 @@
+import pytest
+from pyomo import environ as po
+from pyomo.repn import generate_standard_repn
+
+from tools.examples import build_model
+from tools.incremental import extend_example
+
+
+def _coefficients(row):
+    repn = generate_standard_repn(row.body)
+    return {v.name: c for c, v in zip(repn.linear_coefs, repn.linear_vars)}
+
+
+def test_extend_example_reaches_the_full_optimum(cbc):
+    full = build_model(4, periods=3)
+    full.solve(solver=cbc)
+    om = build_model(3, periods=3)
+    om.solve(solver=cbc)
+
+    extension = extend_example(om, 4)
+    om.solve(solver=cbc)
+
+    assert extension.local_name == 'Extension_1'
+    assert 'storage_battery' in {str(n.label) for n in om.es.nodes}
+    assert om.objective() == pytest.approx(full.objective())
+
+
+def test_new_inertia_enters_the_system_rows():
+    om = build_model(3, periods=3)
+    extend_example(om, 4)
+    battery = 'Extension_1.source_inertia[storage_battery,bus_inertia,{0}]'
+
+    for t in om.TIMESTEPS:
+        # the battery provides synthetic inertia only
+        assert battery.format(t) in _coefficients(om.system_inertia[t])
+        assert battery.format(t) not in _coefficients(
+            om.system_synchronous_inertia[t]
+        )
+
+
+def test_new_inertia_follows_the_row_scale():
+    # the total requirement restated as scaled upper bound
+    om = build_model(3, periods=3)
+    om.system_inertia.deactivate()
+    om.Scaled = po.Block()
+    om.Scaled.system_inertia = po.Constraint(
+        om.TIMESTEPS, rule=lambda b, t: (
+            -10**-6 * om.system_inertia[t].body
+            <= -10**-6 * om.system_inertia[t].lower
+        )
+    )
+    unscaled = build_model(3, periods=3)
+    extend_example(unscaled, 4)
+    extend_example(om, 4)
+
+    battery = 'Extension_1.source_inertia[storage_battery,bus_inertia,1]'
+    assert _coefficients(om.Scaled.system_inertia[1])[battery] == (
+        pytest.approx(
+            -10**-6 * _coefficients(unscaled.system_inertia[1])[battery]
+        )
+    )
+
+
+def test_missing_requirement_rows_raise():
+    om = build_model(3, periods=3)
+    om.system_inertia.deactivate()
+
+    with pytest.raises(RuntimeError, match='system_inertia'):
+        extend_example(om, 4)
+    assert not hasattr(om, 'Extension_1')
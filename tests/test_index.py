@@ -0,0 +1,47 @@
+import opinmod as oim
+
+from tools.index import ComponentIndex, component_index
+
+
+def test_select(energysystem):
+    index = ComponentIndex(energysystem)
+
+    assert index.select(provision_types='synchronous') == (
+        ('transformer_hard_coal', 'bus_inertia'),
+    )
+    assert index.select(provision_types='synthetic_wind') == (
+        ('source_wind', 'bus_inertia'),
+    )
+    assert index.select(bus='bus_electricity', prefix='transformer') == (
+        ('transformer_hard_coal', 'bus_electricity'),
+    )
+    assert index.select(labels='sink_excess') == (
+        ('bus_electricity', 'sink_excess'),
+    )
+    assert index.nodes(provision_types='synthetic') == ('source_wind',)
+    assert index.provision_types == {
+        'transformer_hard_coal': 'synchronous_generator',
+        'source_wind': 'synthetic_wind'
+    }
+
+
+def test_aggregations(results, energysystem):
+    index = ComponentIndex(energysystem)
+
+    assert index.aggregate(
+        results, bus='bus_electricity', prefix='source'
+    ).tolist() == [60, 20]
+    assert index.kinetic_energy(results, 'synchronous').tolist() == [40, 0]
+    assert index.kinetic_energy(results, 'synthetic').tolist() == [10, 10]
+    frame = index.frame(results, prefix='transformer', bus='bus_electricity')
+    assert frame[('transformer_hard_coal', 'bus_electricity')].tolist() == [
+        40, 80
+    ]
+
+
+def test_component_index_is_cached(energysystem):
+    index = component_index(energysystem)
+    assert component_index(energysystem) is index
+
+    energysystem.add(oim.Bus(label='bus_oil'))
+    assert component_index(energysystem) is not index
@@ -0,0 +1,83 @@
+import pytest
+
+from tools.inertia_search import InertiaSearch
+
+
+class _Model:
+    """Requirements up to `limit` are feasible at costs value**2."""
+
+    def __init__(self, value, limit):
+        self.feasible = value <= limit
+        self.objective = value**2 if self.feasible else None
+
+    def solve(self, **kwargs):
+        termination = 'optimal' if self.feasible else 'infeasible'
+        return {'Solver': [{'Termination condition': termination}]}
+
+
+def _builder(minimum_system_synchronous_inertia, limit=10):
+    return _Model(minimum_system_synchronous_inertia, limit)
+
+
+def test_boundary():
+    search = InertiaSearch(builder=_builder)
+
+    end = search.boundary(0, 20, tolerance=1)
+
+    assert 9 <= end <= 10
+    assert search.feasible(end - 5)
+    assert search.feasible(15) is False
+
+
+def test_cached_certificates_are_reused(tmp_path):
+    cache = str(tmp_path / 'certificates.json')
+    InertiaSearch(builder=_builder, cache=cache).boundary(0, 20)
+
+    search = InertiaSearch(builder=_builder, cache=cache)
+    search.boundary(0, 20)
+
+    assert search.solves == 0
+    assert InertiaSearch(
+        builder=_builder, builder_kwargs={'limit': 5}, cache=cache
+    ).certificates == {}
+
+
+def test_cost_curve():
+    curve = InertiaSearch(builder=_builder).cost_curve(0, 10, points=6)
+
+    assert len(curve) == 6
+    assert curve.index.is_monotonic_increasing
+    assert curve.index[-1] == 10
+    assert curve.to_numpy() == pytest.approx(curve.index.to_numpy()**2)
+
+
+def test_cost_curve_with_feasible_low_end_only():
+    search = InertiaSearch(builder=_builder, builder_kwargs={'limit': 0})
+
+    curve = search.cost_curve(0, 10)
+
+    assert curve.to_dict() == {0: 0}
+
+
+@pytest.mark.parametrize('points, requirements', [
+    (1, [0]), (2, [0, 10]), (3, [0, 5, 10])
+])
+def test_cost_curve_few_points(points, requirements):
+    curve = InertiaSearch(builder=_builder).cost_curve(0, 10, points=points)
+
+    assert curve.index.tolist() == requirements
+
+
+def test_cost_curve_infeasible():
+    search = InertiaSearch(builder=_builder, builder_kwargs={'limit': -1})
+
+    assert search.cost_curve(0, 10).empty
+
+
+def test_example_without_requirement(cbc):
+    search = InertiaSearch(
+        builder_kwargs={'number': 1, 'periods': 3}, solver=cbc
+    )
+
+    assert search.feasible(0)
+    assert search.costs(0) > 0
@@ -0,0 +1,96 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import kpi
+
+
+def _moment(energy, frequency=50):
+    """Moment of inertia with the given kinetic energy [Ws]."""
+    return energy / (0.5 * (2 * math.pi * frequency)**2)
+
+
+@pytest.fixture
+def requirements(energysystem):
+    energysystem.minimum_system_synchronous_inertia = _moment(20)
+    energysystem.minimum_system_inertia = _moment(30)
+    return energysystem
+
+
+def test_index_skips_entries_without_sequences(results):
+    index = kpi._index(results)
+
+    assert list(index) == list(
+        pd.date_range('1/1/2020', periods=2, freq='H')
+    )
+
+
+def test_timestep_hours():
+    index = pd.DatetimeIndex(['2020-01-01 00:00', '2020-01-01 00:15',
+                              '2020-01-01 01:15'])
+
+    assert kpi.timestep_hours(index).tolist() == [0.25, 1.0, 1.0]
+    assert kpi.timestep_hours(
+        pd.date_range('1/1/2020', periods=3, freq='15min')
+    ).tolist() == [0.25, 0.25, 0.25]
+
+
+def test_emissions(results):
+    co2 = kpi.emissions(results)
+
+    assert co2.to_numpy() == pytest.approx([33.84, 67.68])
+
+
+def test_energy_and_excess(results):
+    energy = kpi.energy(results)
+
+    assert energy['transformer_hard_coal'].tolist() == [40, 80]
+    assert energy['source_wind'].tolist() == [60, 20]
+    assert kpi.excess_energy(results).tolist() == [0, 10]
+
+
+def test_inertia(results, requirements):
+    ine = kpi.inertia(results, requirements)
+
+    assert ine['kinetic_energy_synchronous'].tolist() == [40, 0]
+    assert ine['kinetic_energy_synthetic'].tolist() == [10, 10]
+    assert ine['apparent_power'].tolist() == [15, 5]
+    assert ine['shortfall_synchronous'].to_numpy() == pytest.approx([0, 20])
+    assert ine['shortfall_system'].to_numpy() == pytest.approx([0, 20])
+
+
+def test_inertia_statistics(results, requirements):
+    stats = kpi.inertia_statistics(results, requirements)
+
+    assert stats['margin_synchronous_min'] == pytest.approx(-1)
+    assert stats['margin_system_min'] == pytest.approx(-2 / 3)
+    assert stats['synthetic_share_max'] == pytest.approx(1 / 3)
+
+
+def test_inertia_statistics_without_requirements(results, energysystem):
+    energysystem.minimum_system_synchronous_inertia = 0
+    energysystem.minimum_system_inertia = None
+
+    stats = kpi.inertia_statistics(results, energysystem)
+
+    assert stats.isna().all()
+
+
+def test_kpis_per_hour(results):
+    df = kpi.kpis(results, period='hour')
+
+    assert df['excess'].tolist() == [0, 10]
+    assert df['co2'].to_numpy() == pytest.approx([33.84, 67.68])
+
+
+def test_summary(results, requirements):
+    totals = kpi.summary(results, requirements)
+
+    assert totals['energy_transformer_hard_coal'] == 120
+    assert totals['excess'] == 10
+    assert totals['co2'] == pytest.approx(101.52)
+    assert totals['shortfall_steps_synchronous'] == 1
+    assert totals['shortfall_max_system'] == pytest.approx(20)
+    assert np.isclose(totals['energy_source_wind'], 80)
@@ -0,0 +1,85 @@
+import os
+import stat
+
+from tools.metrics import Metrics
+
+
+def test_text():
+    metrics = Metrics(labels={'example': 4}, buckets=(1, 10))
+    metrics.inc('solves_total', termination='optimal')
+    metrics.inc('solves_total', termination='optimal')
+    metrics.set('mip_gap', 0.25)
+    for seconds in (0.5, 5, 50):
+        metrics.observe('solve_seconds', seconds)
+
+    lines = metrics.text().splitlines()
+    assert '# TYPE opinmod_solves_total counter' in lines
+    assert (
+        'opinmod_solves_total{example="4",termination="optimal"} 2.0'
+        in lines
+    )
+    assert 'opinmod_mip_gap{example="4"} 0.25' in lines
+    assert '# TYPE opinmod_solve_seconds histogram' in lines
+    histogram = [
+        line for line in lines if line.startswith('opinmod_solve_seconds')
+    ]
+    assert histogram == [
+        'opinmod_solve_seconds_bucket{example="4",le="1"} 1.0',
+        'opinmod_solve_seconds_bucket{example="4",le="10"} 2.0',
+        'opinmod_solve_seconds_bucket{example="4",le="+Inf"} 3.0',
+        'opinmod_solve_seconds_sum{example="4"} 55.5',
+        'opinmod_solve_seconds_count{example="4"} 3.0'
+    ]
+
+
+def test_non_finite_values():
+    metrics = Metrics()
+    metrics.set('up', float('inf'))
+    metrics.set('down', float('-inf'))
+    metrics.set('unknown', float('nan'))
+
+    lines = metrics.text().splitlines()
+    assert 'opinmod_up +Inf' in lines
+    assert 'opinmod_down -Inf' in lines
+    assert 'opinmod_unknown NaN' in lines
+
+
+def test_label_escaping():
+    metrics = Metrics()
+    metrics.set('gauge', 1, scenario='a "b"\\c\nd')
+
+    assert 'opinmod_gauge{scenario="a \\"b\\"\\\\c\\nd"} 1.0' in (
+        metrics.text().splitlines()
+    )
+
+
+def test_write(tmp_path):
+    path = str(tmp_path / 'opinmod.prom')
+    metrics = Metrics(path=path)
+    metrics.record_cache('inertia_search', hits=3, lookups=4)
+    metrics.write()
+
+    with open(path) as f:
+        text = f.read()
+    assert text == metrics.text()
+    assert 'opinmod_cache_hits{cache="inertia_search"} 3.0' in text
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert os.listdir(str(tmp_path)) == ['opinmod.prom']
+
+
+def test_timed_records_the_solve(cbc):
+    from tools.examples import build_model
+
+    om = build_model(1, periods=3)
+    metrics = Metrics(labels={'example': 1})
+    with metrics.timed(om, scenario='base') as run:
+        run['solver_results'] = om.solve(solver=cbc)
+
+    labels = (('example', '1'), ('scenario', 'base'))
+    assert metrics.counters[
+        'opinmod_solves_total', labels + (('termination', 'optimal'),)
+    ] == 1
+    assert metrics.gauges[
+        'opinmod_model_variables', labels
+    ] == om.nvariables()
+    assert metrics.histograms['opinmod_solve_seconds', labels][2] == 1
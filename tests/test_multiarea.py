@@ -0,0 +1,59 @@
+import pytest
+from oemof.solph.processing import convert_keys_to_strings
+
+import opinmod as oim
+
+from tools import kpi, multiarea
+from tools.examples import EXAMPLE_UNITS, REGISTER, read_profiles
+from tools.fleet import read_fleet
+
+
+@pytest.fixture
+def areas():
+    fleet = read_fleet(REGISTER)
+    fleet = fleet[fleet['label'].isin(EXAMPLE_UNITS[1])]
+    profiles = read_profiles(1, periods=3)
+    return {
+        'north': {'fleet': fleet, 'profiles': profiles},
+        'south': {'fleet': fleet, 'profiles': profiles, 'demand': 10**6}
+    }
+
+
+def test_area_fleet():
+    fleet = multiarea.area_fleet(REGISTER, 'north')
+
+    assert 'transformer_hard_coal_north' in fleet.index
+    assert 'hard_coal_north' in set(fleet['fuel'])
+
+
+def test_fuel_with_area_suffix():
+    assert kpi.fuel(
+        'source_hard_coal_north', 'bus_hard_coal_north'
+    ) == 'hard_coal'
+    assert kpi.fuel('source_hard_coal_north', 'bus_hard_coal') is None
+
+
+def test_build_multiarea(areas):
+    es = multiarea.build_multiarea(areas, links=[('north', 'south', 10)])
+    labels = {str(n.label) for n in es.nodes}
+
+    assert {'bus_inertia_north', 'bus_inertia_south', 'link_north_south',
+            'link_south_north', 'source_hard_coal_south'} <= labels
+    assert len(es.timeindex) == 3
+    assert es.minimum_system_inertia == 0
+
+
+def test_area_inertia(areas, cbc):
+    es = multiarea.build_multiarea(areas, links=[('north', 'south', 10**7)])
+    om = oim.Model(es)
+    block = multiarea.add_area_inertia(om, areas)
+
+    om.solve(solver=cbc)
+    results = convert_keys_to_strings(om.results())
+    frames = multiarea.area_inertia(results, es, areas)
+
+    assert len(block.synchronous) == len(block.total) == 6
+    for frame in frames.values():
+        assert (frame['shortfall_synchronous'] == 0).all()
+        assert (frame['shortfall_system'] == 0).all()
+        assert (frame['kinetic_energy_synchronous'] > 0).all()
@@ -0,0 +1,45 @@
+import pytest
+from pyomo import environ as po
+
+from tools import pareto
+from tools.examples import build_model
+
+
+def _result(termination):
+    return {'Solver': [{'Status': 'ok', 'Termination condition': termination}]}
+
+
+def test_emission_range(cbc):
+    om = pareto.add_emission_cap(build_model(1, periods=3))
+
+    maxCo2, minCo2 = pareto.emission_range(om, solver=cbc)
+
+    assert maxCo2 >= minCo2 > 0
+    assert om.objective.active
+    assert not hasattr(om, 'co2_objective')
+
+
+def test_emission_range_requires_optimal_solves(monkeypatch):
+    om = pareto.add_emission_cap(build_model(1, periods=3))
+    for v in om.component_data_objects(po.Var):
+        v.value = 0
+    terminations = iter(['optimal', 'maxTimeLimit'])
+    monkeypatch.setattr(
+        pareto, 'solve', lambda om, **kwargs: _result(next(terminations))
+    )
+
+    with pytest.raises(RuntimeError, match='maxTimeLimit'):
+        pareto.emission_range(om)
+    assert om.objective.active
+    assert not hasattr(om, 'co2_objective')
+
+
+def test_pareto_front(cbc):
+    front = pareto.pareto_front(
+        points=3, builder_kwargs={'number': 1, 'periods': 3}, solver=cbc
+    )
+
+    assert (front['termination'] == 'optimal').all()
+    assert front['cap'].is_monotonic_decreasing
+    assert (front['co2'] <= front['cap'] * (1 + 1e-6)).all()
+    assert front['costs'].is_monotonic_increasing
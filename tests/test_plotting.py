@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import plotting
+
+
+def _frame(n=10000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            'source_wind': rng.random(n),
+            'transformer_hard_coal': rng.random(n),
+            'sink_load': rng.random(n) + 1
+        },
+        index=pd.date_range('1/1/2020', periods=n, freq='H')
+    )
+
+
+def test_lttb():
+    y = np.sin(np.linspace(0, 20, 1000))
+    indices = plotting.lttb(np.arange(1000), y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert (np.diff(indices) > 0).all()
+    assert plotting.lttb(np.arange(10), y[:10], 100).tolist() == list(
+        range(10)
+    )
+
+
+def test_minmax_keeps_the_extremes():
+    y = np.zeros(1000)
+    y[123], y[456] = 5, -5
+    indices = plotting.minmax(y, 10)
+
+    assert {0, 123, 456, 999} <= set(indices)
+    assert len(indices) <= 4 * 10
+    assert plotting.minmax(y[:30], 10).tolist() == list(range(30))
+
+
+def test_downsample():
+    frame = _frame()
+    stacked = ['source_wind', 'transformer_hard_coal']
+    shown = plotting.downsample(frame, stacked=stacked, points=400)
+
+    # the indices of the line and of both cumulated tops are united
+    assert len(shown) <= 3 * 400
+    tops = frame[stacked].sum(axis=1)
+    assert tops.idxmax() in shown.index and tops.idxmin() in shown.index
+    assert frame['sink_load'].idxmax() in shown.index
+    assert len(plotting.downsample(frame.iloc[:100], points=400)) == 100
+    assert len(plotting.downsample(frame, points=400, method='lttb')) <= (
+        3 * 400
+    )
+    with pytest.raises(ValueError, match='Unknown downsampling'):
+        plotting.downsample(frame, points=400, method='mean')
+
+
+def test_flow_frame(results):
+    frame = plotting.flow_frame(results)
+
+    assert list(frame.columns) == [
+        'transformer_hard_coal', 'source_wind', 'sink_excess'
+    ]
+    assert frame['source_wind'].tolist() == [60.0, 20.0]
+
+
+def test_figure_rasterizes_long_frames():
+    fig = plotting.plot_flows(_frame(), points=400)
+    ax = fig.axes[0]
+
+    assert [t.get_text() for t in ax.get_legend().get_texts()] == [
+        'Hard Coal', 'Wind', 'Load'
+    ]
+    assert all(c.get_rasterized() for c in ax.collections)
+    assert len(ax.lines[0].get_xdata()) <= 3 * 400
+
+    short = plotting.plot_flows(_frame(48)).axes[0]
+    assert not any(c.get_rasterized() for c in short.collections)
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+def test_render_scenarios(tmp_path, processes):
+    frame = _frame(48)
+    paths = plotting.render_scenarios(
+        {'a': (frame, None), 'b': (frame, None)}, str(tmp_path),
+        processes=processes, fmt='png', dpi=50
+    )
+
+    assert [os.path.basename(p) for p in paths] == [
+        'flow_a.png', 'flow_b.png'
+    ]
+    assert all(os.path.getsize(p) > 0 for p in paths)
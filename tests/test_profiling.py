@@ -0,0 +1,102 @@
+import gc
+import json
+
+from pyomo import environ as po
+
+from tools.profiling import Profiler, model_size
+
+
+def _model():
+    m = po.ConcreteModel()
+    m.x = po.Var(within=po.NonNegativeReals)
+    m.y = po.Var(within=po.Binary)
+    m.c = po.Constraint(expr=m.x + 2 * m.y >= 1)
+    m.d = po.Constraint(expr=m.x <= 5)
+    return m
+
+
+def _without_gc(function):
+    """Run a function with the garbage of earlier tests collected and the
+    collector paused, so only its own blocks are counted."""
+    gc.collect()
+    gc.disable()
+    try:
+        return function()
+    finally:
+        gc.enable()
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+
+    assert profiler.phase('a') is profiler.phase('b')
+    with profiler.phase('a'):
+        pass
+    assert profiler.phases == []
+    assert profiler.measure_model(_model()) is None
+
+
+def test_nested_phases():
+    profiler = Profiler()
+
+    def _run():
+        with profiler.phase('outer'):
+            with profiler.phase('inner'):
+                return [[n] for n in range(1000)]
+
+    _without_gc(_run)
+
+    inner, outer = profiler.phases
+    assert (inner['name'], inner['parent']) == ('inner', 'outer')
+    assert (outer['name'], outer['parent']) == ('outer', None)
+    assert inner['net_allocated_blocks'] >= 1000
+    assert outer['seconds'] >= inner['seconds']
+    if not outer['peak_rss_since_start']:
+        assert outer['peak_rss'] >= inner['peak_rss']
+
+
+def test_net_allocated_blocks_of_a_freeing_phase():
+    blocks = [[n] for n in range(1000)]
+    profiler = Profiler()
+
+    def _run():
+        with profiler.phase('free'):
+            blocks.clear()
+
+    _without_gc(_run)
+
+    assert profiler.phases[0]['net_allocated_blocks'] < 0
+
+
+def test_model_size():
+    assert model_size(_model()) == {
+        'variables': 2, 'binaries': 1, 'constraints': 2, 'nonzeros': 3
+    }
+    assert 'nonzeros' not in model_size(_model(), nonzeros=False)
+
+
+def test_report(tmp_path):
+    profiler = Profiler()
+    with profiler.phase('model'):
+        profiler.measure_model(_model())
+    path = tmp_path / 'run.json'
+    report = profiler.report(path=str(path), scenario='test')
+
+    with open(path) as f:
+        written = json.load(f)
+    assert written['scenario'] == report['scenario'] == 'test'
+    assert [p['name'] for p in written['phases']] == ['model']
+    assert written['model']['variables'] == 2
+
+
+def test_solver_phases(cbc):
+    from tools.examples import build_model
+
+    om = build_model(1, periods=3)
+    profiler = Profiler()
+    profiler.solve(om, solver=cbc)
+
+    names = {p['name']: p['parent'] for p in profiler.phases}
+    assert names['solve'] is None
+    assert names['solver_solve'] == 'solve'
+    assert profiler.solver['termination'] == 'optimal'
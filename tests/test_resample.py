@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from tools.examples import build_energysystem, read_profiles
+from tools.resample import resample_profiles, step_hours
+
+
+PROFILES = pd.DataFrame({'demand_el': [1.0, 3.0], 'wind': [0.0, 0.5]})
+
+
+def test_step_hours():
+    assert step_hours('H') == 1
+    assert step_hours('15min') == 0.25
+
+
+def test_mean_conserves_energy():
+    resampled = resample_profiles(PROFILES, '30min')
+
+    assert list(resampled.columns) == ['demand_el', 'wind']
+    assert resampled['demand_el'].tolist() == [1, 1, 3, 3]
+    assert resampled['wind'].tolist() == [0, 0, 0.5, 0.5]
+    assert resampled.sum().tolist() == pytest.approx(
+        (2 * PROFILES.sum()).tolist()
+    )
+
+
+def test_interpolate():
+    resampled = resample_profiles(PROFILES, '30min', method='interpolate')
+
+    assert resampled['demand_el'].tolist() == [1, 2, 3, 3]
+
+
+def test_periods():
+    assert len(resample_profiles(PROFILES, '15min', periods=6)) == 6
+    assert resample_profiles(PROFILES, 'H', periods=1).equals(
+        PROFILES.iloc[:1]
+    )
+    with pytest.raises(ValueError):
+        resample_profiles(PROFILES, '15min', periods=9)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        resample_profiles(PROFILES, '30min', method='nearest')
+
+
+def _demand(es):
+    load = next(n for n in es.nodes if str(n.label) == 'sink_load')
+    return [load.inputs[i].fix[t] for i in load.inputs
+            for t in range(len(es.timeindex))]
+
+
+def test_given_profiles_are_not_resampled_again():
+    # rows given at the timestep of the model are used as they are
+    profiles = read_profiles(1, periods=8)
+    es = build_energysystem(1, profiles=profiles, freq='15min')
+
+    assert len(es.timeindex) == 8
+    assert _demand(es) == pytest.approx(profiles['demand_el'].tolist())
+
+
+def test_read_profiles_are_resampled():
+    hourly = read_profiles(1, periods=2)['demand_el']
+    es = build_energysystem(1, periods=8, freq='15min')
+
+    assert len(es.timeindex) == 8
+    assert _demand(es) == pytest.approx(hourly.repeat(4).tolist())
@@ -0,0 +1,67 @@
+import resource
+
+from tools.resources import (MEMORY_RESERVE, node_resources, plan, run_jobs,
+                             solver_options)
+
+
+def test_plan_splits_cores_and_memory():
+    assert plan(4, cores=8, memory=100) == {
+        'processes': 4, 'threads': 2, 'memory': 22
+    }
+    assert plan(64, cores=8, memory=100) == {
+        'processes': 8, 'threads': 1, 'memory': 11
+    }
+
+
+def test_plan_limits():
+    # three jobs of 30 fit into 90 % of 100
+    assert plan(8, cores=8, memory=100, job_memory=30) == {
+        'processes': 3, 'threads': 2, 'memory': 30
+    }
+    assert plan(1, cores=16, memory=100, max_threads=4)['threads'] == 4
+    assert plan(8, cores=8, memory=100, threads=4)['processes'] == 2
+    assert plan(8, cores=8, memory=100, processes=2) == {
+        'processes': 2, 'threads': 4, 'memory': 45
+    }
+
+
+def test_solver_options():
+    assert solver_options('cbc', threads=2, seed=1) == {
+        'threads': 102, 'randomCbcSeed': 2, 'randomSeed': 2
+    }
+    assert solver_options('cbc', threads=1)['threads'] == 1
+    assert solver_options(
+        'gurobi', threads=4, cmdline_options={'Seed': 7}
+    ) == {'Threads': 4, 'Seed': 7}
+    assert solver_options('unknown', threads=4) == {}
+
+
+def _address_space(job):
+    return resource.getrlimit(resource.RLIMIT_AS)[0]
+
+
+def test_plan_caps_memory_only_on_request():
+    assert plan(4, cores=8)['memory'] is None
+    assert plan(4, cores=8, processes=2)['memory'] is None
+    node = node_resources()['memory']
+    if node:
+        assert plan(4, cores=8, job_memory=1)['memory'] == int(
+            node * (1 - MEMORY_RESERVE) // 4
+        )
+
+
+def test_workers_are_uncapped_by_default():
+    unlimited = resource.getrlimit(resource.RLIMIT_AS)[0]
+    results, report = run_jobs(_address_space, {'a': 0, 'b': 1}, cores=2)
+
+    assert report['memory'] is None and report['failed'] == 0
+    assert set(results.values()) == {unlimited}
+
+
+def test_workers_are_capped_on_request():
+    cap = 2**40
+    results, _ = run_jobs(
+        _address_space, {'a': 0}, cores=1, memory=cap / 0.9
+    )
+
+    assert 0 < results['a'] <= cap
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from tools.examples import INERTIA_REQUIREMENTS, read_profiles
+from tools.screening import MINIMUM_ROTOR_SPEED, rotor_speed, screen, summary
+
+
+@pytest.fixture(scope='module')
+def profiles():
+    return read_profiles(4)
+
+
+def test_rotor_speed():
+    speed = rotor_speed(np.array([0, 10**-6, 0.343, 1, 2]))
+
+    assert speed.tolist() == pytest.approx(
+        [0, MINIMUM_ROTOR_SPEED, 0.7, 1, 1]
+    )
+
+
+def test_screen(profiles):
+    screened = screen(profiles)
+
+    assert len(screened) == len(profiles)
+    assert set(screened['status']) <= {'ok', 'tight', 'infeasible'}
+    # the synchronous units do not depend on the weather
+    assert screened['kinetic_energy_synchronous'].nunique() == 1
+    # the bound runs every wind turbine at rated speed
+    assert (
+        screened['margin_system_bound'] >= screened['margin_system']
+    ).all()
+
+
+def test_heuristic_only_marks_hours_tight(profiles):
+    screened = screen(
+        profiles, minimum_system_inertia=(
+            3.2 * INERTIA_REQUIREMENTS['minimum_system_inertia']
+        )
+    )
+    below = screened['margin_system'] < 0
+
+    assert below.any()
+    assert (screened.loc[below, 'margin_system_bound'] >= 0).all()
+    assert (screened.loc[below, 'status'] == 'tight').all()
+
+
+def test_requirement_above_the_bound_is_infeasible(profiles):
+    screened = screen(
+        profiles, minimum_system_inertia=(
+            10 * INERTIA_REQUIREMENTS['minimum_system_inertia']
+        )
+    )
+
+    assert (screened['status'] == 'infeasible').all()
+    assert summary(screened)['infeasible'] == len(profiles)
+
+
+def test_power_deficit_is_infeasible(profiles):
+    screened = screen(profiles.iloc[:3], demand=10**12)
+
+    assert (screened['power_deficit'] > 0).all()
+    assert (screened['status'] == 'infeasible').all()
+
+
+def test_summary(profiles):
+    result = summary(screen(profiles))
+
+    assert result['hours'] == len(profiles)
+    assert result['minimum_margin_system_bound'] >= (
+        result['minimum_margin_system']
+    )
@@ -0,0 +1,40 @@
+import pytest
+
+from tools import sensitivity
+from tools.examples import build_model
+
+
+def test_inertia_constraints():
+    om = build_model(1, periods=3)
+
+    constraints = sensitivity.inertia_constraints(om)
+
+    assert set(constraints) == set(sensitivity.SYSTEM_INERTIA_CONSTRAINTS)
+    assert all(list(c.keys()) == list(om.TIMESTEPS)
+               for c in constraints.values())
+
+
+def test_inertia_prices_require_a_solution():
+    om = build_model(1, periods=3)
+
+    with pytest.raises(RuntimeError, match='not been solved'):
+        sensitivity.inertia_prices(om)
+    assert not any(v.fixed for v in sensitivity.binary_variables(om))
+
+
+def test_inertia_prices(cbc):
+    om = build_model(1, periods=3)
+    om.solve(solver=cbc)
+    binaries = sensitivity.binary_variables(om)
+    free = [v for v in binaries if not v.fixed]
+
+    results, prices = sensitivity.inertia_prices(om, solver=cbc)
+    dual = om.dual
+    sensitivity.inertia_prices(om, solver=cbc)
+
+    assert om.dual is dual
+    assert not any(v.fixed for v in free)
+    assert len(prices) == 3
+    for name in sensitivity.SYSTEM_INERTIA_CONSTRAINTS:
+        assert (prices[name] >= 0).all()
+    assert 'balance_bus_electricity' in prices
@@ -0,0 +1,69 @@
+from concurrent.futures import ProcessPoolExecutor
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.sharedmem import (ALIGNMENT, SharedArrays, attach, attach_frame,
+                             detach)
+
+
+PROFILES = pd.DataFrame({
+    'demand_el': [0.5, 0.6, 0.7, 0.8],
+    'wind': [0.1, 0.0, 0.3, 0.9]
+})
+
+
+def _window_sum(task):
+    handle, start, stop = task
+    return attach_frame(handle, 'profiles', start, stop)['wind'].sum()
+
+
+@pytest.fixture(params=['memory', 'file'])
+def shared(request, tmp_path):
+    path = str(tmp_path / 'profiles.bin') if request.param == 'file' else None
+    with SharedArrays(
+            {'profiles': PROFILES, 'steps': np.arange(3)}, path=path
+    ) as shared:
+        yield shared
+    detach()
+
+
+def test_views(shared):
+    arrays = attach(pickle.loads(pickle.dumps(shared.handle)))
+
+    assert arrays['profiles'].tolist() == PROFILES.to_numpy().tolist()
+    assert arrays['steps'].tolist() == [0, 1, 2]
+    assert not arrays['steps'].flags.writeable
+    assert all(
+        offset % ALIGNMENT == 0
+        for offset, _, _ in shared.handle.layout.values()
+    )
+    # mapped once per process
+    assert attach(shared.handle)['steps'] is arrays['steps']
+
+
+def test_attach_frame(shared):
+    frame = attach_frame(shared.handle, 'profiles', 1, 3)
+
+    assert list(frame.columns) == ['demand_el', 'wind']
+    assert frame['demand_el'].tolist() == [0.6, 0.7]
+
+
+def test_workers(shared):
+    tasks = [(shared.handle, 0, 2), (shared.handle, 2, 4)]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        sums = list(pool.map(_window_sum, tasks))
+
+    assert sums == pytest.approx([0.1, 1.2])
+
+
+def test_rewritten_file_is_mapped_anew(tmp_path):
+    path = str(tmp_path / 'profiles.bin')
+    with SharedArrays({'steps': np.arange(3)}, path=path) as first:
+        assert attach(first.handle)['steps'].tolist() == [0, 1, 2]
+    with SharedArrays({'steps': np.arange(5.0) * 2}, path=path) as second:
+        assert second.handle.name == first.handle.name
+        assert attach(second.handle)['steps'].tolist() == [0, 2, 4, 6, 8]
+    detach()
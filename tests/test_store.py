@@ -0,0 +1,47 @@
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+from tools import store  # noqa: E402
+
+
+def test_round_trip(results, tmp_path):
+    root = str(tmp_path)
+    store.write_results(results, root, 'ex1')
+
+    back = store.read_results(root, 'ex1')
+
+    assert set(back) == set(results)
+    sequences = back[('transformer_hard_coal', 'bus_inertia')]['sequences']
+    assert sequences['source_inertia'].tolist() == [1, 0]
+    assert list(sequences.index) == list(
+        results[('transformer_hard_coal', 'bus_inertia')]['sequences'].index
+    )
+    assert back[('storage_battery', 'None')]['scalars']['invest'] == 1
+
+
+def test_read_sequence(results, tmp_path):
+    root = str(tmp_path)
+    store.write_results(results, root, 'ex1', variables=('flow',))
+
+    flow = store.read_sequence(
+        root, 'ex1', 'source_wind', 'bus_electricity', 'flow'
+    )
+
+    assert flow.tolist() == [60, 20]
+    assert store.read_sequences(root, variable='source_inertia').empty
+
+
+def test_rewrite_replaces_the_scenario(results, tmp_path):
+    root = str(tmp_path)
+    store.write_results(results, root, 'ex1')
+    store.write_results(results, root, 'ex2')
+    key = ('source_wind', 'bus_electricity')
+
+    store.write_results({key: results[key]}, root, 'ex1')
+
+    assert list(store.read_results(root, 'ex1')) == [key]
+    assert len(store.read_results(root, 'ex2')) == len(results)
+    scalars = store.read_table(root, 'ex1', kind='scalars')
+    assert scalars.num_rows == 0
+    assert scalars.schema.field('value').type == pa.float64()
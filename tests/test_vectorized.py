@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from pyomo import environ as po
+from pyomo.repn import generate_standard_repn
+
+from tools.examples import build_model
+from tools.inertia import SYNCHRONOUS, SYNTHETIC, InertiaTerms
+from tools.vectorized import (
+    RowMatrix, _add_termwise, add_requirement, requirement_matrix)
+
+
+def _rows(constraint):
+    """Bounds and coefficients by variable name of every row."""
+    rows = {}
+    for t, row in constraint.items():
+        repn = generate_standard_repn(row.body)
+        rows[t] = (po.value(row.lower), po.value(row.upper), {
+            v.name: c for c, v in zip(repn.linear_coefs, repn.linear_vars)
+        })
+    return rows
+
+
+@pytest.fixture(scope='module')
+def model():
+    return build_model(4, periods=3)
+
+
+def test_row_matrix():
+    values = np.array([[1.0, 0.0, 2.0], [0.0, 0.0, 0.0], [0.0, 3.0, 0.0]])
+    matrix = RowMatrix(values, columns=[4, 5, 6])
+
+    coefs, cols = matrix.row(0)
+    assert coefs.tolist() == [1.0, 2.0]
+    assert cols.tolist() == [4, 6]
+    assert len(matrix.row(1)[1]) == 0
+    assert matrix.row(2)[1].tolist() == [5]
+
+
+@pytest.mark.parametrize('types', [SYNCHRONOUS, SYNCHRONOUS + SYNTHETIC])
+def test_add_requirement_equals_termwise(model, types):
+    terms = InertiaTerms(model)
+    block = po.Block()
+    model.add_component('Test', block)
+    try:
+        add_requirement(
+            model, block, 'arrays', terms, requirement_matrix(terms, types),
+            10**9
+        )
+        _add_termwise(
+            model, block, 'termwise', terms, terms.mask(types), 10**9
+        )
+
+        assert _rows(block.arrays) == _rows(block.termwise)
+        assert len(block.arrays) == len(model.TIMESTEPS)
+    finally:
+        model.del_component(block)
+
+
+def test_add_requirement_per_timestep(model):
+    terms = InertiaTerms(model)
+    energy = np.arange(1, len(model.TIMESTEPS) + 1) * 10.0**8
+    block = po.Block()
+    model.add_component('Test', block)
+    try:
+        add_requirement(
+            model, block, 'total', terms,
+            requirement_matrix(terms, SYNCHRONOUS + SYNTHETIC), energy
+        )
+
+        assert [po.value(block.total[t].lower)
+                for t in model.TIMESTEPS] == energy.tolist()
+    finally:
+        model.del_component(block)
+
+
+def test_add_requirement_without_units(model):
+    terms = InertiaTerms(model)
+    matrix = requirement_matrix(terms, SYNCHRONOUS, nodes=[])
+    block = po.Block()
+    model.add_component('Test', block)
+    try:
+        add_requirement(model, block, 'free', terms, matrix, 0)
+        assert len(block.free) == 0
+
+        with pytest.raises(ValueError, match='No units provide'):
+            add_requirement(model, block, 'missing', terms, matrix, 1.0)
+    finally:
+        model.del_component(block)
@@ -0,0 +1,11 @@
+"""
+General description
+-------------------
+Shared tools for the OpInMod examples.
+
+The modules in this package collect the code that is needed once a study
+grows beyond a single example script, e.g. building large fleets from a
+register. The example scripts are run from the repository root, which is
+why they add the current working directory to the module search path
+before importing from this package.
+"""
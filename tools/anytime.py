@@ -0,0 +1,231 @@
+"""
+General description
+-------------------
+Anytime solve of an `oim.Model` with a wall-clock budget and a target gap.
+
+Every improved incumbent is passed to a callback and/or appended to a json
+lines file, including its synchronous and synthetic inertia series. When the
+budget is used up or the target gap is reached, the best solution is loaded
+into the model and the usual results dict is returned.
+
+With 'gurobi_persistent' the incumbents are taken from the solver callback.
+The solvers with warm start, i.e. 'cbc', 'cplex' and 'gurobi', are run in
+time slices of growing length, each warm-started from the best incumbent
+so far; the incumbent of each slice is reported if it improved. Every
+slice starts a new solver process: only the incumbent is carried over,
+the search tree and the cuts of the previous slice are lost and the bound
+is proven again, so a slice may end with a worse incumbent than the best.
+Solvers without warm start, e.g. 'glpk', would restart cold in every slice
+and are not supported.
+"""
+
+import json
+import math
+import time
+
+from oemof.solph.processing import convert_keys_to_strings
+from pyomo import environ as po
+from pyomo.opt import SolverFactory
+
+from tools import kpi
+from tools.pareto import WARMSTART_SOLVERS
+
+
+# persistent solvers reporting incumbents through a callback
+CALLBACK_SOLVERS = ('gurobi_persistent',)
+
+# command line options of time limit and relative gap per solver
+OPTIONS = {
+    'cbc': ('sec', 'ratio'),
+    'cplex': ('timelimit', 'mipgap'),
+    'gurobi': ('TimeLimit', 'MIPGap')
+}
+
+
+def relative_gap(objective, bound):
+    """Relative gap between an objective and its bound; infinite if one
+    of them is unknown."""
+    if objective is None or bound is None:
+        return math.inf
+    if objective == bound:
+        return 0.0
+    return abs(objective - bound) / max(abs(objective), 1e-10)
+
+
+def lower_bound(solver_results):
+    """The lower bound of pyomo solver results or None."""
+    try:
+        bound = solver_results.problem[0].lower_bound
+        return float(bound) if bound is not None else None
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return None
+
+
+def _check_solver(solver):
+    if solver not in CALLBACK_SOLVERS + WARMSTART_SOLVERS:
+        raise ValueError(
+            'The solver {0} is not supported: only {1} report incumbents '
+            'through a callback, and without warm start every time slice '
+            'would start from scratch.'.format(solver, CALLBACK_SOLVERS)
+        )
+
+
+class Anytime:
+    """
+    Anytime solve of a model.
+
+    Parameters
+    ----------
+    om : oim.Model
+    budget : float
+        Wall-clock budget in seconds.
+    gap : float
+        Target relative gap, e.g. 0.01.
+    solver : str
+        'gurobi_persistent' or one of `tools.pareto.WARMSTART_SOLVERS`.
+    callback : callable
+        Called with a dict for every improved incumbent, see
+        :meth:`incumbent`.
+    stream : str
+        Path of a json lines file every improved incumbent is appended to.
+    first_slice : float
+        Length of the first time slice in seconds for solvers without
+        callback; every following slice is twice as long.
+    """
+
+    def __init__(self, om, budget=60, gap=0.01, solver='cbc', callback=None,
+                 stream=None, first_slice=5):
+        _check_solver(solver)
+        self.om = om
+        self.budget = budget
+        self.gap = gap
+        self.solver = solver
+        self.callback = callback
+        self.stream = stream
+        self.first_slice = first_slice
+        self.incumbents = []
+        self.best = None
+        self.bound = None
+        self._start = None
+        self._variables = list(om.component_data_objects(po.Var))
+        self._bestValues = None
+        self._bestResults = None
+
+    def incumbent(self, objective, bound):
+        """
+        Report the solution currently loaded in the model as incumbent.
+
+        The reported dict holds the elapsed time, objective, bound, gap and
+        the synchronous and synthetic inertia [s] per timestep.
+        """
+        if self.best is not None and objective >= self.best:
+            return
+        self.best = objective
+        self._bestValues = [v.value for v in self._variables]
+        self._bestResults = self.om.results()
+        results = convert_keys_to_strings(self._bestResults)
+        inertia = kpi.inertia(results, self.om.es)
+        entry = {
+            'elapsed': time.time() - self._start,
+            'objective': objective,
+            'bound': bound,
+            'gap': relative_gap(objective, bound),
+            'timeindex': [str(t) for t in inertia.index],
+            'inertia_synchronous':
+                inertia['inertia_synchronous'].tolist(),
+            'inertia_synthetic': inertia['inertia_synthetic'].tolist()
+        }
+        self.incumbents.append(entry)
+        if self.callback is not None:
+            self.callback(entry)
+        if self.stream is not None:
+            with open(self.stream, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+
+    def _solve_persistent(self):
+        from gurobipy import GRB
+
+        opt = SolverFactory(self.solver)
+        opt.set_instance(self.om)
+        opt.options['TimeLimit'] = self.budget
+        opt.options['MIPGap'] = self.gap
+        def _callback(model, solver, where):
+            if where == GRB.Callback.MIPSOL:
+                solver.cbGetSolution(self._variables)
+                self.incumbent(
+                    solver.cbGet(GRB.Callback.MIPSOL_OBJ),
+                    solver.cbGet(GRB.Callback.MIPSOL_OBJBND)
+                )
+
+        opt.set_callback(_callback)
+        solverResults = opt.solve(tee=False)
+        self.bound = lower_bound(solverResults)
+
+        return solverResults
+
+    def _solve_slices(self):
+        timeOption, gapOption = OPTIONS[self.solver]
+        length = self.first_slice
+        solverResults = None
+        while True:
+            remaining = self.budget - (time.time() - self._start)
+            if remaining <= 0:
+                break
+            solveKwargs = {'tee': False}
+            if self.best is not None and self.solver in WARMSTART_SOLVERS:
+                solveKwargs['warmstart'] = True
+            solverResults = self.om.solve(
+                solver=self.solver,
+                solve_kwargs=solveKwargs,
+                cmdline_options={
+                    timeOption: max(1, int(min(length, remaining))),
+                    gapOption: self.gap
+                }
+            )
+            termination = str(
+                solverResults['Solver'][0]['Termination condition']
+            )
+            objective = po.value(self.om.objective, exception=False)
+            self.bound = lower_bound(solverResults)
+            if objective is not None:
+                self.incumbent(objective, self.bound)
+            if termination in ('optimal', 'infeasible', 'unbounded'):
+                break
+            if relative_gap(self.best, self.bound) <= self.gap:
+                break
+            length *= 2
+
+        return solverResults
+
+    def solve(self):
+        """
+        Solve until the budget is used up or the target gap is reached.
+
+        Returns
+        -------
+        dict
+            Results of the best incumbent as returned by `om.results()`;
+            its solution is loaded into the model.
+        """
+        _check_solver(self.solver)
+        self._start = time.time()
+        if self.solver in CALLBACK_SOLVERS:
+            self._solve_persistent()
+        else:
+            self._solve_slices()
+
+        if self._bestResults is None:
+            return self.om.results()
+        # a later slice may have loaded a worse solution
+        for v, value in zip(self._variables, self._bestValues):
+            v.set_value(value, True)
+        return self._bestResults
+
+
+def solve_anytime(om, budget=60, gap=0.01, solver='cbc', callback=None,
+                  stream=None):
+    """Anytime solve of a model, see :class:`Anytime`."""
+    return Anytime(
+        om, budget=budget, gap=gap, solver=solver, callback=callback,
+        stream=stream
+    ).solve()
@@ -0,0 +1,348 @@
+"""
+General description
+-------------------
+Solver input of a model kept as artifact for offline re-solves.
+
+:func:`solve` solves an `oim.Model` like `om.solve` and, if `artifact` is
+given, first writes the constructed problem as gzip compressed free MPS
+file together with a name map:
+
+* `<artifact>.mps.gz`: the problem with short column and row names,
+* `<artifact>.names.json.gz`: for every column the variable name, the
+  labels of its flow or node and the timestep, for every row the name of
+  the pyomo constraint, the values of the fixed variables, e.g. of the
+  load and the feed-in, which are no columns of the problem, the time
+  index and the objective sense.
+
+:func:`resolve` solves such an artifact with a local solver ('cbc' or
+'glpk') and maps the solution back to a results dict with string keys as
+returned by `convert_keys_to_strings(om.results())`, without building the
+energy system and the model again. Solver options can thus be tuned on a
+fixed instance, and slow or infeasible instances can be passed on::
+
+    solve(om, solver='cbc', artifact='runs/example_4')
+    results, info = resolve('runs/example_4', options={'ratio': 0.01})
+
+Installation requirements
+-------------------------
+The re-solve needs the solver executable, i.e. cbc or glpsol, on the PATH.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from oemof.network.network import Node
+from pyomo import environ as po
+
+
+# command line of the solvers; the model, options and solution file are
+# inserted
+COMMANDS = {
+    'cbc': ('cbc', '{model}', '{options}', '-solve', '-printingOptions',
+            'all', '-solu', '{solution}'),
+    'glpk': ('glpsol', '--freemps', '{model}', '{options}', '-w',
+             '{solution}')
+}
+
+
+def _paths(artifact):
+    return artifact + '.mps.gz', artifact + '.names.json.gz'
+
+
+def _indexed_by(component, timesets):
+    """Whether a component is indexed by one of the sets `timesets`."""
+    index = component.index_set()
+    subsets = index.subsets() if hasattr(index, 'subsets') else [index]
+    return any(s is t for s in subsets for t in timesets)
+
+
+def _column(var, timesets):
+    """
+    Variable name, labels and timestep of a column as in
+    `oemof.solph.processing`.
+
+    Only the last index of variables indexed by one of `timesets`, e.g.
+    om.TIMESTEPS, is taken as timestep. Variables with other indices than
+    nodes and the timestep get no labels.
+    """
+    component = var.parent_component()
+    index = var.index()
+    if not isinstance(index, tuple):
+        index = (index,)
+    timestep = None
+    if _indexed_by(component, timesets):
+        timestep, index = int(index[-1]), index[:-1]
+    if not index or not all(isinstance(n, Node) for n in index):
+        return [component.local_name, None, None]
+    labels = [str(n.label) for n in index] + [None] * (2 - len(index))
+    return [component.local_name, labels, timestep]
+
+
+def write_artifact(om, artifact):
+    """
+    Write the problem of a constructed model and its name map.
+
+    Parameters
+    ----------
+    om : oim.Model
+    artifact : str
+        Path without extension; missing directories are created.
+
+    Returns
+    -------
+    tuple
+        Paths of the MPS file and the name map.
+    """
+    mps, names = _paths(artifact)
+    directory = os.path.dirname(os.path.abspath(artifact))
+    os.makedirs(directory, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        filename, mapId = om.write(
+            os.path.join(tmp, 'model.mps'),
+            io_options={'symbolic_solver_labels': False}
+        )
+        symbols = om.solutions.symbol_map[mapId]
+        with open(filename, 'rb') as src, gzip.open(mps, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+    # the symbol map is only needed for the name map
+    del om.solutions.symbol_map[mapId]
+
+    # the storage content is indexed by the timepoints, which include the
+    # end of the horizon
+    timesets = [om.TIMESTEPS] + (
+        [om.TIMEPOINTS] if hasattr(om, 'TIMEPOINTS') else []
+    )
+    columns, rows = {}, {}
+    for symbol, ref in list(symbols.bySymbol.items()) + list(
+            symbols.aliases.items()):
+        obj = ref()
+        if obj is None:
+            continue
+        if obj.ctype is po.Var:
+            columns[symbol] = _column(obj, timesets)
+        elif obj.ctype is po.Constraint:
+            rows[symbol] = obj.name
+    fixed = [
+        _column(v, timesets) + [v.value]
+        for v in om.component_data_objects(po.Var)
+        if v.fixed and v.value is not None
+    ]
+
+    index = om.es.timeindex
+    nameMap = {
+        'columns': columns,
+        'rows': rows,
+        'fixed': fixed,
+        'timeindex': [str(t) for t in index],
+        'freq': index.freqstr,
+        'sense': 'min' if om.objective.sense == 1 else 'max'
+    }
+    with gzip.open(names, 'wt', encoding='utf-8') as f:
+        json.dump(nameMap, f)
+
+    return mps, names
+
+
+def solve(om, artifact=None, **kwargs):
+    """
+    `om.solve(**kwargs)`, writing the problem to `artifact` first if
+    given, see :func:`write_artifact`.
+    """
+    if artifact is not None:
+        write_artifact(om, artifact)
+    return om.solve(**kwargs)
+
+
+def read_names(artifact):
+    """The name map of an artifact as dict."""
+    with gzip.open(_paths(artifact)[1], 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _mps_columns(model):
+    """Column names of an MPS file in order of appearance."""
+    columns = {}
+    section = None
+    with open(model) as f:
+        for line in f:
+            if not line.strip() or line.startswith('*'):
+                continue
+            if not line[0].isspace():
+                section = line.split()[0]
+                continue
+            if section == 'COLUMNS':
+                fields = line.split()
+                if fields[0] != "'MARKER'" and fields[1] != "'MARKER'":
+                    columns.setdefault(fields[0], None)
+    return list(columns)
+
+
+def _read_cbc(solution, model):
+    """
+    Status, objective and values of a cbc solution file.
+
+    With `-printingOptions all` cbc also prints the row activities in the
+    same format, so `values` holds the values of the columns and of the
+    rows by their names; the names of rows and columns do not collide.
+    """
+    with open(solution) as f:
+        status = f.readline().strip()
+        values = {}
+        for line in f:
+            fields = line.replace('**', ' ').split()
+            if len(fields) >= 3:
+                values[fields[1]] = float(fields[2])
+    objective = None
+    if 'objective value' in status:
+        objective = float(status.split('objective value')[-1])
+    return status.split(' - ')[0], objective, values
+
+
+def _read_glpk(solution, model):
+    """
+    Status, objective and column values of a glpsol solution file.
+
+    The column lines are `j COL VAL` for a MIP solution and
+    `j COL STAT PRIM DUAL` for a basic solution.
+    """
+    names = _mps_columns(model)
+    basic = False
+    values = {}
+    status, objective = None, None
+    with open(solution) as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0] == 'c':
+                continue
+            if fields[0] == 's':
+                # s mip ROWS COLS STATUS OBJ or s bas ROWS COLS PST DST OBJ
+                basic = fields[1] == 'bas'
+                status = fields[4]
+                if basic and fields[4] == fields[5] == 'f':
+                    # primal and dual feasible basis
+                    status = 'o'
+                objective = float(fields[-1])
+            elif fields[0] == 'j':
+                values[names[int(fields[1]) - 1]] = float(
+                    fields[3] if basic else fields[2]
+                )
+    status = {'o': 'Optimal', 'f': 'Feasible', 'n': 'Infeasible',
+              'u': 'Undefined'}.get(status, status)
+    return status, objective, values
+
+
+READERS = {
+    'cbc': _read_cbc,
+    'glpk': _read_glpk
+}
+
+
+def _results(nameMap, values):
+    """Results dict with string keys from the column values."""
+    index = pd.DatetimeIndex(nameMap['timeindex'], freq=nameMap['freq'])
+
+    columns = [
+        c + [values.get(symbol, 0.0)]
+        for symbol, c in nameMap['columns'].items()
+    ]
+    sequences, scalars = {}, {}
+    for name, labels, timestep, value in columns + nameMap['fixed']:
+        if labels is None:
+            continue
+        key = tuple(str(label) for label in labels)
+        if timestep is None:
+            scalars.setdefault(key, {})[name] = value
+        elif timestep < len(index):
+            # the storage content at the end of the horizon is dropped
+            sequences.setdefault(key, {}).setdefault(
+                name, np.full(len(index), np.nan)
+            )[timestep] = value
+
+    results = {}
+    for key in sorted(set(sequences) | set(scalars)):
+        frame = pd.DataFrame(sequences.get(key, {}), index=index)
+        results[key] = {
+            'scalars': pd.Series(scalars.get(key, {}), dtype=float),
+            'sequences': frame[sorted(frame.columns)]
+        }
+    return results
+
+
+def resolve(artifact, solver='cbc', options=None, timeout=None,
+            keep=None):
+    """
+    Solve an artifact and map the solution to results.
+
+    Parameters
+    ----------
+    artifact : str
+        Path of the artifact without extension.
+    solver : str
+        'cbc' or 'glpk'.
+    options : dict
+        Command line options, e.g. {'ratio': 0.01, 'sec': 60} for cbc or
+        {'mipgap': 0.01} for glpk.
+    timeout : float
+        Seconds after which the solver process is killed.
+    keep : str
+        Directory to keep the decompressed model, the solution file and
+        the solver log in.
+
+    Returns
+    -------
+    tuple
+        (results, info); results has string keys, info holds the status,
+        objective, solve time and solver log.
+    """
+    nameMap = read_names(artifact)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = keep or tmp
+        os.makedirs(directory, exist_ok=True)
+        model = os.path.join(directory, 'model.mps')
+        solution = os.path.join(directory, 'model.sol')
+        with gzip.open(_paths(artifact)[0], 'rb') as src, \
+                open(model, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+        prefix = '-' if solver == 'cbc' else '--'
+        flags = []
+        for k, v in (options or {}).items():
+            flags += [prefix + k] + ([] if v is None else [str(v)])
+        command = []
+        for part in COMMANDS[solver]:
+            if part == '{options}':
+                command += flags
+            else:
+                command.append(part.format(model=model, solution=solution))
+
+        start = time.perf_counter()
+        process = subprocess.run(
+            command, capture_output=True, text=True, timeout=timeout
+        )
+        seconds = time.perf_counter() - start
+        if keep is not None:
+            with open(os.path.join(directory, 'solver.log'), 'w') as f:
+                f.write(process.stdout)
+        if not os.path.exists(solution):
+            raise RuntimeError(
+                'The solver wrote no solution:\n' + process.stdout[-2000:]
+                + process.stderr[-2000:]
+            )
+        status, objective, values = READERS[solver](solution, model)
+
+    info = {
+        'solver': solver,
+        'status': status,
+        'objective': objective,
+        'time': seconds,
+        'log': process.stdout
+    }
+    return _results(nameMap, values), info
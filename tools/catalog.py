@@ -0,0 +1,243 @@
+"""
+General description
+-------------------
+Indexed catalog of many runs.
+
+The catalog is a SQLite database holding one row per run with its solver
+status, the scenario parameters, the timings and precomputed KPIs
+(energy per technology, CO2 emissions, inertia margin statistics). The
+parameter and KPI tables are indexed by name and value, so questions like
+"all runs where synthetic inertia covered more than 30 % of the minimum
+system inertia" are answered from the catalog without loading any results.
+The sequences of a run are linked by the root of its columnar store, see
+tools/store.py.
+"""
+
+import datetime
+import json
+import numbers
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from tools import kpi
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    scenario TEXT UNIQUE NOT NULL,
+    status TEXT,
+    termination TEXT,
+    objective REAL,
+    store TEXT,
+    created TEXT
+);
+CREATE TABLE IF NOT EXISTS parameters (
+    run_id INTEGER REFERENCES runs(run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS timings (
+    run_id INTEGER REFERENCES runs(run_id) ON DELETE CASCADE,
+    phase TEXT NOT NULL,
+    seconds REAL
+);
+CREATE TABLE IF NOT EXISTS kpis (
+    run_id INTEGER REFERENCES runs(run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS parameters_name_value ON parameters(name, value);
+CREATE INDEX IF NOT EXISTS parameters_name_text ON parameters(name, text);
+CREATE INDEX IF NOT EXISTS parameters_run ON parameters(run_id);
+CREATE INDEX IF NOT EXISTS timings_run ON timings(run_id);
+CREATE INDEX IF NOT EXISTS kpis_name_value ON kpis(name, value);
+CREATE INDEX IF NOT EXISTS kpis_run ON kpis(run_id);
+CREATE INDEX IF NOT EXISTS runs_status ON runs(status, termination);
+"""
+
+OPERATORS = ('=', '!=', '<', '<=', '>', '>=')
+
+
+def _number(value):
+    """A number as Python int or float, e.g. numpy integers, which SQLite
+    would store as blob; None for other values."""
+    if isinstance(value, (bool, np.bool_)):
+        return int(value)
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    return None
+
+
+class Catalog:
+    """
+    Run catalog stored in a SQLite file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the database file; created if it does not exist.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add_run(self, scenario, results=None, energysystem=None,
+                parameters=None, status=None, termination=None,
+                objective=None, timings=None, kpis=None, store=None):
+        """
+        Add a run to the catalog; an existing run of the same name is
+        replaced.
+
+        Parameters
+        ----------
+        scenario : str
+            Unique name of the run.
+        results : dict
+            Results with string keys. If given, the KPIs of
+            :func:`tools.kpi.summary` and, with `energysystem`, the inertia
+            statistics are computed and stored.
+        energysystem : oim.EnergySystem
+        parameters : dict
+            Scenario parameters; numbers are stored as values, everything
+            else as text.
+        status, termination : str
+            Solver status and termination condition.
+        objective : float
+        timings : dict
+            Seconds per phase, e.g. {'build': 1.2, 'solve': 30.5}.
+        kpis : dict
+            Additional KPIs.
+        store : str
+            Root of the columnar store. If given together with `results`,
+            the sequences are written to the store.
+
+        Returns
+        -------
+        int
+            The id of the run.
+        """
+        values = dict(kpis or {})
+        if results is not None:
+            values.update(kpi.summary(results, energysystem).to_dict())
+            if energysystem is not None:
+                values.update(
+                    kpi.inertia_statistics(results, energysystem).to_dict()
+                )
+            if store is not None:
+                # pyarrow is only needed if sequences are stored
+                from tools.store import write_results
+                write_results(results, store, scenario)
+
+        with self.connection as c:
+            c.execute('DELETE FROM runs WHERE scenario = ?', (scenario,))
+            runId = c.execute(
+                'INSERT INTO runs (scenario, status, termination, objective,'
+                ' store, created) VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    scenario, status, termination, _number(objective), store,
+                    datetime.datetime.now().isoformat()
+                )
+            ).lastrowid
+            c.executemany(
+                'INSERT INTO parameters VALUES (?, ?, ?, ?)',
+                [
+                    (runId, k, _number(v), None)
+                    if _number(v) is not None
+                    else (runId, k, None, json.dumps(v, default=str))
+                    for k, v in (parameters or {}).items()
+                ]
+            )
+            c.executemany(
+                'INSERT INTO timings VALUES (?, ?, ?)',
+                [(runId, k, _number(v)) for k, v in (timings or {}).items()]
+            )
+            c.executemany(
+                'INSERT INTO kpis VALUES (?, ?, ?)',
+                [(runId, k, float(v)) for k, v in values.items()]
+            )
+
+        return runId
+
+    def query(self, sql, params=()):
+        """Run a SQL query on the catalog and return a DataFrame."""
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def find(self, kpis=None, parameters=None, status=None):
+        """
+        Find runs by KPIs and parameters.
+
+        Parameters
+        ----------
+        kpis, parameters : dict
+            Conditions as name: (operator, value), e.g.
+            {'synthetic_share_max': ('>', 0.3)}. Parameters that are not
+            numbers are compared with their stored text, e.g.
+            {'solver': ('=', 'cbc')}.
+        status : str
+            Solver termination condition, e.g. 'optimal'.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The matching rows of the runs table.
+        """
+        joins = []
+        params = []
+        for table, conditions in (('kpis', kpis), ('parameters', parameters)):
+            for n, (name, (op, value)) in enumerate(
+                    (conditions or {}).items()):
+                if op not in OPERATORS:
+                    raise ValueError('Unknown operator ' + op)
+                alias = '{0}{1}'.format(table[0], n)
+                number = _number(value)
+                column = 'value'
+                if number is None and table == 'parameters':
+                    column = 'text'
+                    value = json.dumps(value, default=str)
+                joins.append(
+                    'JOIN {0} {1} ON {1}.run_id = runs.run_id AND '
+                    '{1}.name = ? AND {1}.{2} {3} ?'.format(
+                        table, alias, column, op
+                    )
+                )
+                params += [name, value if number is None else number]
+
+        sql = 'SELECT runs.* FROM runs ' + ' '.join(joins)
+        if status is not None:
+            sql += ' WHERE runs.termination = ?'
+            params.append(status)
+
+        return self.query(sql, params)
+
+    def kpis(self, run_ids=None):
+        """KPIs of the given runs (all if None) as table run x KPI."""
+        sql = 'SELECT run_id, name, value FROM kpis'
+        params = []
+        if run_ids is not None:
+            run_ids = list(run_ids)
+            sql += ' WHERE run_id IN ({0})'.format(
+                ', '.join('?' * len(run_ids))
+            )
+            params = run_ids
+        return self.query(sql, params).pivot(
+            index='run_id', columns='name', values='value'
+        )
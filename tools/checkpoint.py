@@ -0,0 +1,315 @@
+"""
+General description
+-------------------
+Checkpoints for long sweeps and rolling horizon runs.
+
+Finished scenario points and rolling horizon windows are recorded in a
+SQLite file right after they are solved. A restarted run skips every point
+that is recorded and continues a rolling horizon run after its last
+finished window, starting from the storage levels recorded with that
+window. A node being pre-empted therefore only loses the points or the
+window that were being solved, and a failing point or a dying worker
+does not keep the finished points from being recorded.
+"""
+
+from concurrent.futures import as_completed
+import datetime
+import json
+import math
+import sqlite3
+
+import pandas as pd
+from oemof.solph.processing import convert_keys_to_strings
+
+import opinmod as oim
+
+from tools import kpi
+from tools.examples import EXAMPLE_UNITS, REGISTER, build_energysystem
+from tools.fleet import read_fleet
+from tools.resources import executor, plan, solve
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    key TEXT PRIMARY KEY,
+    payload TEXT,
+    finished TEXT
+);
+CREATE TABLE IF NOT EXISTS windows (
+    run TEXT NOT NULL,
+    window INTEGER NOT NULL,
+    start TEXT,
+    storage TEXT,
+    payload TEXT,
+    finished TEXT,
+    PRIMARY KEY (run, window)
+);
+"""
+
+
+def _json(value):
+    return json.dumps(value, default=float)
+
+
+class Checkpoint:
+    """
+    Durable record of finished points and windows.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SQLite file; created if it does not exist.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = FULL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def done(self, key):
+        """Whether a point is recorded."""
+        return self.connection.execute(
+            'SELECT 1 FROM points WHERE key = ?', (str(key),)
+        ).fetchone() is not None
+
+    def record(self, key, payload=None):
+        """Record a finished point together with a json serialisable
+        payload, e.g. its KPIs."""
+        with self.connection as c:
+            c.execute(
+                'INSERT OR REPLACE INTO points VALUES (?, ?, ?)',
+                (
+                    str(key), _json(payload),
+                    datetime.datetime.now().isoformat()
+                )
+            )
+
+    def result(self, key):
+        """The payload of a recorded point or None."""
+        row = self.connection.execute(
+            'SELECT payload FROM points WHERE key = ?', (str(key),)
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def record_window(self, run, window, start, storage, payload=None):
+        """
+        Record a finished rolling horizon window.
+
+        Parameters
+        ----------
+        run : str
+        window : int
+            Number of the window, starting at 0.
+        start : str
+            First timestamp of the window.
+        storage : dict
+            Storage levels at the end of the window by storage label, as
+            fraction of the nominal storage capacity.
+        payload :
+            Json serialisable data of the window, e.g. its KPIs.
+        """
+        with self.connection as c:
+            c.execute(
+                'INSERT OR REPLACE INTO windows VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    run, window, str(start), _json(storage), _json(payload),
+                    datetime.datetime.now().isoformat()
+                )
+            )
+
+    def last_window(self, run):
+        """
+        The last finished window of a run.
+
+        Returns
+        -------
+        tuple
+            (window, storage levels) or (None, None) if no window is
+            recorded.
+        """
+        row = self.connection.execute(
+            'SELECT window, storage FROM windows WHERE run = ? '
+            'ORDER BY window DESC LIMIT 1', (run,)
+        ).fetchone()
+        if row is None:
+            return None, None
+        return row[0], json.loads(row[1])
+
+    def windows(self, run):
+        """The payloads of all finished windows of a run by window."""
+        rows = self.connection.execute(
+            'SELECT window, payload FROM windows WHERE run = ? '
+            'ORDER BY window', (run,)
+        ).fetchall()
+        return {w: json.loads(p) for w, p in rows}
+
+
+def run_points(function, points, checkpoint, processes=None):
+    """
+    Evaluate a function for all points not recorded yet.
+
+    Parameters
+    ----------
+    function : callable
+        Called with one point, returns a json serialisable payload; must be
+        picklable if processes are used.
+    points : dict
+        Points keyed by a unique name.
+    checkpoint : Checkpoint or str
+    processes : int
+        Number of worker processes; the points are evaluated in the main
+        process if None or 1. Payloads are recorded by the main process as
+        soon as a point is finished. The workers get the thread and memory
+        budget of `tools.resources.plan`; solve with
+        `tools.resources.solve` to use it.
+
+    Returns
+    -------
+    dict
+        The payloads of all points including the ones of previous runs.
+
+    Raises
+    ------
+    RuntimeError
+        If points failed, after all other points are recorded. A dead
+        worker breaks the pool, so the points still pending then fail as
+        well; a restarted run evaluates them again.
+    """
+    if isinstance(checkpoint, str):
+        checkpoint = Checkpoint(checkpoint)
+    pending = {k: p for k, p in points.items() if not checkpoint.done(k)}
+    errors = {}
+
+    if not processes or processes == 1:
+        for k, p in pending.items():
+            try:
+                checkpoint.record(k, function(p))
+            except Exception as e:
+                errors[k] = e
+    else:
+        budget = plan(len(pending), processes=processes)
+        with executor(budget) as pool:
+            futures = {pool.submit(function, p): k for k, p in pending.items()}
+            for f in as_completed(futures):
+                try:
+                    checkpoint.record(futures[f], f.result())
+                except Exception as e:
+                    errors[futures[f]] = e
+
+    if errors:
+        raise RuntimeError(
+            '{0} of {1} points failed: {2}'.format(
+                len(errors), len(pending),
+                '; '.join('{0}: {1!r}'.format(k, e)
+                          for k, e in errors.items())
+            )
+        ) from next(iter(errors.values()))
+
+    return {k: checkpoint.result(k) for k in points}
+
+
+def rolling_horizon(checkpoint, run, profiles, window, number=4,
+                    storages=('storage_battery',), solver='cbc',
+                    callback=None, start='20/8/2020', freq='H', **kwargs):
+    """
+    Solve an example in consecutive windows, carrying the storage levels.
+
+    The storage levels at the end of each window are the initial storage
+    levels of the next one. Every window is recorded in the checkpoint, so a
+    restarted run continues after the last finished window.
+
+    Parameters
+    ----------
+    checkpoint : Checkpoint or str
+    run : str
+        Name of the run in the checkpoint.
+    profiles : pandas.DataFrame
+        Input data of the whole horizon, see `tools.examples`.
+    window : int
+        Number of timesteps per window.
+    number : int
+        Number of the example.
+    storages : tuple
+        Labels of the storage units whose levels are carried.
+    callback : callable
+        Called with the string keyed results and the number of the window;
+        returns a dict that is added to the payload of the window.
+    **kwargs :
+        Passed to `tools.examples.build_energysystem`.
+
+    Returns
+    -------
+    dict
+        The payloads of all windows, by default the KPI summary.
+
+    Raises
+    ------
+    RuntimeError
+        If the solve of a window is neither optimal nor feasible. The
+        window is not recorded, so its storage levels are not carried and
+        a restart begins with it.
+    """
+    if isinstance(checkpoint, str):
+        checkpoint = Checkpoint(checkpoint)
+
+    fleet = read_fleet(REGISTER)
+    fleet = fleet[fleet['label'].isin(EXAMPLE_UNITS[number])].copy()
+    timeIdx = pd.date_range(start=start, periods=len(profiles), freq=freq)
+
+    last, levels = checkpoint.last_window(run)
+    if last is not None:
+        fleet.loc[list(levels), 'initial_storage_level'] = list(
+            levels.values()
+        )
+    first = 0 if last is None else last + 1
+
+    for w in range(first, math.ceil(len(profiles) / window)):
+        part = profiles.iloc[w * window:(w + 1) * window]
+        energysystem = build_energysystem(
+            number,
+            profiles=part.reset_index(drop=True),
+            fleet=fleet,
+            start=timeIdx[w * window],
+            freq=freq,
+            **kwargs
+        )
+        om = oim.Model(energysystem)
+        solverResults = solve(om, solver=solver, solve_kwargs={'tee': False})
+        termination = str(solverResults['Solver'][0]['Termination condition'])
+        if termination not in ('optimal', 'feasible'):
+            raise RuntimeError(
+                'Window {0} of run {1} terminated with {2}.'.format(
+                    w, run, termination
+                )
+            )
+        results = convert_keys_to_strings(om.results())
+
+        levels = {}
+        for s in storages:
+            content = results[(s, 'None')]['sequences']['storage_content']
+            capacity = fleet.loc[s, 'nominal_storage_capacity']
+            levels[s] = float(content.iloc[-1]) / capacity if capacity else 0
+        fleet.loc[list(levels), 'initial_storage_level'] = list(
+            levels.values()
+        )
+
+        payload = kpi.summary(results, energysystem).to_dict()
+        if callback is not None:
+            payload.update(callback(results, w))
+        checkpoint.record_window(
+            run, w, timeIdx[w * window], levels, payload
+        )
+
+    return checkpoint.windows(run)
+
@@ -0,0 +1,195 @@
+"""
+General description
+-------------------
+Compact in-memory representation of results.
+
+`om.results()` stores every variable of every component as float64
+sequence with an index of its own, although many of them are constant,
+e.g. `apparent_power` and `inertia_constant` of the inertia flows, and
+`source_inertia` is binary. :func:`compact` converts the results:
+
+* constant sequences are stored as one scalar,
+* sequences of zeros and ones are stored as packed bits,
+* other sequences are kept as float64 or, optionally, as float32, which
+  keeps about seven significant digits,
+* all entries share one time index.
+
+The compact results keep the accessor interface of the scripts:
+`results[key]['sequences'][variable]` returns a pandas Series and
+`results[key]['sequences'].index` the time index, so tools/kpi.py and
+tools/store.py work on them unchanged. Series are created on access, so
+keep a Series instead of accessing it in a loop.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# values closer than this to 0 or 1 are taken as binary
+BINARY_TOLERANCE = 1e-6
+
+
+class CompactSequences:
+    """
+    Sequences of one result entry, read-only.
+
+    Attributes
+    ----------
+    index : pandas.Index
+        The time index shared with the other entries.
+    constants : dict
+        Value of each constant sequence.
+    bits : dict
+        Packed bits of each binary sequence.
+    arrays : dict
+        Values of all other sequences.
+    """
+
+    def __init__(self, index, constants, bits, arrays, columns):
+        self.index = index
+        self.constants = constants
+        self.bits = bits
+        self.arrays = arrays
+        self.columns = pd.Index(columns)
+
+    def values(self, variable):
+        """Values of a sequence as numpy.ndarray."""
+        if variable in self.constants:
+            return np.full(len(self.index), self.constants[variable])
+        if variable in self.bits:
+            return np.unpackbits(
+                self.bits[variable], count=len(self.index)
+            ).astype(float)
+        return self.arrays[variable]
+
+    def __getitem__(self, variable):
+        if isinstance(variable, list):
+            return pd.DataFrame(
+                {v: self.values(v) for v in variable}, index=self.index
+            )
+        if variable not in self.columns:
+            raise KeyError(variable)
+        return pd.Series(
+            self.values(variable), index=self.index, name=variable
+        )
+
+    def __contains__(self, variable):
+        return variable in self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def empty(self):
+        return len(self.columns) == 0 or len(self.index) == 0
+
+    def items(self):
+        for variable in self.columns:
+            yield variable, self[variable]
+
+    def to_frame(self):
+        """The sequences as DataFrame as returned by `om.results()`."""
+        return self[list(self.columns)]
+
+    @property
+    def nbytes(self):
+        """Memory of the values, without the shared index."""
+        return (
+            8 * len(self.constants)
+            + sum(b.nbytes for b in self.bits.values())
+            + sum(a.nbytes for a in self.arrays.values())
+        )
+
+
+def _compact_sequences(sequences, index, float32):
+    constants, bits, arrays = {}, {}, {}
+    for variable in sequences.columns:
+        values = sequences[variable].to_numpy(dtype=float)
+        if not len(values):
+            arrays[variable] = values
+            continue
+        first = values[0]
+        if np.isnan(values).all() or (values == first).all():
+            constants[variable] = first
+            continue
+        rounded = np.round(values)
+        if (np.isin(rounded, (0, 1)).all()
+                and np.abs(values - rounded).max() <= BINARY_TOLERANCE):
+            bits[variable] = np.packbits(rounded.astype(np.uint8))
+            continue
+        arrays[variable] = values.astype(
+            np.float32 if float32 else np.float64
+        )
+        arrays[variable].flags.writeable = False
+    return CompactSequences(
+        index, constants, bits, arrays, list(sequences.columns)
+    )
+
+
+def compact(results, float32=False):
+    """
+    Compact results.
+
+    Parameters
+    ----------
+    results : dict
+        Results as returned by `om.results()`, with node or string keys.
+    float32 : bool
+        Store the non-constant, non-binary sequences, e.g. the flows, as
+        float32.
+
+    Returns
+    -------
+    dict
+        The results with :class:`CompactSequences` as 'sequences'; the
+        scalars are kept.
+    """
+    indices = []
+    compacted = {}
+    for key, entry in results.items():
+        sequences = entry['sequences']
+        index = sequences.index
+        for shared in indices:
+            if shared is index or shared.equals(index):
+                index = shared
+                break
+        else:
+            indices.append(index)
+        compacted[key] = dict(
+            entry,
+            sequences=_compact_sequences(sequences, index, float32)
+        )
+    return compacted
+
+
+def expand(results):
+    """Results with DataFrames as sequences again."""
+    return {
+        key: dict(
+            entry,
+            sequences=(
+                entry['sequences'].to_frame()
+                if isinstance(entry['sequences'], CompactSequences)
+                else entry['sequences']
+            )
+        )
+        for key, entry in results.items()
+    }
+
+
+def nbytes(results):
+    """Memory of the sequences of results in bytes, every distinct index
+    counted once."""
+    total = 0
+    indices = {}
+    for entry in results.values():
+        sequences = entry['sequences']
+        indices[id(sequences.index)] = sequences.index
+        if isinstance(sequences, CompactSequences):
+            total += sequences.nbytes
+        else:
+            total += int(sequences.memory_usage(index=False).sum())
+    return total + sum(i.memory_usage() for i in indices.values())
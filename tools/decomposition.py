@@ -0,0 +1,474 @@
+"""
+General description
+-------------------
+Temporal decomposition of an example into blocks coupled by storage levels.
+
+The horizon is cut into blocks of consecutive timesteps. The blocks only
+interact through the storage levels at their boundaries: the level at the
+end of one block must equal the initial level of the next one. These
+coupling constraints are relaxed with Lagrange multipliers (prices), so
+the blocks are solved independently and in parallel:
+
+    block k:  min costs_k + price_k * end_k - price_(k-1) * start_k
+
+After every iteration the prices are moved along the violation of the
+coupling constraints (subgradient step). The sum of the block objectives
+is a lower bound of the costs of the whole horizon. A feasible solution
+and thus an upper bound is recovered by fixing the boundary levels to the
+mean of the end and start level of neighbouring blocks and solving the
+blocks again. The iterations stop when the coupling constraints are met
+within a tolerance or the gap between the bounds is closed.
+
+Every worker process owns a fixed set of blocks. The profiles of the
+whole horizon are written once into shared memory, see tools/sharedmem.py;
+the fleet and the builder arguments of the blocks are passed once to the
+initializer of the worker, and every block model is built once and kept
+there. The tasks of the iterations only hold the prices and boundary
+levels.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import math
+import uuid
+
+import numpy as np
+import pandas as pd
+from oemof.solph.processing import convert_keys_to_strings
+from pyomo import environ as po
+
+from tools.examples import EXAMPLE_UNITS, REGISTER, build_model
+from tools.fleet import read_fleet
+from tools.resources import initialize_worker, plan, solve
+from tools.sharedmem import SharedArrays, attach_frame
+
+
+# static data and models of the blocks of the process by run and block
+# number
+_BLOCKS = {}
+_MODELS = {}
+
+
+def add_boundary(om, storages):
+    """
+    Add prices and boundary levels of the given storages to a model.
+
+    Adds the expressions `boundary_start` and `boundary_end` (storage
+    content before the first and after the last timestep), the mutable
+    params `price_start`, `price_end` and `level_end`, the deactivated
+    constraint `fix_end` and the objective `decomposition_objective`,
+    which replaces the cost objective.
+    """
+    block = om.GenericStorageBlock
+    nodes = {str(n.label): n for n in block.STORAGES}
+    last = om.TIMESTEPS[-1]
+
+    om.BOUNDARY = po.Set(initialize=list(storages), ordered=True)
+    om.price_start = po.Param(om.BOUNDARY, mutable=True, initialize=0)
+    om.price_end = po.Param(om.BOUNDARY, mutable=True, initialize=0)
+    om.level_end = po.Param(om.BOUNDARY, mutable=True, initialize=0)
+    om.boundary_start = po.Expression(
+        om.BOUNDARY, rule=lambda m, s: block.init_content[nodes[s]]
+    )
+    om.boundary_end = po.Expression(
+        om.BOUNDARY, rule=lambda m, s: block.storage_content[nodes[s], last]
+    )
+    om.fix_end = po.Constraint(
+        om.BOUNDARY, rule=lambda m, s: m.boundary_end[s] == m.level_end[s]
+    )
+    om.fix_end.deactivate()
+
+    om.objective.deactivate()
+    om.decomposition_objective = po.Objective(
+        expr=om.objective.expr + sum(
+            om.price_end[s] * om.boundary_end[s]
+            - om.price_start[s] * om.boundary_start[s]
+            for s in om.BOUNDARY
+        )
+    )
+
+    return om
+
+
+def register_blocks(run, blocks):
+    """
+    Store the static data of blocks in this process, e.g. as initializer
+    of a worker process.
+
+    Parameters
+    ----------
+    run : str
+    blocks : dict
+        Per block number a dict with 'builder_kwargs', 'storages',
+        'solver', 'first' and 'last', and optionally 'profiles', the
+        (handle, start, stop) of the rows of the block in shared memory
+        if the builder arguments hold none.
+    """
+    for k, data in blocks.items():
+        _BLOCKS[(run, k)] = data
+
+
+def _initialize(threads, memory, run, blocks):
+    initialize_worker(threads, memory)
+    register_blocks(run, blocks)
+
+
+def release_blocks(run):
+    """Drop the static data and models of the blocks of a run."""
+    for store in (_BLOCKS, _MODELS):
+        for key in [k for k in store if k[0] == run]:
+            del store[key]
+
+
+def _model(key):
+    if key not in _MODELS:
+        static = _BLOCKS[key]
+        builderKwargs = static['builder_kwargs']
+        if 'profiles' in static:
+            handle, start, stop = static['profiles']
+            builderKwargs = dict(
+                builderKwargs,
+                profiles=attach_frame(handle, 'profiles', start, stop)
+            )
+        om = build_model(**builderKwargs)
+        _MODELS[key] = add_boundary(om, static['storages'])
+    return _MODELS[key]
+
+
+def solve_block(task):
+    """
+    Solve one block with the given prices and boundary levels.
+
+    Parameters
+    ----------
+    task : dict
+        'run', 'block', 'price_start', 'price_end', 'level_start',
+        'level_end' and 'results'. The prices and levels are dicts by
+        storage label; a level of None leaves the boundary free. The
+        initial levels of the first block are always the ones of the
+        fleet. The static data of the block must have been registered in
+        this process, see :func:`register_blocks`.
+
+    Returns
+    -------
+    dict
+        Termination condition, the costs and the Lagrangian objective of
+        the block, the boundary levels and, if requested, the string keyed
+        results.
+    """
+    key = (task['run'], task['block'])
+    static = _BLOCKS[key]
+    om = _model(key)
+    block = om.GenericStorageBlock
+    nodes = {str(n.label): n for n in block.STORAGES}
+
+    for s in static['storages']:
+        om.price_start[s] = 0 if static['first'] else task['price_start'][s]
+        om.price_end[s] = 0 if static['last'] else task['price_end'][s]
+        if not static['first']:
+            init = block.init_content[nodes[s]]
+            if task['level_start'] is None:
+                init.unfix()
+            else:
+                init.fix(task['level_start'][s])
+        if static['last'] or task['level_end'] is None:
+            om.fix_end[s].deactivate()
+        else:
+            om.level_end[s] = task['level_end'][s]
+            om.fix_end[s].activate()
+
+    solverResults = solve(
+        om, solver=static['solver'], solve_kwargs={'tee': False}
+    )
+    termination = str(solverResults['Solver'][0]['Termination condition'])
+    result = {'block': task['block'], 'termination': termination}
+    if termination != 'optimal':
+        return result
+
+    result.update({
+        'costs': po.value(om.objective.expr),
+        'objective': po.value(om.decomposition_objective),
+        'start': {s: po.value(om.boundary_start[s]) for s in om.BOUNDARY},
+        'end': {s: po.value(om.boundary_end[s]) for s in om.BOUNDARY}
+    })
+    if task['results']:
+        result['results'] = convert_keys_to_strings(om.results())
+
+    return result
+
+
+def _concat(parts):
+    """Join the results of consecutive blocks along the time axis."""
+    results = {}
+    for key in parts[0]:
+        results[key] = {
+            'sequences': pd.concat(
+                [p[key]['sequences'] for p in parts if key in p]
+            ),
+            'scalars': parts[0][key]['scalars']
+        }
+    return results
+
+
+class Decomposition:
+    """
+    Lagrangian decomposition of an example into blocks of timesteps.
+
+    Parameters
+    ----------
+    profiles : pandas.DataFrame
+        Input data of the whole horizon with numeric columns, see
+        `tools.examples`.
+    block : int
+        Number of timesteps per block.
+    number : int
+        Number of the example.
+    storages : tuple
+        Labels of the storages coupling the blocks.
+    solver : str
+    processes : int
+        Number of worker processes. Every process owns a fixed set of
+        blocks, receives their static data once, reads their profiles
+        from shared memory and keeps their models. The cores and memory
+        of the node are split between the workers, see
+        `tools.resources.plan`.
+    step : float
+        Initial step length of the price updates for iterations without
+        upper bound, in cost units per unit of storage content.
+    start, freq :
+        Passed to `pandas.date_range`.
+    **kwargs :
+        Passed to `tools.examples.build_model`.
+    """
+
+    def __init__(self, profiles, block, number=4,
+                 storages=('storage_battery',), solver='cbc', processes=None,
+                 step=1e-6, start='20/8/2020', freq='H', **kwargs):
+        self.run = uuid.uuid4().hex
+        self.storages = tuple(storages)
+        self.solver = solver
+        self.processes = processes or 1
+        self.step = step
+
+        fleet = read_fleet(REGISTER)
+        fleet = fleet[fleet['label'].isin(EXAMPLE_UNITS[number])]
+        timeIdx = pd.date_range(start=start, periods=len(profiles), freq=freq)
+
+        self.profiles = profiles
+        self.block = block
+        self.blocks = []
+        for k in range(math.ceil(len(profiles) / block)):
+            part = profiles.iloc[k * block:(k + 1) * block]
+            self.blocks.append(dict(
+                number=number,
+                profiles=part.reset_index(drop=True),
+                fleet=fleet,
+                start=timeIdx[k * block],
+                freq=freq,
+                **kwargs
+            ))
+
+        n = len(self.blocks) - 1
+        self.prices = {s: np.zeros(n) for s in self.storages}
+        self.lower_bound = -math.inf
+        self.upper_bound = math.inf
+        self.levels = None
+        self.history = []
+        self._pool = None
+
+    def _static(self, blocks, handle=None):
+        last = len(self.blocks) - 1
+        static = {}
+        for k in blocks:
+            static[k] = {
+                'builder_kwargs': self.blocks[k],
+                'storages': self.storages,
+                'solver': self.solver,
+                'first': k == 0,
+                'last': k == last
+            }
+            if handle is not None:
+                static[k]['builder_kwargs'] = {
+                    key: value for key, value in self.blocks[k].items()
+                    if key != 'profiles'
+                }
+                static[k]['profiles'] = (
+                    handle, k * self.block, (k + 1) * self.block
+                )
+        return static
+
+    def _tasks(self, level_start=None, level_end=None, results=False):
+        last = len(self.blocks) - 1
+        for k in range(len(self.blocks)):
+            yield {
+                'run': self.run,
+                'block': k,
+                'price_start': {
+                    s: self.prices[s][k - 1] for s in self.storages
+                } if k > 0 else None,
+                'price_end': {
+                    s: self.prices[s][k] for s in self.storages
+                } if k < last else None,
+                'level_start': (
+                    level_start[k] if level_start is not None else None
+                ),
+                'level_end': level_end[k] if level_end is not None else None,
+                'results': results
+            }
+
+    def _solve(self, tasks):
+        tasks = list(tasks)
+        if self._pool is None:
+            return [solve_block(t) for t in tasks]
+        futures = [
+            self._pool[t['block'] % len(self._pool)].submit(solve_block, t)
+            for t in tasks
+        ]
+        return [f.result() for f in futures]
+
+    def _mean_levels(self, solutions):
+        return [
+            {s: 0.5 * (solutions[k]['end'][s] + solutions[k + 1]['start'][s])
+             for s in self.storages}
+            for k in range(len(self.blocks) - 1)
+        ]
+
+    def _recover(self, levels, results=False):
+        """Fix the boundaries to the given levels and solve again."""
+        recovered = self._solve(self._tasks(
+            level_start=[None] + levels, level_end=levels + [None],
+            results=results
+        ))
+        if any(r['termination'] != 'optimal' for r in recovered):
+            return math.inf, recovered
+        return sum(r['costs'] for r in recovered), recovered
+
+    def solve(self, iterations=50, tolerance=1e-3, gap=1e-3, theta=1.0):
+        """
+        Iterate price updates until the blocks agree on the storage levels.
+
+        Parameters
+        ----------
+        iterations : int
+            Maximum number of iterations.
+        tolerance : float
+            Maximum violation of the coupling constraints relative to the
+            largest boundary level.
+        gap : float
+            Relative gap between the bounds to stop at.
+        theta : float
+            Factor of the Polyak step length once an upper bound is known;
+            halved whenever the lower bound did not improve for five
+            iterations.
+
+        Returns
+        -------
+        dict
+            Results of the best recovered solution of the whole horizon
+            with string keys; None if no feasible solution was recovered.
+        """
+        shared = None
+        if self.processes > 1:
+            shared = SharedArrays({'profiles': self.profiles})
+            workers = min(self.processes, len(self.blocks))
+            budget = plan(len(self.blocks), processes=workers)
+            self._pool = [
+                ProcessPoolExecutor(
+                    max_workers=1, initializer=_initialize,
+                    initargs=(
+                        budget['threads'], budget['memory'], self.run,
+                        self._static(
+                            range(w, len(self.blocks), workers),
+                            shared.handle
+                        )
+                    )
+                )
+                for w in range(workers)
+            ]
+        else:
+            register_blocks(self.run, self._static(range(len(self.blocks))))
+        try:
+            stall = 0
+            for it in range(iterations):
+                solutions = self._solve(self._tasks())
+                failed = [
+                    s['block'] for s in solutions
+                    if s['termination'] != 'optimal'
+                ]
+                if failed:
+                    raise ValueError(
+                        'Blocks {0} not solved to optimality.'.format(failed)
+                    )
+
+                dual = sum(s['objective'] for s in solutions)
+                if dual > self.lower_bound:
+                    self.lower_bound = dual
+                    stall = 0
+                else:
+                    stall += 1
+                    if stall >= 5:
+                        theta, stall = theta / 2, 0
+
+                violation = {
+                    s: np.array([
+                        solutions[k]['end'][s] - solutions[k + 1]['start'][s]
+                        for k in range(len(self.blocks) - 1)
+                    ])
+                    for s in self.storages
+                }
+                levels = self._mean_levels(solutions)
+                costs, _ = self._recover(levels)
+                if costs < self.upper_bound:
+                    self.upper_bound, self.levels = costs, levels
+
+                scale = max(
+                    [abs(v) for s in solutions for v in s['end'].values()]
+                    + [1.0]
+                )
+                norm = sum(float(v @ v) for v in violation.values())
+                maxViolation = max(
+                    [float(np.abs(v).max()) for v in violation.values()
+                     if len(v)] + [0.0]
+                )
+                self.history.append({
+                    'iteration': it,
+                    'lower_bound': self.lower_bound,
+                    'upper_bound': self.upper_bound,
+                    'violation': maxViolation
+                })
+
+                if maxViolation <= tolerance * scale or norm == 0:
+                    break
+                if (self.upper_bound - self.lower_bound
+                        <= gap * abs(self.upper_bound)):
+                    break
+
+                if math.isinf(self.upper_bound):
+                    length = self.step / (it + 1)
+                else:
+                    length = theta * (self.upper_bound - dual) / norm
+                for s in self.storages:
+                    self.prices[s] += length * violation[s]
+
+            if self.levels is None:
+                return None
+            _, recovered = self._recover(self.levels, results=True)
+            return _concat([r['results'] for r in recovered])
+        finally:
+            if self._pool is not None:
+                for pool in self._pool:
+                    pool.shutdown()
+                self._pool = None
+            if shared is not None:
+                shared.close()
+            release_blocks(self.run)
+
+
+def decompose(profiles, block, number=4, storages=('storage_battery',),
+              solver='cbc', processes=None, iterations=50, tolerance=1e-3,
+              gap=1e-3, **kwargs):
+    """Solve an example by temporal decomposition, see
+    :class:`Decomposition`."""
+    return Decomposition(
+        profiles, block, number=number, storages=storages, solver=solver,
+        processes=processes, **kwargs
+    ).solve(iterations=iterations, tolerance=tolerance, gap=gap)
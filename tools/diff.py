@@ -0,0 +1,291 @@
+"""
+General description
+-------------------
+Comparison of the dispatch and inertia of several runs.
+
+Examples 1 to 4 add one asset at a time; :class:`Comparison` shows what
+each step changes. The results of all runs are aligned once:
+
+* the result keys of all runs are united, a component missing in a run
+  has zero flow and is not committed,
+* the timesteps are restricted to those common to all runs.
+
+Every variable of every run is stacked into one matrix of the same shape,
+so the deltas of any pair of runs are array subtractions, also for
+hundreds of pairs. :meth:`Comparison.delta_table` gives the energy and
+commitment deltas per flow, :meth:`Comparison.deltas` the deltas of CO2,
+synchronous and synthetic kinetic energy and committed units per
+timestep and :meth:`Comparison.summary` one row per pair::
+
+    runs = {'example_{0}'.format(n): results[n] for n in (1, 2, 3, 4)}
+    comparison = Comparison(runs, energysystems)
+    comparison.summary()
+
+All results must have string keys, see tools/kpi.py.
+"""
+
+import numpy as np
+import pandas as pd
+
+from tools.kpi import _index, emissions, inertia, timestep_hours
+
+
+# variables of the flows that are compared
+VARIABLES = ('flow', 'source_inertia')
+
+# absolute differences below this are ignored
+TOLERANCE = 1e-6
+
+
+def _common_index(runs):
+    index = None
+    for results in runs.values():
+        other = _index(results)
+        index = other if index is None else index.intersection(other)
+    return index
+
+
+class Comparison:
+    """
+    Results of several runs aligned by result key and timestep.
+
+    Parameters
+    ----------
+    runs : dict
+        Results with string keys by run name.
+    energysystems : dict
+        Energy systems by run name, needed for the inertia deltas; runs
+        without energy system have none.
+    emission_factors : dict
+        See `tools.kpi.emissions`.
+    variables : iterable
+        Variables of the flows to compare.
+
+    Attributes
+    ----------
+    names : list
+    keys : list
+        (source, target) of all flows of all runs.
+    index : pandas.Index
+        The timesteps common to all runs.
+    values : dict
+        numpy.ndarray of shape (runs, timesteps, keys) by variable.
+    present : numpy.ndarray
+        Whether a flow is part of a run, shape (runs, keys).
+    series : dict
+        pandas.DataFrame of CO2 and inertia per timestep by run name.
+    """
+
+    def __init__(self, runs, energysystems=None, emission_factors=None,
+                 variables=VARIABLES):
+        energysystems = energysystems or {}
+        self.names = list(runs)
+        self.index = _common_index(runs)
+        self.keys = list(dict.fromkeys(
+            k for results in runs.values() for k in results
+            if isinstance(k, tuple) and k[1] is not None
+            and any(v in results[k]['sequences'] for v in variables)
+        ))
+        self.hours = timestep_hours(self.index)
+
+        positions = {k: n for n, k in enumerate(self.keys)}
+        shape = (len(runs), len(self.index), len(self.keys))
+        self.values = {v: np.zeros(shape) for v in variables}
+        self.present = np.zeros((len(runs), len(self.keys)), dtype=bool)
+        self.series = {}
+
+        for n, (name, results) in enumerate(runs.items()):
+            rows = _index(results).get_indexer(self.index)
+            for key in results:
+                if key not in positions:
+                    continue
+                sequences = results[key]['sequences']
+                column = positions[key]
+                self.present[n, column] = True
+                for variable, values in self.values.items():
+                    if variable in sequences:
+                        values[n, :, column] = (
+                            sequences[variable].to_numpy()[rows]
+                        )
+
+            kwargs = (
+                {} if emission_factors is None
+                else {'emission_factors': emission_factors}
+            )
+            series = pd.DataFrame(
+                {'co2': emissions(results, **kwargs).to_numpy()[rows]},
+                index=self.index
+            )
+            if name in energysystems:
+                ine = inertia(results, energysystems[name])
+                for column in ('kinetic_energy_synchronous',
+                               'kinetic_energy_synthetic',
+                               'shortfall_synchronous', 'shortfall_system'):
+                    series[column] = ine[column].to_numpy()[rows]
+            self.series[name] = series
+
+        for values in self.values.values():
+            np.nan_to_num(values, copy=False)
+
+    def _position(self, name):
+        return self.names.index(name)
+
+    def delta_table(self, base, other, tolerance=TOLERANCE):
+        """
+        Deltas per flow between two runs.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per flow: the energy of both runs and its delta, the
+            largest absolute flow delta, the number of committed timesteps
+            of both runs and the number of timesteps with changed
+            commitment. Flows that are unchanged within `tolerance` are
+            dropped.
+        """
+        a, b = self._position(base), self._position(other)
+        df = pd.DataFrame(
+            index=pd.MultiIndex.from_tuples(
+                self.keys, names=['source', 'target']
+            )
+        )
+        df['present_base'] = self.present[a]
+        df['present_other'] = self.present[b]
+        changed = df['present_base'] != df['present_other']
+
+        if 'flow' in self.values:
+            flows = self.values['flow']
+            energy = np.einsum('rtk,t->rk', flows[[a, b]], self.hours)
+            delta = flows[b] - flows[a]
+            df['energy_base'] = energy[0]
+            df['energy_other'] = energy[1]
+            df['energy_delta'] = energy[1] - energy[0]
+            df['flow_max_abs_delta'] = np.abs(delta).max(axis=0)
+            changed |= df['flow_max_abs_delta'] > tolerance
+
+        if 'source_inertia' in self.values:
+            committed = np.round(self.values['source_inertia'][[a, b]])
+            df['committed_base'] = committed[0].sum(axis=0)
+            df['committed_other'] = committed[1].sum(axis=0)
+            df['commitment_changes'] = (
+                committed[0] != committed[1]
+            ).sum(axis=0)
+            changed |= df['commitment_changes'] > 0
+
+        return df[changed.to_numpy()]
+
+    def deltas(self, base, other):
+        """
+        Deltas of CO2, kinetic energies, shortfalls and the number of
+        committed units per timestep, other minus base.
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        df = self.series[other] - self.series[base]
+        if 'source_inertia' in self.values:
+            committed = np.round(
+                self.values['source_inertia'][
+                    [self._position(base), self._position(other)]
+                ]
+            ).sum(axis=2)
+            df['committed_units'] = committed[1] - committed[0]
+        return df.dropna(axis=1, how='all')
+
+    def pair_summary(self, base, other, tolerance=TOLERANCE):
+        """Totals of the deltas between two runs as pandas.Series."""
+        a, b = self._position(base), self._position(other)
+        added = self.present[b] & ~self.present[a]
+        removed = self.present[a] & ~self.present[b]
+        row = {
+            'flows_added': int(added.sum()),
+            'flows_removed': int(removed.sum())
+        }
+        if 'flow' in self.values:
+            delta = self.values['flow'][b] - self.values['flow'][a]
+            row['energy_abs_delta'] = float(
+                self.hours @ np.abs(delta).sum(axis=1)
+            )
+            row['flows_changed'] = int(
+                (np.abs(delta).max(axis=0) > tolerance).sum()
+            )
+        if 'source_inertia' in self.values:
+            committed = np.round(self.values['source_inertia'][[a, b]])
+            row['commitment_changes'] = int(
+                (committed[0] != committed[1]).sum()
+            )
+
+        deltas = self.deltas(base, other)
+        row['co2_base'] = float(self.series[base]['co2'].sum())
+        row['co2_delta'] = float(deltas['co2'].sum())
+        for column in ('kinetic_energy_synchronous',
+                       'kinetic_energy_synthetic'):
+            if column in deltas:
+                row[column + '_mean_delta'] = float(deltas[column].mean())
+                row[column + '_min_delta'] = float(
+                    self.series[other][column].min()
+                    - self.series[base][column].min()
+                )
+        for column in ('shortfall_synchronous', 'shortfall_system'):
+            if column in deltas:
+                row[column + '_steps_delta'] = int(
+                    (self.series[other][column] > 0).sum()
+                    - (self.series[base][column] > 0).sum()
+                )
+        return pd.Series(row, name=(base, other))
+
+    def summary(self, pairs=None, base=None, tolerance=TOLERANCE):
+        """
+        One row of totals per pair of runs, see :meth:`pair_summary`.
+
+        Parameters
+        ----------
+        pairs : iterable
+            (base, other) run names; by default every run is compared
+            with the run before it, or with `base` if given.
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        if pairs is None:
+            if base is None:
+                pairs = zip(self.names[:-1], self.names[1:])
+            else:
+                pairs = [(base, n) for n in self.names if n != base]
+        rows = [self.pair_summary(a, b, tolerance) for a, b in pairs]
+        df = pd.DataFrame(rows)
+        df.index = pd.MultiIndex.from_tuples(
+            [r.name for r in rows], names=['base', 'other']
+        )
+        return df
+
+
+def compare(base, other, energysystems=(None, None),
+            tolerance=TOLERANCE):
+    """
+    Summary and delta table of two runs.
+
+    Parameters
+    ----------
+    base, other : dict
+        Results with string keys.
+    energysystems : tuple
+        Energy systems of both runs for the inertia deltas.
+
+    Returns
+    -------
+    tuple
+        (pandas.Series, pandas.DataFrame), see
+        :meth:`Comparison.pair_summary` and :meth:`Comparison.delta_table`.
+    """
+    comparison = Comparison(
+        {'base': base, 'other': other},
+        {n: es for n, es in zip(('base', 'other'), energysystems)
+         if es is not None}
+    )
+    return (
+        comparison.pair_summary('base', 'other', tolerance),
+        comparison.delta_table('base', 'other', tolerance)
+    )
@@ -0,0 +1,164 @@
+"""
+General description
+-------------------
+Builders for the energy systems of the examples.
+
+The energy systems of examples 1 to 4 are built from the fleet register of
+Example 5. Each example adds units to the previous one:
+
+* Example 1: four fossil fuel transformers
+* Example 2: additionally wind turbine and solar PV
+* Example 3: additionally a synchronous condenser
+* Example 4: additionally a battery storage unit
+
+The builders are plain module level functions so that they can be passed
+to worker processes.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import opinmod as oim
+
+from tools.fleet import add_fleet, read_fleet
+from tools.resample import resample_profiles, step_hours
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REGISTER = os.path.join(ROOT, 'example_5', 'fleet_register.csv')
+
+EXAMPLE_UNITS = {
+    1: (
+        'transformer_hard_coal',
+        'transformer_natural_gas',
+        'transformer_oil',
+        'transformer_lignite'
+    )
+}
+EXAMPLE_UNITS[2] = EXAMPLE_UNITS[1] + ('source_wind', 'source_pv')
+EXAMPLE_UNITS[3] = EXAMPLE_UNITS[2] + ('storage_condenser',)
+EXAMPLE_UNITS[4] = EXAMPLE_UNITS[3] + ('storage_battery',)
+
+INERTIA_REQUIREMENTS = {
+    'minimum_system_synchronous_inertia': 1963.6,
+    'minimum_system_inertia': 3963.3,
+    'emulated_inertia_constant': 3.5
+}
+
+DEMAND = 85*10**6
+
+
+def read_profiles(number=4, periods=None):
+    """
+    Read the input data of an example.
+
+    If `periods` exceeds the length of the input data, the profiles are
+    repeated to cover the requested number of timesteps.
+    """
+    profiles = pd.read_csv(
+        os.path.join(ROOT, 'example_{0}'.format(number), 'input_data.csv')
+    )
+    if periods is not None:
+        repeats = int(np.ceil(periods / len(profiles)))
+        profiles = pd.concat(
+            [profiles] * repeats, ignore_index=True
+        ).iloc[:periods]
+    return profiles
+
+
+def build_energysystem(number=4, periods=None, profiles=None, fleet=None,
+                       start='20/8/2020', freq='H', profiles_freq=None,
+                       resampling='mean', **kwargs):
+    """
+    Build the energy system of an example.
+
+    Parameters
+    ----------
+    number : int
+        Number of the example, 1 to 4.
+    periods : int
+        Number of timesteps; defaults to the length of the profiles.
+    profiles : pandas.DataFrame
+        Columns 'demand_el', 'wind' and 'pv'; read from the example's
+        input_data.csv if None.
+    fleet : str or pandas.DataFrame
+        Path of a fleet register or a register returned by `read_fleet`;
+        defaults to the register of Example 5 restricted
+        to the units of the example.
+    start, freq :
+        Passed to `pandas.date_range`.
+    profiles_freq : str
+        Timestep of the rows of the profiles; the profiles are resampled
+        if it differs from `freq`, see `tools.resample.resample_profiles`.
+        Defaults to `freq` for given profiles and to hourly for the
+        profiles read from input_data.csv.
+    resampling : str
+        Resampling method, 'mean' or 'interpolate'.
+    **kwargs :
+        Overwrite the inertia requirements of the energy system.
+
+    Returns
+    -------
+    oim.EnergySystem
+    """
+    if profiles_freq is None:
+        profiles_freq = 'H' if profiles is None else freq
+    ratio = step_hours(profiles_freq) / step_hours(freq)
+    if profiles is None:
+        profiles = read_profiles(
+            number,
+            periods=None if periods is None else int(np.ceil(periods / ratio))
+        )
+    if ratio != 1:
+        profiles = resample_profiles(
+            profiles, freq, source_freq=profiles_freq, periods=periods,
+            method=resampling
+        )
+    if fleet is None:
+        fleet = read_fleet(REGISTER)
+        fleet = fleet[fleet['label'].isin(EXAMPLE_UNITS[number])]
+
+    timeIdx = pd.date_range(
+        start=start,
+        periods=len(profiles) if periods is None else periods,
+        freq=freq
+    )
+
+    energysystem = oim.EnergySystem(
+        timeindex=timeIdx,
+        **dict(INERTIA_REQUIREMENTS, **kwargs)
+    )
+
+    busElectricity = oim.Bus(label='bus_electricity')
+    busInertia = oim.Bus(label='bus_inertia', balanced=False)
+
+    energysystem.add(
+        busElectricity,
+        busInertia,
+        oim.Sink(
+            label='sink_load',
+            inputs={
+                busElectricity: oim.Flow(
+                    nominal_value=DEMAND,
+                    fix=profiles['demand_el'].to_list()
+                )
+            }
+        ),
+        oim.Sink(
+            label='sink_excess',
+            inputs={busElectricity: oim.Flow(variable_costs=1)}
+        )
+    )
+    add_fleet(
+        energysystem, fleet, busElectricity, busInertia, profiles=profiles
+    )
+
+    return energysystem
+
+
+def build_model(number=4, **kwargs):
+    """Build the energy system of an example and its `oim.Model`."""
+    return oim.Model(build_energysystem(number, **kwargs))
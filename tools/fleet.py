@@ -0,0 +1,318 @@
+"""
+General description
+-------------------
+Bulk loader for plant fleets given as a tabular register.
+
+Every row of the register describes one unit, i.e. one `oim.Transformer`,
+`oim.Source` or `oim.GenericStorage` together with its electricity `Flow`
+and its `Inertia` output. The register is validated column-wise and the
+unit conversion is applied to whole columns before any OpInMod object is
+created, so that the per-unit work is reduced to the object instantiation.
+All created nodes are added to the energy system with a single
+`energysystem.add` call.
+
+Register columns
+----------------
+* label: unique label of the unit
+* component: 'transformer', 'source' or 'storage'
+* fuel: commodity of a transformer, e.g. 'hard_coal'; the bus 'bus_<fuel>'
+  and the source 'source_<fuel>' are created if they do not exist yet
+* nominal_value [MW]
+* variable_costs
+* conversion_factor: electrical efficiency of a transformer
+* inertia_constant [s]
+* inertia_costs
+* apparent_power [MVA]
+* provision_type: see `PROVISION_TYPES`
+* minimum_stable_operation
+* inertia_power_share
+* profile: column of the input data used as fixed feed-in of a source
+* nominal_storage_capacity [MWh]
+* initial_storage_level
+* balanced
+* outflow_conversion_factor
+
+Empty cells are not passed to OpInMod, i.e. the OpInMod defaults apply.
+"""
+
+import pandas as pd
+
+import opinmod as oim
+
+
+COMPONENTS = ('transformer', 'source', 'storage')
+
+PROVISION_TYPES = (
+    'synchronous_generator',
+    'synchronous_storage',
+    'synthetic_wind',
+    'synthetic_storage',
+    'none'
+)
+
+# columns given in MW, MVA or MWh; OpInMod works in W, VA and Wh
+SCALED_COLUMNS = ('nominal_value', 'apparent_power', 'nominal_storage_capacity')
+
+NUMERIC_COLUMNS = (
+    'nominal_value',
+    'variable_costs',
+    'conversion_factor',
+    'inertia_constant',
+    'inertia_costs',
+    'apparent_power',
+    'minimum_stable_operation',
+    'inertia_power_share',
+    'nominal_storage_capacity',
+    'initial_storage_level',
+    'outflow_conversion_factor'
+)
+
+INERTIA_COLUMNS = (
+    'inertia_constant',
+    'inertia_costs',
+    'apparent_power',
+    'provision_type',
+    'minimum_stable_operation',
+    'inertia_power_share'
+)
+
+
+def read_fleet(register, scale=10**6):
+    """
+    Read, validate and convert a fleet register.
+
+    Parameters
+    ----------
+    register : str or pandas.DataFrame
+        Path of a csv file or a DataFrame with the register columns.
+    scale : float
+        Factor applied to the columns in `SCALED_COLUMNS`. The default
+        converts MW, MVA and MWh to the W, VA and Wh used in the examples.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The validated register indexed by label.
+    """
+    if isinstance(register, pd.DataFrame):
+        fleet = register.copy()
+    else:
+        fleet = pd.read_csv(register)
+
+    for column in NUMERIC_COLUMNS + ('label', 'component', 'fuel',
+                                     'provision_type', 'profile', 'balanced'):
+        if column not in fleet.columns:
+            fleet[column] = float('nan')
+
+    for column in ('component', 'fuel', 'provision_type', 'profile'):
+        fleet[column] = fleet[column].map(
+            lambda x: x.strip() if isinstance(x, str) else x
+        )
+    fleet['component'] = fleet['component'].map(
+        lambda x: x.lower() if isinstance(x, str) else x
+    )
+    for column in NUMERIC_COLUMNS:
+        fleet[column] = pd.to_numeric(fleet[column], errors='coerce')
+
+    validate_fleet(fleet)
+
+    scaled = list(SCALED_COLUMNS)
+    fleet[scaled] = fleet[scaled] * scale
+    fleet['balanced'] = fleet['balanced'].map(
+        lambda x: str(x).strip().lower() == 'true' if pd.notna(x) else x
+    )
+
+    fleet = fleet.set_index('label', drop=False)
+    fleet.attrs['validated'] = True
+
+    return fleet
+
+
+def validate_fleet(fleet):
+    """
+    Check a fleet register column-wise.
+
+    Raises a ValueError naming the offending units for every violated
+    rule.
+    """
+    errors = []
+
+    def _check(mask, msg):
+        if mask.any():
+            labels = ', '.join(fleet.loc[mask, 'label'].astype(str))
+            errors.append('{0}: {1}'.format(msg, labels))
+
+    _check(fleet['label'].isna(), 'missing label in rows')
+    _check(fleet['label'].duplicated(keep=False), 'duplicated label')
+    _check(~fleet['component'].isin(COMPONENTS), 'unknown component')
+    _check(
+        fleet['provision_type'].notna()
+        & ~fleet['provision_type'].isin(PROVISION_TYPES),
+        'unknown provision_type'
+    )
+    _check(fleet['nominal_value'].isna(), 'missing nominal_value')
+    _check(fleet['nominal_value'] < 0, 'negative nominal_value')
+    _check(fleet['apparent_power'] < 0, 'negative apparent_power')
+    _check(
+        (fleet['minimum_stable_operation'] < 0)
+        | (fleet['minimum_stable_operation'] > 1),
+        'minimum_stable_operation outside [0, 1]'
+    )
+    _check(
+        (fleet['inertia_power_share'] < 0)
+        | (fleet['inertia_power_share'] > 1),
+        'inertia_power_share outside [0, 1]'
+    )
+
+    transformer = fleet['component'] == 'transformer'
+    _check(transformer & fleet['fuel'].isna(), 'transformer without fuel')
+    _check(
+        transformer
+        & ~((fleet['conversion_factor'] > 0)
+            & (fleet['conversion_factor'] <= 1)),
+        'conversion_factor outside (0, 1]'
+    )
+
+    synchronous = fleet['provision_type'].isin(PROVISION_TYPES[:2])
+    _check(
+        synchronous & fleet['inertia_constant'].isna(),
+        'synchronous unit without inertia_constant'
+    )
+    _check(
+        fleet['provision_type'].notna() & fleet['apparent_power'].isna(),
+        'inertia provision without apparent_power'
+    )
+
+    storage = fleet['component'] == 'storage'
+    _check(
+        storage & fleet['nominal_storage_capacity'].isna(),
+        'storage without nominal_storage_capacity'
+    )
+
+    if errors:
+        raise ValueError(
+            'Invalid fleet register:\n' + '\n'.join(errors)
+        )
+
+
+def _kwargs(row, columns):
+    """Return the non-empty cells of a register row as keyword arguments."""
+    return {
+        k: row[k] for k in columns
+        if not (isinstance(row[k], float) and row[k] != row[k])
+    }
+
+
+def build_fleet(fleet, bus_electricity, bus_inertia, profiles=None,
+                buses=None):
+    """
+    Create the OpInMod nodes of a fleet register.
+
+    Parameters
+    ----------
+    fleet : pandas.DataFrame
+        Register as returned by :func:`read_fleet`.
+    bus_electricity : oim.Bus
+    bus_inertia : oim.Bus
+    profiles : pandas.DataFrame
+        Feed-in profiles referenced by the 'profile' column, e.g. the
+        content of input_data.csv.
+    buses : dict
+        Existing fuel buses keyed by label. Missing fuel buses and their
+        sources are created and added to this dict.
+
+    Returns
+    -------
+    list
+        All created nodes, fuel buses and sources first.
+    """
+    if buses is None:
+        buses = {}
+    nodes = []
+
+    for fuel in fleet['fuel'].dropna().unique():
+        label = 'bus_' + fuel
+        if label not in buses:
+            buses[label] = oim.Bus(label=label)
+            nodes.append(buses[label])
+            nodes.append(
+                oim.Source(
+                    label='source_' + fuel,
+                    outputs={buses[label]: oim.Flow()}
+                )
+            )
+
+    for row in fleet.to_dict('records'):
+        flow = _kwargs(row, ('nominal_value', 'variable_costs'))
+        outputs = {bus_electricity: oim.Flow(**flow)}
+        if isinstance(row['provision_type'], str):
+            outputs[bus_inertia] = oim.Inertia(
+                **_kwargs(row, INERTIA_COLUMNS)
+            )
+
+        if row['component'] == 'transformer':
+            fuelBus = buses['bus_' + row['fuel']]
+            nodes.append(
+                oim.Transformer(
+                    label=row['label'],
+                    inputs={fuelBus: oim.Flow()},
+                    outputs=outputs,
+                    conversion_factors={
+                        bus_electricity: row['conversion_factor']
+                    }
+                )
+            )
+        elif row['component'] == 'source':
+            if isinstance(row['profile'], str):
+                outputs[bus_electricity] = oim.Flow(
+                    fix=profiles[row['profile']].to_list(),
+                    **flow
+                )
+            nodes.append(
+                oim.Source(label=row['label'], outputs=outputs)
+            )
+        else:
+            nodes.append(
+                oim.GenericStorage(
+                    label=row['label'],
+                    inputs={
+                        bus_electricity: oim.Flow(
+                            nominal_value=row['nominal_value']
+                        )
+                    },
+                    outputs=outputs,
+                    **_kwargs(row, (
+                        'nominal_storage_capacity',
+                        'initial_storage_level',
+                        'balanced',
+                        'outflow_conversion_factor'
+                    ))
+                )
+            )
+
+    return nodes
+
+
+def add_fleet(energysystem, fleet, bus_electricity, bus_inertia,
+              profiles=None, buses=None):
+    """
+    Read a fleet register and add all its nodes to an energy system.
+
+    The nodes are added with one `energysystem.add` call. See
+    :func:`build_fleet` for the parameters; `fleet` may also be a path or
+    an unvalidated DataFrame.
+
+    Returns
+    -------
+    dict
+        The created nodes keyed by label.
+    """
+    if not (isinstance(fleet, pd.DataFrame) and fleet.attrs.get('validated')):
+        fleet = read_fleet(fleet)
+
+    nodes = build_fleet(
+        fleet, bus_electricity, bus_inertia, profiles=profiles, buses=buses
+    )
+    energysystem.add(*nodes)
+
+    return {n.label: n for n in nodes}
@@ -0,0 +1,274 @@
+"""
+General description
+-------------------
+Tighter formulation of the inertia commitment of an `oim.Model`.
+
+The binary commitment `source_inertia` of the transformers is only loosely
+linked to their output, so the LP relaxation of the unit commitment is
+weak and the solver spends most of its time branching. :func:`tighten`
+adds valid inequalities that cut off fractional commitments without
+changing the integer solutions:
+
+* commitment links (optional): the output of a synchronous generator lies
+  between minimum_stable_operation * nominal_value and nominal_value if it
+  is committed and is zero otherwise,
+* coefficient reduction: in the requirement sum(S * H * u) >= E every
+  coefficient larger than E is reduced to E,
+* cardinality cuts: at least k units have to be committed, with k the
+  smallest number of units whose largest kinetic energies reach E,
+* knapsack cover cuts: for every minimal set C of units whose kinetic
+  energies exceed the slack sum(S * H) - E, at least one unit of C has to
+  be committed, sum(u[i] for i in C) >= 1.
+
+The cuts are built for the synchronous requirement and for the total
+requirement of the energy system. Timesteps with equal coefficients share
+their covers. Synthetic units enter with the emulated inertia constant of
+the energy system unless they have their own, see tools/inertia.py.
+
+The commitment links are not implied by the constraints OpInMod builds for
+the inertia flows, so they can remove solutions of the current formulation
+and change its optimum; they are only added if requested.
+
+:func:`benchmark` compares solve times and branch-and-bound nodes of both
+formulations.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from pyomo import environ as po
+
+from tools.examples import build_model, read_profiles
+from tools.inertia import SYNCHRONOUS, SYNTHETIC, InertiaTerms, kinetic_energy
+
+
+def minimal_covers(coefficients, slack, max_size=4, max_covers=50):
+    """
+    Minimal covers of the knapsack sum(a[i] * (1 - u[i])) <= slack.
+
+    Parameters
+    ----------
+    coefficients : numpy.ndarray
+        Non-negative coefficients a.
+    slack : float
+    max_size : int
+        Largest cover size that is enumerated.
+    max_covers : int
+        Largest number of covers returned.
+
+    Returns
+    -------
+    list of tuple
+        Indices of the coefficients of every cover.
+    """
+    order = [int(i) for i in np.argsort(-coefficients) if coefficients[i] > 0]
+    values = coefficients[order]
+    covers = []
+
+    def extend(cover, total, first, size):
+        if len(cover) == size:
+            # minimal: the cover is lost by removing its smallest element
+            if total > slack and total - values[cover[-1]] <= slack:
+                covers.append(tuple(order[p] for p in cover))
+            return len(covers) >= max_covers
+        missing = size - len(cover)
+        for p in range(first, len(order) - missing + 1):
+            # the values are sorted, so no later completion exceeds slack
+            if total + values[p:p + missing].sum() <= slack:
+                break
+            # supersets of a smaller cover are not minimal
+            if missing > 1 and total + values[p] > slack:
+                continue
+            if extend(cover + [p], total + values[p], p + 1, size):
+                return True
+        return False
+
+    for size in range(1, max_size + 1):
+        if extend([], 0.0, 0, size):
+            break
+    return covers
+
+
+def cardinality(coefficients, requirement):
+    """Smallest number of units whose largest coefficients reach the
+    requirement; None if the requirement can not be reached."""
+    cumulated = np.cumsum(np.sort(coefficients)[::-1])
+    reached = np.nonzero(cumulated >= requirement)[0]
+    return int(reached[0]) + 1 if len(reached) else None
+
+
+def _links(om, terms):
+    """(node, electricity bus, inertia bus, nominal value, minimum stable
+    operation) of every synchronous generator."""
+    links = []
+    for n, (i, o) in enumerate(terms.keys):
+        if terms.provision_types[n] != 'synchronous_generator':
+            continue
+        for (source, target), flow in om.flows.items():
+            if source is not i or target is o:
+                continue
+            if getattr(flow, 'nominal_value', None) is None:
+                continue
+            links.append((
+                i, target, o, flow.nominal_value,
+                getattr(om.flows[i, o], 'minimum_stable_operation', 0) or 0
+            ))
+    return links
+
+
+def tighten(om, links=False, covers=True, max_size=4, max_covers=50,
+            frequency=50):
+    """
+    Add the valid inequalities of the tight formulation to a model.
+
+    The inequalities are added to the block `om.TightInertia`.
+
+    Parameters
+    ----------
+    om : oim.Model
+    links : bool
+        Add the commitment links of the synchronous generators. They
+        assume that a generator delivering power is committed and runs
+        above its minimum stable operation, which OpInMod does not
+        enforce; off by default.
+    covers : bool
+        Add coefficient reduction, cardinality and cover cuts.
+    max_size, max_covers : int
+        See :func:`minimal_covers`; per requirement and timestep.
+    """
+    terms = InertiaTerms(om)
+    es = om.es
+    block = po.Block()
+    om.add_component('TightInertia', block)
+
+    if links:
+        unitLinks = _links(om, terms)
+        block.LINKS = po.Set(initialize=range(len(unitLinks)), ordered=True)
+
+        def _upper(b, n, t):
+            i, target, o, nominal, _ = unitLinks[n]
+            return (
+                om.flow[i, target, t]
+                <= nominal * terms.commitment[i, o, t]
+            )
+
+        def _lower(b, n, t):
+            i, target, o, nominal, minimum = unitLinks[n]
+            if not minimum:
+                return po.Constraint.Skip
+            return (
+                om.flow[i, target, t]
+                >= minimum * nominal * terms.commitment[i, o, t]
+            )
+
+        block.commitment_upper = po.Constraint(
+            block.LINKS, om.TIMESTEPS, rule=_upper
+        )
+        block.commitment_lower = po.Constraint(
+            block.LINKS, om.TIMESTEPS, rule=_lower
+        )
+
+    if covers:
+        requirements = (
+            (SYNCHRONOUS, es.minimum_system_synchronous_inertia),
+            (SYNCHRONOUS + SYNTHETIC, es.minimum_system_inertia)
+        )
+        block.cuts = po.ConstraintList()
+        cache = {}
+        for types, moment in requirements:
+            energy = kinetic_energy(moment, frequency)
+            mask = terms.mask(types)
+            keys = [k for k, m in zip(terms.keys, mask) if m]
+            for t in om.TIMESTEPS:
+                a = terms.energy(t)[mask]
+                if energy <= 0 or a.sum() < energy:
+                    continue
+                signature = (types, tuple(a))
+                if signature not in cache:
+                    cache[signature] = (
+                        cardinality(a, energy),
+                        minimal_covers(
+                            a, a.sum() - energy, max_size=max_size,
+                            max_covers=max_covers
+                        )
+                    )
+                k, unitCovers = cache[signature]
+                u = [terms.commitment[i, o, t] for (i, o) in keys]
+
+                block.cuts.add(
+                    sum(min(a[n], energy) * u[n] for n in range(len(u))
+                        if a[n] > 0)
+                    >= energy
+                )
+                if k > 1:
+                    block.cuts.add(
+                        sum(u[n] for n in range(len(u)) if a[n] > 0) >= k
+                    )
+                for cover in unitCovers:
+                    block.cuts.add(sum(u[n] for n in cover) >= 1)
+
+    return block
+
+
+def build_tight_model(number=4, links=False, covers=True, **kwargs):
+    """Build the model of an example with the tight formulation."""
+    om = build_model(number, **kwargs)
+    tighten(om, links=links, covers=covers)
+    return om
+
+
+def _nodes(solver_results):
+    try:
+        return int(
+            solver_results.solver.statistics.branch_and_bound
+            .number_of_created_subproblems
+        )
+    except (AttributeError, TypeError, ValueError):
+        return np.nan
+
+
+def benchmark(numbers=(1, 2, 3, 4), periods=(24, 168, 720), solver='cbc',
+              cmdline_options=None):
+    """
+    Compare the current and the tight formulation.
+
+    Every example is solved with both formulations for every horizon; the
+    profiles are repeated to cover long horizons.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Build and solve time, branch-and-bound nodes, objective and number
+        of constraints per example, horizon and formulation.
+    """
+    rows = []
+    for number in numbers:
+        for p in periods:
+            profiles = read_profiles(number, periods=p)
+            for formulation, builder in (
+                    ('current', build_model),
+                    ('tight', build_tight_model)):
+                start = time.time()
+                om = builder(number, profiles=profiles, periods=p)
+                built = time.time()
+                solverResults = om.solve(
+                    solver=solver,
+                    solve_kwargs={'tee': False},
+                    cmdline_options=cmdline_options or {}
+                )
+                rows.append({
+                    'example': number,
+                    'periods': p,
+                    'formulation': formulation,
+                    'build': built - start,
+                    'solve': time.time() - built,
+                    'nodes': _nodes(solverResults),
+                    'objective': po.value(om.objective, exception=False),
+                    'constraints': om.nconstraints(),
+                    'termination': str(
+                        solverResults['Solver'][0]['Termination condition']
+                    )
+                })
+
+    return pd.DataFrame(rows)
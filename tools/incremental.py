@@ -0,0 +1,279 @@
+"""
+General description
+-------------------
+Adding components to a constructed `oim.Model` in place.
+
+Examples 1 to 4 each add units to the previous energy system. Instead of
+rebuilding and re-solving the model, :func:`extend` adds nodes to an
+existing model:
+
+* the new nodes get a model of their own, built by the same model class
+  from a temporary energy system holding only the new nodes, so flows,
+  storage levels, commitment binaries and costs of the new units are
+  formulated exactly as in a full build; this model is added as block
+  'Extension_<n>' of the existing model,
+* the flows of the new nodes are added to the balances of the existing
+  buses they connect to,
+* the kinetic energy of new inertia providing units is added to the
+  rows of OpInMod's system inertia requirements, in the orientation and
+  scale of the coefficients OpInMod used for the existing units; if a
+  non-zero requirement has no rows to extend, an error is raised instead
+  of leaving the new units out,
+* the costs of the new units are added to the objective.
+
+Only the new nodes are constructed. The values of the previous solve are kept
+and the new variables start from the units being idle, which is passed
+to the solver as MIP start with `solve_kwargs={'warmstart': True}`;
+solvers discard an infeasible start.
+
+Other requirements formulated on top of the model, e.g. the per-area
+requirements of tools/multiarea.py or the cuts of tools/formulation.py,
+are not extended.
+"""
+
+import pandas as pd
+from pyomo import environ as po
+from pyomo.core.expr.numeric_expr import LinearExpression
+from pyomo.repn import generate_standard_repn
+
+import opinmod as oim
+
+from tools.examples import EXAMPLE_UNITS, REGISTER, read_profiles
+from tools.fleet import build_fleet, read_fleet
+from tools.inertia import SYNCHRONOUS, SYNTHETIC, InertiaTerms
+from tools.sensitivity import inertia_constraints
+from tools.vectorized import requirement_matrix
+
+# provision types of the units in OpInMod's system inertia requirements
+SYSTEM_REQUIREMENTS = {
+    'system_synchronous_inertia': SYNCHRONOUS,
+    'system_inertia': SYNCHRONOUS + SYNTHETIC
+}
+
+
+def node_flows(nodes):
+    """All flows into and out of the given nodes keyed by (source,
+    target)."""
+    flows = {}
+    for n in nodes:
+        flows.update({(n, o): f for o, f in n.outputs.items()})
+        flows.update({(i, n): f for i, f in n.inputs.items()})
+    return flows
+
+
+def _add_terms(constraint, coefs, variables):
+    """Add linear terms to the body of a constraint."""
+    body = constraint.body
+    if isinstance(body, LinearExpression):
+        body = LinearExpression(
+            constant=body.constant,
+            linear_coefs=list(body.linear_coefs) + list(coefs),
+            linear_vars=list(body.linear_vars) + list(variables)
+        )
+    else:
+        body = body + sum(c * v for c, v in zip(coefs, variables))
+    if constraint.equality:
+        constraint.set_value(body == constraint.upper)
+    else:
+        constraint.set_value((constraint.lower, body, constraint.upper))
+
+
+def _balances(om):
+    """The bus balance constraints of a model, keyed by bus."""
+    balances = {}
+    for c in om.component_objects(po.Constraint, active=True):
+        if c.local_name != 'balance':
+            continue
+        for index in c:
+            balances.setdefault(index[0], c)
+    return balances
+
+
+def _scale(constraint, terms):
+    """
+    Coefficient of the existing units in the rows of a system inertia
+    requirement per Ws of their kinetic energy.
+
+    OpInMod may scale the rows or state them as upper bounds; the sign and
+    factor are read from the first row holding a commitment variable of
+    a unit with kinetic energy. None if there is no such row.
+    """
+    for t, row in constraint.items():
+        energy = terms.energy(t)
+        position = {
+            id(terms.commitment[i, o, t]): k
+            for k, (i, o) in enumerate(terms.keys) if energy[k] != 0
+        }
+        repn = generate_standard_repn(row.body, compute_values=True)
+        for coef, v in zip(repn.linear_coefs, repn.linear_vars):
+            if id(v) in position:
+                return coef / energy[position[id(v)]]
+    return None
+
+
+def _start(block):
+    """Start the unset variables of a block at zero, within their
+    bounds."""
+    for v in block.component_data_objects(po.Var):
+        if v.value is None and not v.fixed:
+            value = 0
+            if v.has_lb():
+                value = max(value, po.value(v.lb))
+            if v.has_ub():
+                value = min(value, po.value(v.ub))
+            v.set_value(value)
+
+
+def extend(om, *nodes, warm_start=True):
+    """
+    Add nodes to a constructed model in place.
+
+    Parameters
+    ----------
+    om : oim.Model
+        Constructed, usually solved model.
+    *nodes :
+        New nodes connected to buses of the model.
+    warm_start : bool
+        Start the variables of the new nodes at zero, within their
+        bounds.
+
+    Returns
+    -------
+    pyomo.Block
+        The model of the new nodes, added as 'Extension_<n>'.
+
+    Raises
+    ------
+    RuntimeError
+        If new units provide inertia and a non-zero system inertia
+        requirement of the model has no rows with existing units to add
+        them to.
+    """
+    es = om.es
+    flows = node_flows(nodes)
+    inertia = any(hasattr(f, 'provision_type') for f in flows.values())
+    requirements = {}
+    if inertia:
+        terms = InertiaTerms(om)
+        constraints = {
+            c.local_name: c for c in inertia_constraints(om).values()
+        }
+        missing = []
+        for name, moment in (
+                ('system_synchronous_inertia',
+                 es.minimum_system_synchronous_inertia),
+                ('system_inertia', es.minimum_system_inertia)):
+            constraint = constraints.get(name)
+            scale = None if constraint is None else _scale(constraint, terms)
+            if scale is not None:
+                requirements[name] = (constraint, scale)
+            elif moment:
+                missing.append(name)
+        if missing:
+            raise RuntimeError(
+                'The system inertia requirements {0} of the model have no '
+                'rows with existing units, so the inertia of the new units '
+                'can not be added.'.format(missing)
+            )
+
+    # the requirements are enforced by the existing model only
+    temporary = oim.EnergySystem(
+        timeindex=es.timeindex,
+        minimum_system_synchronous_inertia=0,
+        minimum_system_inertia=0,
+        emulated_inertia_constant=es.emulated_inertia_constant
+    )
+    temporary.add(*nodes)
+    extension = type(om)(
+        temporary, auto_construct=False, timeincrement=om.timeincrement
+    )
+    extension.flows = flows
+    extension._construct()
+    for c in inertia_constraints(extension).values():
+        c.deactivate()
+    extension.objective.deactivate()
+
+    new = set(nodes)
+    balances = _balances(om)
+    for bus in {n for k in flows for n in k} - new:
+        inflows = [k for k in flows if k[1] is bus]
+        outflows = [k for k in flows if k[0] is bus]
+        if bus not in balances:
+            # e.g. the unbalanced inertia bus
+            continue
+        balance = balances[bus]
+        for t in om.TIMESTEPS:
+            _add_terms(
+                balance[bus, t],
+                [1] * len(inflows) + [-1] * len(outflows),
+                [extension.flow[i, o, t] for i, o in inflows + outflows]
+            )
+
+    if inertia:
+        terms = InertiaTerms(extension)
+        for name, (constraint, scale) in requirements.items():
+            matrix = requirement_matrix(terms, SYSTEM_REQUIREMENTS[name])
+            for t, row in constraint.items():
+                coefs, cols = matrix.row(terms.position(t))
+                _add_terms(row, (scale * coefs).tolist(), [
+                    terms.commitment[terms.keys[c][0], terms.keys[c][1], t]
+                    for c in cols
+                ])
+
+    om.objective.set_value(om.objective.expr + extension.objective.expr)
+
+    name = 'Extension_{0}'.format(
+        sum(1 for b in om.component_objects(po.Block, descend_into=False)
+            if b.local_name.startswith('Extension_')) + 1
+    )
+    om.add_component(name, extension)
+    om.flows.update(flows)
+    es.add(*nodes)
+    if warm_start:
+        _start(extension)
+
+    return extension
+
+
+def add_units(om, labels, fleet=REGISTER, profiles=None,
+              bus_electricity='bus_electricity', bus_inertia='bus_inertia'):
+    """
+    Add units of a fleet register to a constructed model.
+
+    Fuel buses and sources already in the model are reused.
+
+    Parameters
+    ----------
+    labels : iterable
+        Labels of the units in the register, e.g. ['storage_battery'].
+    fleet : str or pandas.DataFrame
+        Fleet register, see `tools.fleet.read_fleet`.
+    profiles : pandas.DataFrame
+        Feed-in profiles of the new units; those of Example 4 if None.
+
+    Returns
+    -------
+    pyomo.Block
+        See :func:`extend`.
+    """
+    if not isinstance(fleet, pd.DataFrame):
+        fleet = read_fleet(fleet)
+    if profiles is None:
+        profiles = read_profiles(4, periods=len(om.TIMESTEPS))
+    nodes = {str(n.label): n for n in om.es.nodes}
+    buses = {k: v for k, v in nodes.items() if isinstance(v, oim.Bus)}
+    new = build_fleet(
+        fleet[fleet['label'].isin(labels)], nodes[bus_electricity],
+        nodes[bus_inertia], profiles=profiles, buses=buses
+    )
+    return extend(om, *new)
+
+
+def extend_example(om, number):
+    """Add the units of example `number` missing in a model of an earlier
+    example, e.g. `extend_example(om, 4)` adds the battery to Example 3."""
+    present = {str(n.label) for n in om.es.nodes}
+    return add_units(
+        om, [u for u in EXAMPLE_UNITS[number] if u not in present]
+    )
@@ -0,0 +1,237 @@
+"""
+General description
+-------------------
+Index of the components of an energy system and their result columns.
+
+The scripts of the examples sum the inertia of hand-picked units, e.g.
+hard coal, natural gas, lignite, oil and the condenser as synchronous and
+wind and battery as synthetic inertia. A :class:`ComponentIndex` is built
+once from the nodes of an energy system and maps
+
+* provision_type ('synchronous_generator', 'synchronous_storage',
+  'synthetic_wind', 'synthetic_storage', 'none') or the groups
+  'synchronous' and 'synthetic',
+* bus,
+* label prefix, e.g. 'transformer' or 'source_wind',
+* label
+
+to the flows of the components, i.e. to the keys of the results with
+string keys. Queries are dict lookups of precomputed positions and are
+cached, so a group of thousands of units costs the same as a single unit
+and no unit is missed. The result sequences of a variable are stacked once
+per result dict, so grouped aggregations are one sum over columns.
+"""
+
+from collections import defaultdict
+import bisect
+
+import numpy as np
+import pandas as pd
+
+import opinmod as oim
+
+from tools.kpi import SYNCHRONOUS, SYNTHETIC, _index, sequence_matrix
+
+
+GROUPS = {
+    'synchronous': SYNCHRONOUS,
+    'synthetic': SYNTHETIC
+}
+
+
+def _tuple(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return (value,)
+    return tuple(value)
+
+
+class ComponentIndex:
+    """
+    Flows of an energy system by provision_type, bus and label.
+
+    Parameters
+    ----------
+    energysystem : oim.EnergySystem
+    bus : str
+        Label of the inertia bus; its input flows carry the
+        provision_type.
+
+    Attributes
+    ----------
+    keys : list
+        (source, target) labels of all flows, in a fixed order.
+    provision_types : dict
+        provision_type by label of every inertia providing node.
+    """
+
+    def __init__(self, energysystem, bus='bus_inertia'):
+        self.keys = []
+        self.provision_types = {}
+        self._nodes = len(energysystem.nodes)
+        self._types = defaultdict(set)
+        self._buses = defaultdict(set)
+        self._components = defaultdict(set)
+        self._cache = {}
+        self._stacked = {}
+
+        buses = {
+            str(n.label) for n in energysystem.nodes
+            if isinstance(n, oim.Bus)
+        }
+        for node in energysystem.nodes:
+            source = str(node.label)
+            for target, flow in getattr(node, 'outputs', {}).items():
+                target = str(target.label)
+                position = len(self.keys)
+                self.keys.append((source, target))
+                provision = getattr(flow, 'provision_type', None)
+                if target == bus and provision is not None:
+                    self.provision_types[source] = provision
+                    self._types[provision].add(position)
+                for label in (source, target):
+                    if label in buses:
+                        self._buses[label].add(position)
+                    else:
+                        self._components[label].add(position)
+        self._sorted = sorted(self._components)
+        self._positions = {k: n for n, k in enumerate(self.keys)}
+
+    def _prefix(self, prefix):
+        """Positions of the flows of components with a label prefix."""
+        positions = set()
+        n = bisect.bisect_left(self._sorted, prefix)
+        while n < len(self._sorted) and self._sorted[n].startswith(prefix):
+            positions |= self._components[self._sorted[n]]
+            n += 1
+        return positions
+
+    def select(self, provision_types=None, bus=None, prefix=None,
+               labels=None):
+        """
+        Result keys of the flows matching all given criteria.
+
+        Parameters
+        ----------
+        provision_types : str or iterable
+            provision_types or the groups 'synchronous' and 'synthetic';
+            only the inertia flows of these types match.
+        bus : str or iterable
+            Labels of buses the flows go into or out of.
+        prefix : str or iterable
+            Label prefixes of the components, e.g. 'transformer'.
+        labels : str or iterable
+            Labels of the components.
+
+        Returns
+        -------
+        tuple
+            (source, target) keys in index order.
+        """
+        query = tuple(
+            _tuple(x) for x in (provision_types, bus, prefix, labels)
+        )
+        if query not in self._cache:
+            types, buses, prefixes, names = query
+            sets = []
+            if types is not None:
+                types = [t for g in types for t in GROUPS.get(g, (g,))]
+                sets.append(set().union(*(self._types[t] for t in types)))
+            if buses is not None:
+                sets.append(set().union(*(self._buses[b] for b in buses)))
+            if prefixes is not None:
+                sets.append(set().union(*(self._prefix(p) for p in prefixes)))
+            if names is not None:
+                sets.append(set().union(*(self._components[n] for n in names)))
+            positions = (
+                set.intersection(*sets) if sets else set(range(len(self.keys)))
+            )
+            self._cache[query] = tuple(self.keys[p] for p in sorted(positions))
+        return self._cache[query]
+
+    def nodes(self, **selection):
+        """Labels of the components of the selected flows, see
+        :meth:`select`."""
+        return tuple(dict.fromkeys(
+            s if s not in self._buses else t
+            for s, t in self.select(**selection)
+        ))
+
+    def _stack(self, results, variable):
+        """Sequences of a variable of all indexed flows in the results,
+        stacked once per result dict; missing ones are NaN."""
+        key = (id(results), variable)
+        if key not in self._stacked:
+            present = [
+                n for n, k in enumerate(self.keys)
+                if k in results and variable in results[k]['sequences']
+            ]
+            index = _index(results)
+            matrix = np.full((len(index), len(self.keys)), np.nan)
+            if present:
+                matrix[:, present] = sequence_matrix(
+                    results, [self.keys[n] for n in present], variable
+                )
+            self._stacked = {
+                k: v for k, v in self._stacked.items() if k[0] == id(results)
+            }
+            # the results are kept so that their id is not reused
+            self._stacked[key] = (results, index, matrix)
+        return self._stacked[key][1:]
+
+    def frame(self, results, variable='flow', **selection):
+        """Sequences of the selected flows as DataFrame, one column per
+        key."""
+        keys = self.select(**selection)
+        index, matrix = self._stack(results, variable)
+        return pd.DataFrame(
+            matrix[:, [self._positions[k] for k in keys]], index=index,
+            columns=pd.MultiIndex.from_tuples(keys) if keys else None
+        )
+
+    def aggregate(self, results, variable='flow', **selection):
+        """
+        Sum of the sequences of the selected flows, e.g.
+        `aggregate(results, bus='bus_electricity', prefix='transformer')`;
+        flows without the variable are skipped.
+        """
+        keys = self.select(**selection)
+        index, matrix = self._stack(results, variable)
+        return pd.Series(
+            np.nansum(matrix[:, [self._positions[k] for k in keys]], axis=1),
+            index=index, name=variable
+        )
+
+    def kinetic_energy(self, results, provision_types):
+        """
+        Kinetic energy [Ws] of the committed units of the given types,
+        apparent_power * source_inertia * inertia_constant summed per
+        timestep, e.g. `kinetic_energy(results, 'synchronous')`.
+        """
+        keys = self.select(provision_types=provision_types)
+        index, power = self._stack(results, 'apparent_power')
+        columns = [self._positions[k] for k in keys]
+        product = power[:, columns]
+        for variable in ('source_inertia', 'inertia_constant'):
+            product = product * self._stack(results, variable)[1][:, columns]
+        return pd.Series(
+            np.nansum(product, axis=1), index=index, name='kinetic_energy'
+        )
+
+    def stale(self, energysystem):
+        """Whether nodes were added to the energy system since the index
+        was built."""
+        return len(energysystem.nodes) != self._nodes
+
+
+def component_index(energysystem, bus='bus_inertia'):
+    """
+    The index of an energy system, built on first use and rebuilt only
+    if nodes were added, e.g. by tools/incremental.py.
+    """
+    index = getattr(energysystem, '_component_index', None)
+    if index is None or index.stale(energysystem):
+        index = ComponentIndex(energysystem, bus=bus)
+        energysystem._component_index = index
+    return index
@@ -0,0 +1,188 @@
+"""
+General description
+-------------------
+Access to the inertia terms of a constructed `oim.Model`.
+
+The kinetic energy a unit provides in timestep t is
+
+    apparent_power * inertia_constant * source_inertia[t]
+
+with the binary commitment `source_inertia`. The inertia requirements of the
+energy system are minimum kinetic energies 0.5 * J * (2 * pi * f)**2 with the
+moments of inertia J given to `oim.EnergySystem`, as in the inertia plots of
+the examples. This module collects the commitment variables and the
+coefficients of all inertia providing units, so that additional inertia
+constraints can be formulated on top of the model.
+"""
+
+import math
+
+import numpy as np
+from pyomo import environ as po
+from pyomo.core.expr.numeric_expr import LinearExpression
+
+from tools.kpi import SYNCHRONOUS, SYNTHETIC  # noqa: F401
+
+
+def kinetic_energy(moment_of_inertia, frequency=50):
+    """Kinetic energy [Ws] of a moment of inertia [kg m^2] at frequency."""
+    return 0.5 * moment_of_inertia * (2 * math.pi * frequency)**2
+
+
+class VariableUnion:
+    """
+    Index lookup across several variables of the same name, e.g. of a
+    model extended by tools/incremental.py.
+    """
+
+    def __init__(self, variables):
+        self.variables = variables
+
+    def __contains__(self, index):
+        return any(index in v for v in self.variables)
+
+    def __getitem__(self, index):
+        for v in self.variables:
+            if index in v:
+                return v[index]
+        raise KeyError(index)
+
+
+def find_variable(om, name):
+    """
+    The variable component with the given local name, e.g.
+    'source_inertia'; None if the model has no such variable. If several
+    blocks hold a variable of this name, a :class:`VariableUnion` of all
+    is returned.
+    """
+    variables = [
+        v for v in om.component_objects(po.Var, descend_into=True)
+        if v.local_name == name
+    ]
+    if len(variables) > 1:
+        return VariableUnion(variables)
+    return variables[0] if variables else None
+
+
+def _sequence(value, timesteps):
+    if value is None:
+        return np.full(len(timesteps), np.nan)
+    try:
+        return np.array([value[t] for t in timesteps], dtype=float)
+    except (TypeError, IndexError, KeyError):
+        return np.full(len(timesteps), float(value))
+
+
+class InertiaTerms:
+    """
+    Commitment variables and coefficients of all inertia providing units.
+
+    Attributes
+    ----------
+    keys : list
+        (node, bus) of every inertia flow, one row of the coefficient
+        arrays per key.
+    provision_types : numpy.ndarray
+    apparent_power, inertia_constant : numpy.ndarray
+        Arrays of shape (len(keys), timesteps). Synthetic units without
+        inertia constant get the emulated inertia constant of the energy
+        system.
+    commitment : pyomo.Var
+        The `source_inertia` variable indexed by (node, bus, t).
+    """
+
+    def __init__(self, om):
+        self.om = om
+        self.timesteps = list(om.TIMESTEPS)
+        self._position = {t: n for n, t in enumerate(self.timesteps)}
+        self.commitment = find_variable(om, 'source_inertia')
+        if self.commitment is None:
+            raise ValueError('The model has no source_inertia variable.')
+
+        self.keys = [
+            (i, o) for (i, o), flow in om.flows.items()
+            if hasattr(flow, 'provision_type')
+        ]
+        self.provision_types = np.array(
+            [om.flows[k].provision_type for k in self.keys]
+        )
+        self.apparent_power = self._coefficients('apparent_power')
+        self.inertia_constant = self._coefficients('inertia_constant')
+
+        # synthetic units without own inertia constant emulate the one of
+        # the energy system
+        emulated = getattr(om.es, 'emulated_inertia_constant', None)
+        if emulated is not None:
+            unknown = (
+                np.isin(self.provision_types, SYNTHETIC)
+                & np.isnan(self.inertia_constant).all(axis=1)
+            )
+            self.inertia_constant[unknown] = emulated
+        self.apparent_power = np.nan_to_num(self.apparent_power)
+        self.inertia_constant = np.nan_to_num(self.inertia_constant)
+
+    def _coefficients(self, name):
+        """
+        Coefficients per key and timestep.
+
+        Taken from the model variable of the same name if OpInMod created
+        one with values (e.g. the wind dependent inertia constant), else
+        from the attribute of the inertia flow; NaN if neither exists.
+        """
+        var = find_variable(self.om, name)
+        rows = []
+        for (i, o) in self.keys:
+            row = None
+            if var is not None and (i, o, self.timesteps[0]) in var:
+                values = [var[i, o, t].value for t in self.timesteps]
+                if None not in values:
+                    row = np.array(values, dtype=float)
+            if row is None:
+                row = _sequence(
+                    getattr(self.om.flows[i, o], name, None), self.timesteps
+                )
+            rows.append(row)
+        return np.array(rows).reshape(len(rows), -1)
+
+    @property
+    def kinetic_energy(self):
+        """Kinetic energy [Ws] per key and timestep if committed."""
+        return self.apparent_power * self.inertia_constant
+
+    def position(self, t):
+        """Position of timestep t in the coefficient arrays."""
+        return self._position[t]
+
+    def energy(self, t):
+        """Kinetic energy [Ws] per key in timestep t if committed."""
+        n = self._position[t]
+        return self.apparent_power[:, n] * self.inertia_constant[:, n]
+
+    def mask(self, provision_types=None, nodes=None):
+        """Boolean mask of the keys with the given types and nodes."""
+        mask = np.ones(len(self.keys), dtype=bool)
+        if provision_types is not None:
+            mask &= np.isin(self.provision_types, provision_types)
+        if nodes is not None:
+            nodes = set(nodes)
+            mask &= np.array([k[0] in nodes for k in self.keys], dtype=bool)
+        return mask
+
+    def expression(self, t, mask=None):
+        """Kinetic energy of the selected keys in timestep t as pyomo
+        expression."""
+        energy = self.energy(t)
+        selected = energy != 0
+        if mask is not None:
+            selected &= mask
+        columns = np.nonzero(selected)[0]
+        if not len(columns):
+            return 0
+        return LinearExpression(
+            constant=0,
+            linear_coefs=energy[columns].tolist(),
+            linear_vars=[
+                self.commitment[self.keys[c][0], self.keys[c][1], t]
+                for c in columns
+            ]
+        )
@@ -0,0 +1,309 @@
+"""
+General description
+-------------------
+Search for the highest feasible inertia requirement and the cost curve up to
+that requirement.
+
+The feasibility of an inertia requirement is monotone: if a requirement can
+be met, every lower one can be met as well, and if it cannot, no higher one
+can. Every solve is therefore cached as a certificate and the boundary
+between feasible and infeasible requirements is kept as an interval. Queries
+inside the known feasible or infeasible range are answered without a solve
+and the boundary is found by bisection in O(log n) solves.
+
+Only an optimal solve certifies a feasible and only a proven infeasible
+solve an infeasible requirement. Other terminations, e.g. time limits or
+solver errors, decide nothing and are not cached. The cache file holds
+the certificates of every combination of builder, builder arguments and
+searched requirement in a section of its own.
+
+The cost curve below the boundary is sampled adaptively: new points are
+placed in the interval where the slope of the curve changes most, so flat
+parts of the curve need only few solves.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from pyomo import environ as po
+
+from tools.examples import build_model
+
+
+def _fingerprint(value):
+    """Json serialisable form of builder arguments for the cache key."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return hashlib.sha1(
+            pd.util.hash_pandas_object(value).to_numpy().tobytes()
+            + repr(list(getattr(value, 'columns', []))).encode()
+        ).hexdigest()
+    if isinstance(value, np.ndarray):
+        return hashlib.sha1(value.tobytes()).hexdigest()
+    if isinstance(value, dict):
+        return {str(k): _fingerprint(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint(v) for v in value]
+    if callable(value):
+        return '{0}.{1}'.format(value.__module__, value.__qualname__)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return repr(value)
+
+
+class InertiaSearch:
+    """
+    Feasibility boundary and cost curve of an inertia requirement.
+
+    Parameters
+    ----------
+    builder : callable
+        Returns an `oim.Model` for keyword arguments of the energy system.
+    builder_kwargs : dict
+        Fixed keyword arguments of the builder, e.g. `{'number': 4}`.
+    requirement : str
+        Attribute of `oim.EnergySystem` that is searched, i.e.
+        'minimum_system_synchronous_inertia' or 'minimum_system_inertia'.
+    solver : str
+    cache : str
+        Path of a json file the certificates are stored in. Certificates
+        from previous runs with the same builder, builder arguments and
+        requirement are reused.
+    """
+
+    def __init__(self, builder=build_model, builder_kwargs=None,
+                 requirement='minimum_system_synchronous_inertia',
+                 solver='cbc', cache=None):
+        self.builder = builder
+        self.builder_kwargs = builder_kwargs or {}
+        self.requirement = requirement
+        self.solver = solver
+        self.cache = cache
+        self.certificates = {}
+        self.solves = 0
+        self.queries = 0
+        self.key = hashlib.sha1(json.dumps(
+            _fingerprint({
+                'builder': builder,
+                'builder_kwargs': self.builder_kwargs,
+                'requirement': requirement
+            }),
+            sort_keys=True
+        ).encode()).hexdigest()
+        if cache is not None and os.path.isfile(cache):
+            with open(cache) as f:
+                self.certificates = {
+                    float(k): v
+                    for k, v in json.load(f).get(self.key, {}).items()
+                }
+
+    @property
+    def highest_feasible(self):
+        feasible = [k for k, v in self.certificates.items() if v['feasible']]
+        return max(feasible) if feasible else None
+
+    @property
+    def lowest_infeasible(self):
+        infeasible = [
+            k for k, v in self.certificates.items() if not v['feasible']
+        ]
+        return min(infeasible) if infeasible else None
+
+    def _save(self):
+        if self.cache is None:
+            return
+        sections = {}
+        if os.path.isfile(self.cache):
+            with open(self.cache) as f:
+                sections = json.load(f)
+        sections[self.key] = self.certificates
+        with open(self.cache, 'w') as f:
+            json.dump(sections, f)
+
+    def solve(self, value):
+        """
+        Solve the model for a requirement.
+
+        Returns
+        -------
+        dict
+            'feasible' is True if the solve was optimal, False if the
+            requirement was proven infeasible and None otherwise; only the
+            first two are stored as certificates.
+        """
+        kwargs = dict(self.builder_kwargs, **{self.requirement: value})
+        om = self.builder(**kwargs)
+        results = om.solve(solver=self.solver, solve_kwargs={'tee': False})
+        self.solves += 1
+        termination = str(results['Solver'][0]['Termination condition'])
+        feasible = {'optimal': True, 'infeasible': False}.get(termination)
+        certificate = {
+            'feasible': feasible,
+            'termination': termination,
+            'costs': po.value(om.objective) if feasible else None
+        }
+        if feasible is not None:
+            self.certificates[float(value)] = certificate
+            self._save()
+
+        return certificate
+
+    def _decided(self, value):
+        feasible = self.feasible(value)
+        if feasible is None:
+            raise RuntimeError(
+                'The solve of {0} = {1} was neither optimal nor proven '
+                'infeasible.'.format(self.requirement, value)
+            )
+        return feasible
+
+    def feasible(self, value):
+        """
+        Check whether a requirement can be met.
+
+        The cached certificates are used if they decide the question; None
+        if a solve does not decide it, see :meth:`solve`.
+        """
+        value = float(value)
+        self.queries += 1
+        if value in self.certificates:
+            return self.certificates[value]['feasible']
+        highest = self.highest_feasible
+        if highest is not None and value <= highest:
+            return True
+        lowest = self.lowest_infeasible
+        if lowest is not None and value >= lowest:
+            return False
+        return self.solve(value)['feasible']
+
+    def costs(self, value):
+        """Costs of a feasible requirement; solves if not cached, None if
+        the solve was not optimal."""
+        value = float(value)
+        self.queries += 1
+        if value not in self.certificates:
+            return self.solve(value)['costs']
+        return self.certificates[value]['costs']
+
+    def boundary(self, low, high, tolerance=1.0):
+        """
+        Highest feasible requirement between low and high by bisection.
+
+        Parameters
+        ----------
+        low, high : float
+            Search interval of the requirement.
+        tolerance : float
+            Width of the interval at which the bisection stops.
+
+        Returns
+        -------
+        float or None
+            The highest requirement known to be feasible, None if even `low`
+            cannot be met.
+
+        Raises
+        ------
+        RuntimeError
+            If a solve is neither optimal nor proven infeasible.
+        """
+        if not self._decided(low):
+            return None
+        if self._decided(high):
+            return high
+
+        lower, upper = low, high
+        known = self.highest_feasible
+        if known is not None and known > lower:
+            lower = known
+        known = self.lowest_infeasible
+        if known is not None and known < upper:
+            upper = known
+
+        while upper - lower > tolerance:
+            middle = 0.5 * (lower + upper)
+            if self._decided(middle):
+                lower = middle
+            else:
+                upper = middle
+
+        return lower
+
+    def cost_curve(self, low, high, points=10, tolerance=1e-3):
+        """
+        Sample the cost curve between low and the feasibility boundary.
+
+        The boundary below `high` is searched first. Starting with both ends
+        and the middle, the interval with the largest change of slope times
+        width is bisected until `points` requirements are sampled or the
+        largest change is below `tolerance` relative to the costs at `low`.
+        With fewer than three points, `low` and then the boundary are
+        sampled; if only `low` is feasible, the curve is this one point.
+
+        Parameters
+        ----------
+        low, high : float
+            Search interval of the requirement.
+        points : int
+            Maximum number of sampled requirements.
+        tolerance : float
+
+        Returns
+        -------
+        pandas.Series
+            Costs indexed by the requirement, empty if even `low` cannot be
+            met.
+
+        Raises
+        ------
+        RuntimeError
+            If a solve is not optimal, see :meth:`boundary`.
+        """
+        end = self.boundary(low, high)
+        if end is None:
+            return pd.Series(dtype=float, name='costs')
+
+        def costs(x):
+            value = self.costs(x)
+            if value is None:
+                raise RuntimeError(
+                    'The solve of {0} = {1} was not optimal.'.format(
+                        self.requirement, x
+                    )
+                )
+            return value
+
+        if end <= low:
+            curve = pd.Series({low: costs(low)}, name='costs')
+            curve.index.name = self.requirement
+            return curve
+
+        curve = {
+            x: costs(x) for x in (low, end, 0.5 * (low + end))[:points]
+        }
+        scale = abs(curve[low]) or 1.0
+
+        while len(curve) < points:
+            xs = sorted(curve)
+            slopes = [
+                (curve[b] - curve[a]) / (b - a) for a, b in zip(xs, xs[1:])
+            ]
+            bends = [0.0] + [
+                abs(s2 - s1) for s1, s2 in zip(slopes, slopes[1:])
+            ] + [0.0]
+            priority, i = max(
+                (max(bends[i], bends[i + 1]) * (xs[i + 1] - xs[i]), i)
+                for i in range(len(xs) - 1)
+            )
+            if priority < tolerance * scale:
+                break
+            curve[0.5 * (xs[i] + xs[i + 1])] = costs(
+                0.5 * (xs[i] + xs[i + 1])
+            )
+
+        curve = pd.Series(curve, name='costs').sort_index()
+        curve.index.name = self.requirement
+
+        return curve
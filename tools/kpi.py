@@ -0,0 +1,347 @@
+"""
+General description
+-------------------
+Vectorised energy, emission and inertia key performance indicators.
+
+All functions work on result dicts with string keys as returned by
+`convert_keys_to_strings(om.results())`. The sequences of all considered
+components are stacked into one matrix so that emissions, energies and
+inertia are computed with a few array operations instead of one pandas
+operation per component. The per-timestep KPIs can be aggregated by hour,
+day, month or year.
+
+Energies are weighted with the timestep length in hours, i.e. they are
+given in the unit of the flows times hours (Wh in the examples).
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# emission factors per commodity [t/MWh] from ENTSO-E's 2018 TYNDP
+EMISSION_FACTORS = {
+    'hard_coal': 0.3384,
+    'natural_gas': 0.2052,
+    'lignite': 0.2808,
+    'oil': 0.3636
+}
+
+SYNCHRONOUS = ('synchronous_generator', 'synchronous_storage')
+SYNTHETIC = ('synthetic_wind', 'synthetic_storage')
+
+PERIODS = {
+    'hour': 'H',
+    'day': 'D',
+    'month': 'MS',
+    'year': 'YS'
+}
+
+
+def timestep_hours(index):
+    """Return the length of each timestep of a DatetimeIndex in hours."""
+    if index.freq is not None:
+        return np.full(len(index), index.freq.nanos / 3.6e12)
+    hours = np.diff(index.asi8) / 3.6e12
+    return np.append(hours, hours[-1:])
+
+
+def sequence_matrix(results, keys, variable='flow'):
+    """
+    Stack one sequence of several result entries into a matrix.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (timesteps, len(keys)).
+    """
+    return np.column_stack(
+        [results[k]['sequences'][variable].to_numpy() for k in keys]
+    )
+
+
+def _index(results):
+    """Time index of the results, taken from the first entry with
+    sequences; entries with scalars only, e.g. investments, have none."""
+    for entry in results.values():
+        if not entry['sequences'].empty:
+            return entry['sequences'].index
+    return next(iter(results.values()))['sequences'].index
+
+
+def fuel(source, target, emission_factors=EMISSION_FACTORS):
+    """
+    Fuel of a flow from a fuel source to its bus, None for other flows.
+
+    Fuel sources are labelled 'source_<fuel>' and feed 'bus_<fuel>'; a
+    suffix such as the area in 'source_hard_coal_north' is allowed.
+    """
+    source, target = str(source), str(target)
+    if not source.startswith('source_') or target != 'bus_' + source[7:]:
+        return None
+    matches = [
+        f for f in emission_factors
+        if source[7:] == f or source[7:].startswith(f + '_')
+    ]
+    return max(matches, key=len) if matches else None
+
+
+def emissions(results, emission_factors=EMISSION_FACTORS, scale=1):
+    """
+    CO2 emissions per timestep.
+
+    The flows of the fuel sources ('source_<fuel>', 'bus_<fuel>', see
+    :func:`fuel`) are stacked and multiplied with the emission factor
+    vector.
+
+    Parameters
+    ----------
+    results : dict
+    emission_factors : dict
+        Emission factor per fuel.
+    scale : float
+        Factor converting the flow unit to the unit of the emission factors,
+        e.g. 1e-6 to convert W to MW. The default gives the same numbers
+        as the example scripts.
+
+    Returns
+    -------
+    pandas.Series
+    """
+    fuels = {
+        k: fuel(*k, emission_factors=emission_factors) for k in results
+    }
+    keys = [k for k, f in fuels.items() if f is not None]
+    index = _index(results)
+    if not keys:
+        return pd.Series(0.0, index=index, name='co2')
+    factors = np.array([emission_factors[fuels[k]] for k in keys]) * scale
+    co2 = sequence_matrix(results, keys) @ factors * timestep_hours(index)
+
+    return pd.Series(co2, index=index, name='co2')
+
+
+def energy(results, bus='bus_electricity'):
+    """
+    Energy fed into a bus per component and timestep.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One column per component feeding the bus.
+    """
+    keys = [k for k in results if k[1] == bus]
+    index = _index(results)
+    data = sequence_matrix(results, keys) * timestep_hours(index)[:, None]
+
+    return pd.DataFrame(data, index=index, columns=[k[0] for k in keys])
+
+
+def provision_types(energysystem, bus='bus_inertia'):
+    """Map the label of each inertia providing node to its provision_type."""
+    types = {}
+    for node in energysystem.nodes:
+        for target, flow in getattr(node, 'outputs', {}).items():
+            if str(target.label) == bus and hasattr(flow, 'provision_type'):
+                types[str(node.label)] = flow.provision_type
+    return types
+
+
+def _requirements(energysystem, minimum_synchronous_inertia,
+                  minimum_system_inertia, frequency):
+    """Minimum kinetic energies (synchronous, total); unset requirements
+    are zero."""
+    if minimum_synchronous_inertia is None:
+        minimum_synchronous_inertia = getattr(
+            energysystem, 'minimum_system_synchronous_inertia', None
+        )
+    if minimum_system_inertia is None:
+        minimum_system_inertia = getattr(
+            energysystem, 'minimum_system_inertia', None
+        )
+    omega = (2 * math.pi * frequency)**2
+    return (
+        0.5 * (minimum_synchronous_inertia or 0) * omega,
+        0.5 * (minimum_system_inertia or 0) * omega
+    )
+
+
+def _relative(values, requirement):
+    """Values relative to a requirement, NaN without requirement."""
+    if not requirement > 0:
+        return np.full(len(values), np.nan)
+    return values / requirement
+
+
+def inertia(results, energysystem, bus='bus_inertia', frequency=50,
+            minimum_synchronous_inertia=None, minimum_system_inertia=None):
+    """
+    Synchronous and synthetic inertia per timestep.
+
+    The kinetic energy of each unit is apparent_power * source_inertia *
+    inertia_constant. The minimum kinetic energies follow from the moments
+    of inertia of the energy system, 0.5 * J * (2 * pi * f)**2. The
+    inertia in seconds refers to the total committed apparent power as in
+    the example plots.
+
+    The moments of inertia can be given explicitly instead, e.g. for one
+    area of a multi-area system, see tools/multiarea.py.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Kinetic energies [Ws], inertia [s] and shortfalls [Ws].
+    """
+    types = provision_types(energysystem, bus=bus)
+    keys = [k for k in results if k[1] == bus and k[0] in types]
+    index = _index(results)
+
+    power = (
+        sequence_matrix(results, keys, 'apparent_power')
+        * sequence_matrix(results, keys, 'source_inertia')
+    )
+    kinetic = power * sequence_matrix(results, keys, 'inertia_constant')
+
+    isSync = np.array([types[k[0]] in SYNCHRONOUS for k in keys])
+    isSynt = np.array([types[k[0]] in SYNTHETIC for k in keys])
+    totalAppPower = power.sum(axis=1)
+    sync = kinetic[:, isSync].sum(axis=1)
+    synt = kinetic[:, isSynt].sum(axis=1)
+
+    minSync, minSys = _requirements(
+        energysystem, minimum_synchronous_inertia, minimum_system_inertia,
+        frequency
+    )
+
+    # ignore shortfalls within the solver tolerance
+    shortSync = minSync - sync
+    shortSync[shortSync < 1e-6 * minSync] = 0
+    shortSys = minSys - sync - synt
+    shortSys[shortSys < 1e-6 * minSys] = 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df = pd.DataFrame({
+            'apparent_power': totalAppPower,
+            'kinetic_energy_synchronous': sync,
+            'kinetic_energy_synthetic': synt,
+            'inertia_synchronous': sync / totalAppPower,
+            'inertia_synthetic': synt / totalAppPower,
+            'minimum_synchronous_inertia': minSync / totalAppPower,
+            'minimum_system_inertia': minSys / totalAppPower,
+            'shortfall_synchronous': shortSync,
+            'shortfall_system': shortSys
+        }, index=index)
+
+    return df
+
+
+def inertia_statistics(results, energysystem, bus='bus_inertia',
+                       frequency=50, minimum_synchronous_inertia=None,
+                       minimum_system_inertia=None):
+    """
+    Statistics of the inertia margin over the horizon.
+
+    The margins and the synthetic share refer to the minimum kinetic
+    energies of the energy system, i.e. a synchronous margin of 0.2 means
+    that the synchronous kinetic energy exceeds the requirement by 20 %.
+    They are NaN if the respective requirement is zero or unset.
+
+    Returns
+    -------
+    pandas.Series
+    """
+    minSync, minSys = _requirements(
+        energysystem, minimum_synchronous_inertia, minimum_system_inertia,
+        frequency
+    )
+    ine = inertia(
+        results, energysystem, bus=bus, frequency=frequency,
+        minimum_synchronous_inertia=minimum_synchronous_inertia,
+        minimum_system_inertia=minimum_system_inertia
+    )
+
+    sync = ine['kinetic_energy_synchronous'].to_numpy()
+    synt = ine['kinetic_energy_synthetic'].to_numpy()
+    marginSync = _relative(sync, minSync) - 1
+    marginSys = _relative(sync + synt, minSys) - 1
+    share = _relative(synt, minSys)
+
+    return pd.Series({
+        'margin_synchronous_min': marginSync.min(),
+        'margin_synchronous_mean': marginSync.mean(),
+        'margin_system_min': marginSys.min(),
+        'margin_system_mean': marginSys.mean(),
+        'synthetic_share_max': share.max(),
+        'synthetic_share_mean': share.mean()
+    })
+
+
+def kpis(results, energysystem=None, period=None,
+         emission_factors=EMISSION_FACTORS, bus='bus_electricity',
+         excess='sink_excess'):
+    """
+    Energy per technology, CO2, excess energy and inertia shortfall.
+
+    Parameters
+    ----------
+    results : dict
+    energysystem : oim.EnergySystem
+        Needed for the inertia KPIs; these are skipped if None.
+    period : str
+        One of 'hour', 'day', 'month', 'year' or None for no aggregation.
+    excess : str
+        Label prefix of the excess sinks.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Energies and CO2 are summed per period, shortfalls are given as the
+        number of timesteps with shortfall and the maximum shortfall.
+    """
+    df = energy(results, bus=bus)
+    df.columns = ['energy_' + c for c in df.columns]
+    df['excess'] = excess_energy(results, bus=bus, excess=excess)
+    df['co2'] = emissions(results, emission_factors=emission_factors)
+
+    how = {c: 'sum' for c in df.columns}
+    if energysystem is not None:
+        ine = inertia(results, energysystem)
+        for name in ('synchronous', 'system'):
+            shortfall = ine['shortfall_' + name].to_numpy()
+            df['shortfall_steps_' + name] = (shortfall > 0).astype(int)
+            df['shortfall_max_' + name] = shortfall
+            how['shortfall_steps_' + name] = 'sum'
+            how['shortfall_max_' + name] = 'max'
+
+    if period is None:
+        return df
+
+    return df.resample(PERIODS[period]).agg(how)
+
+
+def excess_energy(results, bus='bus_electricity', excess='sink_excess'):
+    """Energy taken by the excess sinks of a bus per timestep."""
+    keys = [k for k in results if k[0] == bus and k[1].startswith(excess)]
+    index = _index(results)
+    if not keys:
+        return pd.Series(0.0, index=index, name='excess')
+    data = sequence_matrix(results, keys).sum(axis=1) * timestep_hours(index)
+
+    return pd.Series(data, index=index, name='excess')
+
+
+def summary(results, energysystem=None,
+            emission_factors=EMISSION_FACTORS, bus='bus_electricity',
+            excess='sink_excess'):
+    """Totals over the whole horizon as printed by the example scripts."""
+    df = kpis(
+        results,
+        energysystem=energysystem,
+        emission_factors=emission_factors,
+        bus=bus,
+        excess=excess
+    )
+    how = {c: 'max' if c.startswith('shortfall_max') else 'sum'
+           for c in df.columns}
+    return df.agg(how)
@@ -0,0 +1,259 @@
+"""
+General description
+-------------------
+Metrics of repeated dispatch runs for monitoring.
+
+A :class:`Metrics` registry collects counters, gauges and histograms in
+memory, labelled e.g. by example and scenario:
+
+* solve latency histogram,
+* model size (variables, constraints),
+* relative MIP gap at termination,
+* cache hits and lookups, e.g. of `tools.inertia_search.InertiaSearch`,
+* number of timesteps with inertia shortfall.
+
+Recording a value is a dict update, nothing is written during the solve
+loop. :meth:`Metrics.write` writes all metrics as Prometheus text format
+file, e.g. into the directory of the node exporter's textfile collector;
+the file is replaced atomically. Optionally, :meth:`Metrics.span` exports
+OpenTelemetry spans to a local collector from a background thread.
+
+Installation requirements
+-------------------------
+The OpenTelemetry spans need the opentelemetry-sdk and
+opentelemetry-exporter-otlp libraries.
+"""
+
+from contextlib import contextmanager, nullcontext
+import bisect
+import math
+import os
+import tempfile
+import time
+
+from tools import kpi
+from tools.anytime import lower_bound, relative_gap
+
+
+# upper bounds of the solve latency buckets in seconds
+BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+PREFIX = 'opinmod_'
+
+_DISABLED = nullcontext()
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format(name, labels, value):
+    if labels:
+        label = ','.join(
+            '{0}="{1}"'.format(
+                k, v.replace('\\', '\\\\').replace('"', '\\"')
+                .replace('\n', '\\n')
+            )
+            for k, v in labels
+        )
+        name = '{0}{{{1}}}'.format(name, label)
+    value = float(value)
+    if math.isnan(value):
+        text = 'NaN'
+    elif math.isinf(value):
+        text = '+Inf' if value > 0 else '-Inf'
+    else:
+        text = repr(value)
+    return '{0} {1}'.format(name, text)
+
+
+class Metrics:
+    """
+    In-memory metrics registry.
+
+    Parameters
+    ----------
+    path : str
+        Path of the Prometheus text format file written by :meth:`write`.
+    labels : dict
+        Labels of all metrics, e.g. {'example': 4}.
+    buckets : tuple
+        Upper bounds of the latency histogram buckets in seconds.
+    otlp_endpoint : str
+        Endpoint of an OpenTelemetry collector, e.g.
+        'http://localhost:4317'; no spans are exported if None.
+    """
+
+    def __init__(self, path=None, labels=None, buckets=BUCKETS,
+                 otlp_endpoint=None, service='opinmod'):
+        self.path = path
+        self.labels = dict(labels or {})
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._tracer = None
+        if otlp_endpoint is not None:
+            self._tracer = self._otlp(otlp_endpoint, service)
+
+    def _key(self, name, labels):
+        return PREFIX + name, _labels(dict(self.labels, **labels))
+
+    def inc(self, name, value=1, **labels):
+        """Increase a counter."""
+        key = self._key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Set a gauge."""
+        self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        """Add a value to a histogram."""
+        key = self._key(name, labels)
+        if key not in self.histograms:
+            self.histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        counts, _, _ = hist = self.histograms[key]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        hist[1] += value
+        hist[2] += 1
+
+    def record_solve(self, om, solver_results, seconds, results=None,
+                     energysystem=None, **labels):
+        """
+        Record the metrics of one solve.
+
+        Parameters
+        ----------
+        om : oim.Model
+        solver_results : pyomo.opt.SolverResults
+        seconds : float
+            Wall-clock time of the solve.
+        results : dict
+            Results with string keys; with `energysystem`, the timesteps
+            with inertia shortfall are counted.
+        **labels :
+            Labels of this solve, e.g. scenario='high_wind'.
+        """
+        solver = solver_results['Solver'][0]
+        termination = str(solver['Termination condition'])
+        self.observe('solve_seconds', seconds, **labels)
+        self.inc(
+            'solves_total', termination=termination, **labels
+        )
+        self.set('model_variables', om.nvariables(), **labels)
+        self.set('model_constraints', om.nconstraints(), **labels)
+        if termination == 'optimal' or termination == 'maxTimeLimit':
+            try:
+                objective = float(om.objective())
+            except (TypeError, ValueError):
+                objective = None
+            gap = relative_gap(objective, lower_bound(solver_results))
+            if gap != float('inf'):
+                self.set('mip_gap', gap, **labels)
+        if results is not None and energysystem is not None:
+            ine = kpi.inertia(results, energysystem)
+            for kind in ('synchronous', 'system'):
+                self.set(
+                    'inertia_shortfall_steps',
+                    int((ine['shortfall_' + kind] > 0).sum()),
+                    requirement=kind, **labels
+                )
+
+    def record_cache(self, name, hits, lookups, **labels):
+        """Set the hits and lookups of a cache, e.g. `search.queries -
+        search.solves` and `search.queries` of an InertiaSearch."""
+        self.set('cache_hits', hits, cache=name, **labels)
+        self.set('cache_lookups', lookups, cache=name, **labels)
+
+    @contextmanager
+    def timed(self, om=None, **labels):
+        """
+        Time a solve, e.g.::
+
+            with metrics.timed(om, scenario='s1') as run:
+                run['solver_results'] = om.solve(solver='cbc')
+
+        The solve is recorded with :meth:`record_solve` if the dict holds
+        'solver_results' at the end; 'results' and 'energysystem' are
+        passed on as well.
+        """
+        run = {}
+        start = time.perf_counter()
+        with self.span('solve', **labels):
+            yield run
+        if 'solver_results' in run:
+            self.record_solve(
+                om, run['solver_results'], time.perf_counter() - start,
+                results=run.get('results'),
+                energysystem=run.get('energysystem'), **labels
+            )
+
+    def _otlp(self, endpoint, service):
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+            OTLPSpanExporter
+        )
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        provider = TracerProvider(
+            resource=Resource.create({'service.name': service})
+        )
+        provider.add_span_processor(
+            BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint))
+        )
+        return provider.get_tracer(__name__)
+
+    def span(self, name, **attributes):
+        """OpenTelemetry span of a phase; an empty context without
+        collector."""
+        if self._tracer is None:
+            return _DISABLED
+        return self._tracer.start_as_current_span(
+            name,
+            attributes={
+                k: str(v) for k, v in dict(self.labels, **attributes).items()
+            }
+        )
+
+    def text(self):
+        """All metrics in Prometheus text format."""
+        lines = []
+        for kind, metrics in (
+                ('counter', self.counters), ('gauge', self.gauges)):
+            names = sorted({n for n, _ in metrics})
+            for name in names:
+                lines.append('# TYPE {0} {1}'.format(name, kind))
+                for (n, labels), value in sorted(metrics.items()):
+                    if n == name:
+                        lines.append(_format(name, labels, value))
+        for name in sorted({n for n, _ in self.histograms}):
+            lines.append('# TYPE {0} histogram'.format(name))
+            for (n, labels), (counts, total, count) in sorted(
+                    self.histograms.items()):
+                if n != name:
+                    continue
+                cumulated = 0
+                for bound, c in zip(self.buckets + ('+Inf',), counts):
+                    cumulated += c
+                    lines.append(_format(
+                        name + '_bucket',
+                        labels + (('le', str(bound)),), cumulated
+                    ))
+                lines.append(_format(name + '_sum', labels, total))
+                lines.append(_format(name + '_count', labels, count))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path=None):
+        """Write all metrics to a Prometheus text format file; the file is
+        replaced atomically and readable by other users, e.g. the node
+        exporter."""
+        path = path or self.path
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.text())
+        # mkstemp creates the file readable by its owner only
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
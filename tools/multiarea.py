@@ -0,0 +1,285 @@
+"""
+General description
+-------------------
+Energy systems of several synchronous areas linked by HVDC.
+
+Every area has its own electricity bus, unbalanced inertia bus, load,
+excess sink and fleet, and its own inertia requirements. All labels of an
+area get the area name as suffix, e.g. 'transformer_oil_north',
+'bus_inertia_north' or 'source_hard_coal_north'. Areas exchange energy
+through pairs of lossy transformers 'link_<a>_<b>' and 'link_<b>_<a>'
+between their electricity buses. HVDC links do not couple the frequencies
+of the areas, so no inertia is shared between areas.
+
+The system wide thresholds of `oim.EnergySystem` are set to zero and
+replaced by one synchronous and one total inertia constraint per area and
+timestep, see :func:`add_area_inertia`.
+
+The areas are built one after another in one process. The pyomo blocks
+of a model can not be built in worker processes and assembled
+afterwards, and oemof nodes hash by label and can not be passed between
+processes, so the construction time grows with the number of areas. The
+requirement rows of all areas are built from coefficient arrays, see
+tools/vectorized.py.
+"""
+
+import pandas as pd
+from pyomo import environ as po
+
+import opinmod as oim
+
+from tools import kpi
+from tools.examples import DEMAND, INERTIA_REQUIREMENTS
+from tools.fleet import build_fleet, read_fleet
+from tools.inertia import InertiaTerms, kinetic_energy
+from tools.vectorized import add_requirement, requirement_matrix
+
+
+def area_label(label, area):
+    """Label of a node of an area, e.g. 'bus_inertia_north'."""
+    return '{0}_{1}'.format(label, area)
+
+
+def area_fleet(fleet, area):
+    """Register of an area with area suffixes on labels and fuels."""
+    if not isinstance(fleet, pd.DataFrame):
+        fleet = read_fleet(fleet)
+    fleet = fleet.copy()
+    fleet['label'] = [area_label(f, area) for f in fleet['label']]
+    fleet['fuel'] = [
+        area_label(f, area) if isinstance(f, str) else f
+        for f in fleet['fuel']
+    ]
+    return fleet.set_index('label', drop=False)
+
+
+def prepare_area(area, spec):
+    """
+    Read and prepare the data of one area.
+
+    Parameters
+    ----------
+    area : str
+    spec : dict
+        Area specification, see :func:`build_multiarea`; 'fleet' and
+        'profiles' may be paths of csv files.
+
+    Returns
+    -------
+    dict
+        The specification with the validated register of the area
+        including area suffixes and the profiles as DataFrame.
+    """
+    profiles = spec['profiles']
+    if not isinstance(profiles, pd.DataFrame):
+        profiles = pd.read_csv(profiles)
+    return dict(
+        spec,
+        fleet=area_fleet(spec['fleet'], area),
+        profiles=profiles
+    )
+
+
+def build_area(area, fleet, profiles, demand=DEMAND):
+    """
+    Create the nodes of one area.
+
+    Parameters
+    ----------
+    area : str
+        Name of the area, used as label suffix.
+    fleet : pandas.DataFrame
+        Register of the area with area suffixes, see :func:`area_fleet`.
+    profiles : pandas.DataFrame
+        Columns 'demand_el' and the profiles referenced by the fleet.
+    demand : float
+        Nominal value of the load.
+
+    Returns
+    -------
+    list
+        All nodes of the area, electricity and inertia bus first.
+    """
+    busElectricity = oim.Bus(label=area_label('bus_electricity', area))
+    busInertia = oim.Bus(
+        label=area_label('bus_inertia', area), balanced=False
+    )
+
+    nodes = [
+        busElectricity,
+        busInertia,
+        oim.Sink(
+            label=area_label('sink_load', area),
+            inputs={
+                busElectricity: oim.Flow(
+                    nominal_value=demand,
+                    fix=profiles['demand_el'].to_list()
+                )
+            }
+        ),
+        oim.Sink(
+            label=area_label('sink_excess', area),
+            inputs={busElectricity: oim.Flow(variable_costs=1)}
+        )
+    ]
+    nodes += build_fleet(
+        fleet, busElectricity, busInertia, profiles=profiles
+    )
+
+    return nodes
+
+
+def build_links(links, buses, efficiency=0.97):
+    """
+    Create the transformer pairs of HVDC links.
+
+    Parameters
+    ----------
+    links : iterable
+        Tuples (area_a, area_b, nominal_value) or (area_a, area_b,
+        nominal_value, efficiency).
+    buses : dict
+        Electricity buses keyed by label.
+    """
+    nodes = []
+    for link in links:
+        a, b, nominalValue = link[:3]
+        eta = link[3] if len(link) > 3 else efficiency
+        for i, o in ((a, b), (b, a)):
+            busIn = buses[area_label('bus_electricity', i)]
+            busOut = buses[area_label('bus_electricity', o)]
+            nodes.append(
+                oim.Transformer(
+                    label='link_{0}_{1}'.format(i, o),
+                    inputs={busIn: oim.Flow(nominal_value=nominalValue)},
+                    outputs={busOut: oim.Flow()},
+                    conversion_factors={busOut: eta}
+                )
+            )
+    return nodes
+
+
+def build_multiarea(areas, links=(), start='20/8/2020', periods=None,
+                    freq='H', efficiency=0.97):
+    """
+    Build the energy system of several areas.
+
+    Parameters
+    ----------
+    areas : dict
+        Specification per area name with the keys 'fleet' and 'profiles'
+        (DataFrames or paths) and optionally 'demand',
+        'minimum_synchronous_inertia' and
+        'minimum_inertia' (moments of inertia [kg m^2], defaulting to the
+        requirements of the examples).
+    links : iterable
+        HVDC links, see :func:`build_links`.
+    start, periods, freq :
+        Passed to `pandas.date_range`; `periods` defaults to the length of
+        the profiles of the first area.
+    efficiency : float
+        Default efficiency of the links.
+
+    Returns
+    -------
+    oim.EnergySystem
+    """
+    prepared = [prepare_area(*a) for a in areas.items()]
+
+    if periods is None:
+        periods = len(prepared[0]['profiles'])
+    timeIdx = pd.date_range(start=start, periods=periods, freq=freq)
+
+    energysystem = oim.EnergySystem(
+        timeindex=timeIdx,
+        minimum_system_synchronous_inertia=0,
+        minimum_system_inertia=0,
+        emulated_inertia_constant=(
+            INERTIA_REQUIREMENTS['emulated_inertia_constant']
+        )
+    )
+
+    buses = {}
+    for area, spec in zip(areas, prepared):
+        nodes = build_area(
+            area, spec['fleet'], spec['profiles'],
+            demand=spec.get('demand', DEMAND)
+        )
+        energysystem.add(*nodes)
+        buses.update({n.label: n for n in nodes[:2]})
+    energysystem.add(*build_links(links, buses, efficiency=efficiency))
+
+    return energysystem
+
+
+def requirements(spec):
+    """Moments of inertia (synchronous, total) of an area specification."""
+    return (
+        spec.get(
+            'minimum_synchronous_inertia',
+            INERTIA_REQUIREMENTS['minimum_system_synchronous_inertia']
+        ),
+        spec.get(
+            'minimum_inertia', INERTIA_REQUIREMENTS['minimum_system_inertia']
+        )
+    )
+
+
+def add_area_inertia(om, areas, frequency=50):
+    """
+    Add the inertia requirements of every area to a model.
+
+    The block `om.AreaInertia` holds the constraints `synchronous` and
+    `total` indexed by area and timestep: the kinetic energy of the
+    committed synchronous units of an area, and of all its committed
+    units, must reach the requirement of the area. The rows are built from
+    coefficient arrays, see tools/vectorized.py.
+
+    Parameters
+    ----------
+    om : oim.Model
+        Model of an energy system built by :func:`build_multiarea`.
+    areas : dict
+        The area specifications passed to :func:`build_multiarea`.
+    """
+    terms = InertiaTerms(om)
+    block = po.Block()
+    om.add_component('AreaInertia', block)
+    block.AREAS = po.Set(initialize=list(areas), ordered=True)
+
+    for number, (name, types) in enumerate((
+            ('synchronous', kpi.SYNCHRONOUS),
+            ('total', kpi.SYNCHRONOUS + kpi.SYNTHETIC))):
+        matrices, energies = {}, {}
+        for a, spec in areas.items():
+            nodes = [
+                i for (i, o) in terms.keys
+                if str(o.label) == area_label('bus_inertia', a)
+            ]
+            matrices[a] = requirement_matrix(terms, types, nodes=nodes)
+            energies[a] = kinetic_energy(requirements(spec)[number], frequency)
+        add_requirement(
+            om, block, name, terms, matrices, energies, index=block.AREAS
+        )
+
+    return block
+
+
+def area_inertia(results, energysystem, areas, frequency=50):
+    """
+    Inertia KPIs of every area, see `tools.kpi.inertia`.
+
+    Returns
+    -------
+    dict
+        DataFrame per area.
+    """
+    frames = {}
+    for a, spec in areas.items():
+        sync, total = requirements(spec)
+        frames[a] = kpi.inertia(
+            results, energysystem, bus=area_label('bus_inertia', a),
+            frequency=frequency, minimum_synchronous_inertia=sync,
+            minimum_system_inertia=total
+        )
+    return frames
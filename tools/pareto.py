@@ -0,0 +1,247 @@
+"""
+General description
+-------------------
+Cost-emission Pareto front by an epsilon-constraint sweep.
+
+A CO2 cap constraint is added to an `oim.Model`. The emissions are the flows
+of the fuel sources multiplied with the emission factors, the cap is a
+mutable pyomo parameter. The sweep therefore constructs the model once and
+only changes the cap between two points. Each point is warm-started from the
+solution of its neighbour. The points can be spread over a process pool, in
+which case every worker builds the model once and sweeps a contiguous part of
+the front within the thread and memory budget of tools/resources.py.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+from pyomo import environ as po
+
+from tools.examples import build_model
+from tools.kpi import EMISSION_FACTORS, fuel
+from tools.resources import executor, plan, solve
+
+
+# solvers supporting warm starts through pyomo
+WARMSTART_SOLVERS = ('cbc', 'cplex', 'gurobi')
+
+
+def add_emission_cap(om, emission_factors=EMISSION_FACTORS, scale=1):
+    """
+    Add the CO2 emissions and a mutable CO2 cap to a model.
+
+    The following components are added to the model:
+
+    * `om.co2_emissions`: expression of the total emissions
+    * `om.co2_cap`: mutable parameter
+    * `om.co2_cap_constraint`: `co2_emissions <= co2_cap`, deactivated
+      until a cap is set with :func:`set_emission_cap`
+
+    Parameters
+    ----------
+    om : oim.Model
+    emission_factors : dict
+        Emission factor per fuel, applied to the flow from 'source_<fuel>'
+        to 'bus_<fuel>', see `tools.kpi.fuel`.
+    scale : float
+        Factor converting the flow unit to the unit of the emission factors.
+    """
+    factors = {}
+    for (i, o) in om.flows:
+        f = fuel(i.label, o.label, emission_factors=emission_factors)
+        if f is not None:
+            factors[i, o] = emission_factors[f] * scale
+
+    om.co2_emissions = po.Expression(
+        expr=sum(
+            om.flow[i, o, t] * factor * om.timeincrement[t]
+            for (i, o), factor in factors.items()
+            for t in om.TIMESTEPS
+        )
+    )
+    om.co2_cap = po.Param(mutable=True, initialize=0)
+    om.co2_cap_constraint = po.Constraint(
+        expr=om.co2_emissions <= om.co2_cap
+    )
+    om.co2_cap_constraint.deactivate()
+
+    return om
+
+
+def set_emission_cap(om, cap):
+    """Set the CO2 cap of a model; None removes the cap."""
+    if cap is None or math.isinf(cap):
+        om.co2_cap_constraint.deactivate()
+    else:
+        om.co2_cap = cap
+        om.co2_cap_constraint.activate()
+
+
+def _solve(om, solver, warmstart, cmdline_options):
+    solve_kwargs = {'tee': False}
+    if warmstart and solver in WARMSTART_SOLVERS:
+        solve_kwargs['warmstart'] = True
+    results = solve(
+        om,
+        solver=solver,
+        solve_kwargs=solve_kwargs,
+        cmdline_options=cmdline_options
+    )
+    return (
+        str(results['Solver'][0]['Status']),
+        str(results['Solver'][0]['Termination condition'])
+    )
+
+
+def _point(om, cap, solver, warmstart, cmdline_options, callback):
+    set_emission_cap(om, cap)
+    status, termination = _solve(om, solver, warmstart, cmdline_options)
+    point = {
+        'cap': cap,
+        'status': status,
+        'termination': termination,
+        'costs': float('nan'),
+        'co2': float('nan')
+    }
+    if termination == 'optimal':
+        point['costs'] = po.value(om.objective)
+        point['co2'] = po.value(om.co2_emissions)
+        if callback is not None:
+            point.update(callback(om))
+    return point
+
+
+def emission_range(om, solver='cbc', cmdline_options=None):
+    """
+    Emissions of the cost optimum and the minimal possible emissions.
+
+    The minimal emissions are found by temporarily replacing the cost
+    objective with the emissions.
+
+    Returns
+    -------
+    tuple
+        (emissions of the cost optimum, minimal emissions)
+
+    Raises
+    ------
+    RuntimeError
+        If one of the two solves does not terminate optimal.
+    """
+    def _emissions(warmstart, objective):
+        status, termination = _solve(om, solver, warmstart, cmdline_options)
+        if termination != 'optimal':
+            raise RuntimeError(
+                'The solve of the {0} terminated with {1}.'.format(
+                    objective, termination
+                )
+            )
+        return po.value(om.co2_emissions)
+
+    set_emission_cap(om, None)
+    maxCo2 = _emissions(False, 'cost optimum')
+
+    om.objective.deactivate()
+    om.co2_objective = po.Objective(expr=om.co2_emissions)
+    try:
+        minCo2 = _emissions(True, 'minimal emissions')
+    finally:
+        om.del_component('co2_objective')
+        om.objective.activate()
+
+    return maxCo2, minCo2
+
+
+def sweep(om, caps, solver='cbc', cmdline_options=None, callback=None):
+    """
+    Solve a model with an emission cap for a sequence of caps.
+
+    Every solve is warm-started from the previous one, so the caps should
+    be sorted.
+
+    Parameters
+    ----------
+    om : oim.Model
+        Model with an emission cap, see :func:`add_emission_cap`.
+    caps : iterable
+    callback : callable
+        Called with the solved model, returns a dict of additional values
+        of the point, e.g. KPIs.
+
+    Returns
+    -------
+    list of dict
+    """
+    return [
+        _point(om, cap, solver, True, cmdline_options, callback)
+        for cap in caps
+    ]
+
+
+def _sweep_worker(builder, builder_kwargs, emission_factors, caps, solver,
+                  cmdline_options, callback):
+    om = add_emission_cap(builder(**builder_kwargs), emission_factors)
+    return sweep(
+        om, caps, solver=solver, cmdline_options=cmdline_options,
+        callback=callback
+    )
+
+
+def pareto_front(points=10, builder=build_model, builder_kwargs=None,
+                 emission_factors=EMISSION_FACTORS, solver='cbc',
+                 cmdline_options=None, processes=None, callback=None):
+    """
+    Trace the cost-emission Pareto front.
+
+    The range of emissions is determined first. The caps are then spread
+    evenly from the emissions of the cost optimum down to the minimal
+    emissions.
+
+    Parameters
+    ----------
+    points : int
+        Number of points of the front including both ends.
+    builder : callable
+        Returns the `oim.Model`; must be picklable if processes are used.
+    builder_kwargs : dict
+        Passed to the builder, e.g. `{'number': 4}`.
+    processes : int
+        Number of worker processes; the points are solved in the main
+        process if None or 1. The cores and memory of the node are split
+        between the workers, see `tools.resources.plan`.
+    callback : callable
+        See :func:`sweep`; must be picklable if processes are used.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per point with cap, costs, co2 and solver status.
+    """
+    builder_kwargs = builder_kwargs or {}
+    om = add_emission_cap(builder(**builder_kwargs), emission_factors)
+    maxCo2, minCo2 = emission_range(
+        om, solver=solver, cmdline_options=cmdline_options
+    )
+    # keep the tightest cap within the solver tolerance of the minimum
+    caps = np.linspace(maxCo2, minCo2 * (1 + 1e-6), points).tolist()
+
+    if not processes or processes == 1:
+        front = sweep(
+            om, caps, solver=solver, cmdline_options=cmdline_options,
+            callback=callback
+        )
+    else:
+        chunks = [c.tolist() for c in np.array_split(caps, processes)
+                  if len(c)]
+        with executor(plan(len(chunks), processes=len(chunks))) as pool:
+            futures = [
+                pool.submit(
+                    _sweep_worker, builder, builder_kwargs, emission_factors,
+                    chunk, solver, cmdline_options, callback
+                )
+                for chunk in chunks
+            ]
+            front = [p for f in futures for p in f.result()]
+
+    return pd.DataFrame(front)
@@ -0,0 +1,315 @@
+"""
+General description
+-------------------
+Flow and inertia figures of long time series and many scenarios.
+
+The figures equal the flow and inertia plots of the examples (stacked
+areas with alpha 0.4, load/excess and requirement lines, same colours,
+labels and size). Series longer than `points` are downsampled for display
+only:
+
+* 'minmax' keeps the first, last, smallest and largest value of every
+  bucket, i.e. of every pixel column for `points` around the width of the
+  figure in pixels; peaks and troughs are kept exactly. Stacked layers
+  are downsampled on their cumulated tops, so all layers share the same
+  timesteps.
+* 'lttb' (largest triangle three buckets) keeps one point per bucket that
+  spans the largest triangle with its neighbours, which preserves the
+  visual shape with fewer points.
+
+Dense stacked layers are rasterized, the lines stay vector graphics. The
+figures are drawn with the object oriented matplotlib API without pyplot,
+so :func:`render_scenarios` can draw them in worker processes; only the
+DataFrames of the figures are passed to the workers.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+import pandas as pd
+from matplotlib import dates as mdt
+from matplotlib.figure import Figure
+
+from tools import kpi
+
+
+# (column, legend label, colour) of the stacked layers and lines as in
+# the examples
+FLOWS = (
+    ('transformer_lignite', 'Lignite', '#8B4513'),
+    ('transformer_hard_coal', 'Hard Coal', '#000000'),
+    ('transformer_natural_gas', 'Natural Gas', '#B0C4DE'),
+    ('transformer_oil', 'Oil', '#191970'),
+    ('source_wind', 'Wind', '#1E90FF'),
+    ('source_pv', 'PV', '#FFFF00'),
+    ('storage_battery', 'Battery', '#4B0082')
+)
+
+FLOW_LINES = (
+    ('sink_load', 'Load', '#FF0000', '-'),
+    ('sink_excess', 'Excess', '#FF00FF', '-')
+)
+
+INERTIA = (
+    ('inertia_synchronous', 'Synchronous inertia', '#B0E0E6'),
+    ('inertia_synthetic', 'Synthetic inertia', '#90EE90')
+)
+
+INERTIA_LINES = (
+    ('minimum_synchronous_inertia', 'Min sync. inertia', 'black', '-'),
+    ('minimum_system_inertia', 'Min sys. inertia', 'black', '-.')
+)
+
+# number of displayed points, around twice the width of a figure in pixels
+POINTS = 2000
+
+# stacked layers of more timesteps are rasterized
+RASTERIZE = 1000
+
+
+def lttb(x, y, points):
+    """
+    Indices of the points kept by largest triangle three buckets.
+
+    The first and last point are kept; the points in between are split
+    into `points` - 2 buckets, and of each bucket the point spanning the
+    largest triangle with the previously kept point and the mean of the
+    next bucket is kept.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    edges = np.append(edges, n)
+
+    indices = np.empty(points, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for b in range(points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nextX = x[hi:edges[b + 2]].mean()
+        nextY = y[hi:edges[b + 2]].mean()
+        area = np.abs(
+            (x[a] - nextX) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (nextY - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        indices[b + 1] = a
+    return indices
+
+
+def minmax(y, buckets):
+    """
+    Indices of the first, last, smallest and largest value per bucket.
+
+    Parameters
+    ----------
+    y : numpy.ndarray
+        Values of shape (n,) or (n, series); the indices of all series
+        are united.
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted unique indices.
+    """
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    if y.ndim == 1:
+        y = y[:, None]
+    n = len(y)
+    if 4 * buckets >= n:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    indices = [edges[:-1], edges[1:] - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        indices.append(lo + y[lo:hi].argmin(axis=0))
+        indices.append(lo + y[lo:hi].argmax(axis=0))
+    return np.unique(np.concatenate(indices))
+
+
+def downsample(frame, stacked=(), points=POINTS, method='minmax'):
+    """
+    Rows of a DataFrame kept for display.
+
+    Parameters
+    ----------
+    stacked : list
+        Columns drawn as stacked layers, in stacking order; they are
+        downsampled on their cumulated sums. All other columns are
+        downsampled as they are.
+    method : str
+        'minmax' or 'lttb'.
+    """
+    if len(frame) <= points:
+        return frame
+    stacked = list(stacked)
+    values = frame.drop(columns=stacked).to_numpy(dtype=float)
+    if stacked:
+        tops = np.nan_to_num(frame[stacked].to_numpy(dtype=float))
+        values = np.column_stack((values, tops.cumsum(axis=1)))
+
+    if method == 'minmax':
+        indices = minmax(values, points // 4)
+    elif method == 'lttb':
+        x = frame.index.asi8 if isinstance(
+            frame.index, pd.DatetimeIndex) else frame.index.to_numpy()
+        indices = np.unique(np.concatenate(
+            [lttb(x, v, points) for v in values.T]
+        ))
+    else:
+        raise ValueError('Unknown downsampling method {0}.'.format(method))
+    return frame.iloc[indices]
+
+
+def flow_frame(results, bus='bus_electricity', layers=FLOWS,
+               lines=FLOW_LINES):
+    """
+    Flows of the flow figure: the flows of the `layers` into the bus and
+    of the bus into the sinks of the `lines`, if present.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One column per component.
+    """
+    keys = [(c, bus) for c, _, _ in layers if (c, bus) in results]
+    keys += [(bus, c) for c, _, _, _ in lines if (bus, c) in results]
+    return pd.DataFrame(
+        kpi.sequence_matrix(results, keys), index=kpi._index(results),
+        columns=[k[0] if k[1] == bus else k[1] for k in keys]
+    )
+
+
+def inertia_frame(results, energysystem, **kwargs):
+    """Inertia [s] of the inertia figure, see `tools.kpi.inertia`."""
+    ine = kpi.inertia(results, energysystem, **kwargs)
+    return ine[
+        [c for c, _, _ in INERTIA] + [c for c, _, _, _ in INERTIA_LINES]
+    ]
+
+
+def figure(frame, layers, lines, ylabel, path=None, points=POINTS,
+           method='minmax', rasterize=None, dpi=300):
+    """
+    Stacked area figure with lines in the style of the examples.
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+        Series by column, indexed by time.
+    layers, lines : tuple
+        (column, label, colour) of the stacked layers and (column, label,
+        colour, linestyle) of the lines; missing columns are skipped.
+    path : str
+        The figure is written to this file, e.g. a pdf, if given.
+    rasterize : bool
+        Rasterize the stacked layers; by default if the frame is longer
+        than RASTERIZE timesteps.
+    dpi : int
+        Resolution of rasterized layers.
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+    """
+    layers = [layer for layer in layers if layer[0] in frame]
+    lines = [line for line in lines if line[0] in frame]
+    if rasterize is None:
+        rasterize = len(frame) > RASTERIZE
+    shown = downsample(
+        frame[[c for c, *_ in layers + lines]],
+        stacked=[c for c, *_ in layers], points=points, method=method
+    )
+    timeIdx = shown.index
+
+    fig = Figure(figsize=(8, 4.5))
+    ax = fig.subplots()
+    if layers:
+        areas = ax.stackplot(
+            timeIdx, *[shown[c] for c, _, _ in layers],
+            labels=[label for _, label, _ in layers], alpha=0.4,
+            colors=[color for _, _, color in layers]
+        )
+        for area in areas:
+            area.set_rasterized(rasterize)
+    for c, label, color, linestyle in lines:
+        ax.plot(timeIdx, shown[c], label=label, color=color,
+                linestyle=linestyle)
+    ax.legend(loc='best')
+    ax.set_xlabel('Time')
+    ax.set_ylabel(ylabel)
+    if len(timeIdx) and timeIdx[-1] - timeIdx[0] <= pd.Timedelta(days=2):
+        ax.xaxis.set_major_formatter(mdt.DateFormatter('%H:%M'))
+    else:
+        locator = mdt.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdt.ConciseDateFormatter(locator))
+    ax.grid()
+    fig.tight_layout()
+    if path is not None:
+        fig.savefig(path, dpi=dpi)
+    return fig
+
+
+def plot_flows(frame, path=None, **kwargs):
+    """Flow figure of a :func:`flow_frame`, see :func:`figure`."""
+    return figure(frame, FLOWS, FLOW_LINES, 'Power [MW]', path=path,
+                  **kwargs)
+
+
+def plot_inertia(frame, path=None, **kwargs):
+    """Inertia figure of an :func:`inertia_frame`, see :func:`figure`."""
+    return figure(frame, INERTIA, INERTIA_LINES,
+                  'Power system inertia [s]', path=path, **kwargs)
+
+
+def _render(task):
+    kind, frame, path, kwargs = task
+    plot = plot_flows if kind == 'flow' else plot_inertia
+    plot(frame, path=path, **kwargs)
+    return path
+
+
+def render_scenarios(scenarios, directory, processes=None, fmt='pdf',
+                     **kwargs):
+    """
+    Render the flow and inertia figures of many scenarios.
+
+    Parameters
+    ----------
+    scenarios : dict
+        (flow_frame, inertia_frame) per scenario name; either may be None.
+    directory : str
+        The figures are written to 'flow_<name>.<fmt>' and
+        'inertia_<name>.<fmt>' in this directory.
+    processes : int
+        Number of worker processes; the figures are drawn in the main
+        process if None or 1.
+    **kwargs :
+        Passed to :func:`figure`.
+
+    Returns
+    -------
+    list
+        Paths of the written figures.
+    """
+    tasks = []
+    for name, frames in scenarios.items():
+        for kind, frame in zip(('flow', 'inertia'), frames):
+            if frame is not None:
+                path = os.path.join(
+                    directory, '{0}_{1}.{2}'.format(kind, name, fmt)
+                )
+                tasks.append((kind, frame, path, kwargs))
+
+    if not processes or processes == 1:
+        return [_render(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_render, tasks))
@@ -0,0 +1,296 @@
+"""
+General description
+-------------------
+Per-phase profiling of a run with a JSON report.
+
+A :class:`Profiler` records for every phase of a run (building the energy
+system, constructing the model, writing, solving and reading in the
+solver, extracting the results, post-processing)
+
+* the elapsed wall-clock time,
+* the peak resident set size of the process during the phase and the peak
+  of the solver processes,
+* the net number of Python memory blocks allocated in the phase, i.e.
+  the blocks allocated minus those freed, which is negative if the phase
+  frees more than it allocates, and, if enabled, the peak traced by
+  tracemalloc,
+
+and the size of the model (variables, binaries, constraints, nonzeros).
+Phases may be nested. Starting a phase resets the peaks, so the peaks
+are read at every start and end of a phase and every enclosing phase
+keeps their running maximum. A disabled profiler returns one shared empty
+context for every phase, so instrumented code costs a function call per
+phase.
+
+The peak resident set size per phase relies on resetting the peak through
+/proc/self/clear_refs, which is available on Linux. Elsewhere the peak
+since the start of the process is reported. The reset applies to the
+whole process, so profilers running concurrently in one process, e.g. in
+threads, reset each other's peaks; profile concurrent runs in separate
+processes.
+"""
+
+from contextlib import contextmanager, nullcontext
+import datetime
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+from pyomo import environ as po
+from pyomo.core.expr.visitor import identify_variables
+
+
+_DISABLED = nullcontext()
+
+
+def _status(field):
+    """A field of /proc/self/status in bytes; None if not available."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak():
+    """
+    Reset the peak resident set size of the process; False if not
+    supported.
+
+    This also resets the peak seen by any other profiler in the process.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _children_peak():
+    # ru_maxrss is given in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def model_size(om, nonzeros=True):
+    """
+    Number of variables, binaries, constraints and nonzeros of a model.
+
+    Only active constraints and the variables used in them are counted
+    for the nonzeros, which takes one pass over all constraint bodies.
+    """
+    variables = 0
+    binaries = 0
+    for v in om.component_data_objects(po.Var, active=True):
+        variables += 1
+        binaries += v.is_binary()
+    size = {
+        'variables': variables,
+        'binaries': binaries,
+        'constraints': om.nconstraints()
+    }
+    if nonzeros:
+        size['nonzeros'] = sum(
+            sum(1 for _ in identify_variables(c.body, include_fixed=False))
+            for c in om.component_data_objects(po.Constraint, active=True)
+        )
+    return size
+
+
+class Profiler:
+    """
+    Records time and memory per phase of a run.
+
+    Parameters
+    ----------
+    enabled : bool
+        A disabled profiler records nothing.
+    trace : bool
+        Trace allocations with tracemalloc to report the peak of traced
+        memory per phase. This slows down allocation heavy phases such as
+        the model construction considerably.
+    """
+
+    def __init__(self, enabled=True, trace=False):
+        self.enabled = enabled
+        self.trace = trace
+        self.phases = []
+        self.model = None
+        self.solver = None
+        self._stack = []
+        self._started = datetime.datetime.now().isoformat()
+        if enabled and trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def phase(self, name):
+        """Context manager recording one phase, e.g.
+        `with profiler.phase('model'): om = oim.Model(es)`."""
+        if not self.enabled:
+            return _DISABLED
+        return self._phase(name)
+
+    def _update_peaks(self):
+        """Raise the running peaks of all open phases to the current
+        peaks."""
+        peaks = {'peak_rss': _status('VmHWM')}
+        if self.trace:
+            peaks['traced_peak'] = tracemalloc.get_traced_memory()[1]
+        for entry in self._stack:
+            for k, v in peaks.items():
+                if v is not None and (entry[k] is None or v > entry[k]):
+                    entry[k] = v
+
+    @contextmanager
+    def _phase(self, name):
+        entry = {
+            'name': name,
+            'parent': self._stack[-1]['name'] if self._stack else None,
+            'peak_rss': None
+        }
+        if self.trace:
+            entry['traced_peak'] = None
+        self._update_peaks()
+        self._stack.append(entry)
+        peakReset = _reset_peak()
+        if self.trace:
+            tracemalloc.reset_peak()
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['seconds'] = time.perf_counter() - start
+            entry['net_allocated_blocks'] = sys.getallocatedblocks() - blocks
+            entry['rss'] = _status('VmRSS')
+            self._update_peaks()
+            entry['peak_rss_since_start'] = not peakReset
+            entry['children_peak_rss'] = _children_peak()
+            self._stack.pop()
+            self.phases.append(entry)
+
+    def measure_model(self, om, nonzeros=True):
+        """Record the size of a model."""
+        if self.enabled:
+            self.model = model_size(om, nonzeros=nonzeros)
+        return self.model
+
+    def solve(self, om, solver='cbc', solve_kwargs=None,
+              cmdline_options=None):
+        """
+        Solve a model like `om.solve` with the solver phases recorded.
+
+        The phases 'solver_write', 'solver_solve' and 'solver_read' are
+        recorded within the phase 'solve' for solvers that write a problem
+        file and call an executable, e.g. cbc or glpk.
+
+        Returns
+        -------
+        pyomo.opt.SolverResults
+        """
+        if not self.enabled:
+            return om.solve(
+                solver=solver, solve_kwargs=solve_kwargs or {},
+                cmdline_options=cmdline_options or {}
+            )
+
+        opt = po.SolverFactory(solver, solver_io='lp')
+        for k, v in (cmdline_options or {}).items():
+            opt.options[k] = v
+        for method, name in (
+                ('_presolve', 'solver_write'),
+                ('_apply_solver', 'solver_solve'),
+                ('_postsolve', 'solver_read')):
+            if hasattr(opt, method):
+                setattr(opt, method, self._wrap(getattr(opt, method), name))
+
+        with self.phase('solve'):
+            solverResults = opt.solve(om, **(solve_kwargs or {}))
+        om.es.results = solverResults
+        om.solver_results = solverResults
+
+        solverInfo = solverResults['Solver'][0]
+        self.solver = {
+            'name': solver,
+            'status': str(solverInfo['Status']),
+            'termination': str(solverInfo['Termination condition'])
+        }
+        return solverResults
+
+    def _wrap(self, method, name):
+        def _wrapped(*args, **kwargs):
+            with self.phase(name):
+                return method(*args, **kwargs)
+        return _wrapped
+
+    def report(self, path=None, **info):
+        """
+        The report of the run as dict, written as JSON if `path` is given.
+
+        Parameters
+        ----------
+        **info :
+            Additional entries of the report, e.g. scenario parameters.
+        """
+        report = dict(
+            info,
+            started=self._started,
+            python=platform.python_version(),
+            platform=platform.platform(),
+            phases=self.phases,
+            model=self.model,
+            solver=self.solver
+        )
+        if path is not None:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+        return report
+
+
+def profiled_run(number=4, solver='cbc', report=None, trace=False,
+                 nonzeros=True, **kwargs):
+    """
+    Build, solve and evaluate an example with all phases recorded.
+
+    Parameters
+    ----------
+    number : int
+        Number of the example.
+    report : str
+        Path of the JSON report.
+    **kwargs :
+        Passed to `tools.examples.build_energysystem`.
+
+    Returns
+    -------
+    tuple
+        The results with string keys and the report as dict.
+    """
+    from oemof.solph.processing import convert_keys_to_strings
+
+    import opinmod as oim
+
+    from tools import kpi
+    from tools.examples import build_energysystem
+
+    profiler = Profiler(trace=trace)
+    with profiler.phase('energysystem'):
+        energysystem = build_energysystem(number, **kwargs)
+    with profiler.phase('model'):
+        om = oim.Model(energysystem)
+    profiler.measure_model(om, nonzeros=nonzeros)
+    profiler.solve(om, solver=solver, solve_kwargs={'tee': False})
+    with profiler.phase('results'):
+        results = convert_keys_to_strings(om.results())
+    with profiler.phase('postprocessing'):
+        summary = kpi.summary(results, energysystem)
+
+    return results, profiler.report(
+        report, example=number, kpis=summary.to_dict()
+    )
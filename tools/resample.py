@@ -0,0 +1,127 @@
+"""
+General description
+-------------------
+Resampling of the input profiles to other time resolutions.
+
+The input_data.csv files of the examples hold one row per hour. For 15 or
+5 minute dispatch the profiles 'demand_el', 'wind' and 'pv' are resampled
+with array operations on all columns at once:
+
+* 'mean' conserves energy: the cumulated energy of every profile is
+  interpolated at the bounds of the new timesteps and differenced, i.e.
+  every new timestep gets the mean power of the old timesteps it covers.
+  For finer timesteps this holds the hourly value, for coarser ones it is
+  the block mean; any ratio of the step lengths works.
+* 'interpolate' interpolates linearly between the values at the starts of
+  the old timesteps, for smoother finer profiles; the energy is kept only
+  approximately.
+
+The model accounts for the timestep length itself: solph derives the
+time increment from the frequency of the time index, which weights the
+storage balances and the variable costs. The energies of tools/kpi.py are
+weighted with the timestep length as well.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+import opinmod as oim
+
+
+def step_hours(freq):
+    """Length of a timestep of a frequency string, e.g. '15min', in
+    hours."""
+    return pd.tseries.frequencies.to_offset(freq).nanos / 3.6e12
+
+
+def resample_profiles(profiles, freq, source_freq='H', periods=None,
+                      method='mean'):
+    """
+    Resample profiles given in steps of `source_freq` to steps of `freq`.
+
+    Parameters
+    ----------
+    profiles : pandas.DataFrame
+        One row per timestep of `source_freq`; the index is ignored.
+    freq : str
+        Frequency of the resampled profiles, e.g. '15min' or '5min'.
+    periods : int
+        Number of resampled timesteps; defaults to the horizon of the
+        profiles. Longer horizons are not extended.
+    method : str
+        'mean' or 'interpolate', see the module description.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Profiles with a new RangeIndex.
+    """
+    ratio = step_hours(source_freq) / step_hours(freq)
+    n = len(profiles)
+    if periods is None:
+        periods = int(np.floor(n * ratio + 1e-9))
+    if periods > n * ratio + 1e-9:
+        raise ValueError(
+            'The profiles cover {0} timesteps of {1}, {2} were '
+            'requested.'.format(int(n * ratio), freq, periods)
+        )
+    if ratio == 1:
+        return profiles.iloc[:periods].reset_index(drop=True)
+
+    values = profiles.to_numpy(dtype=float)
+    if method == 'mean':
+        # cumulated energy in old timesteps at the bounds of the new ones
+        cumulated = np.vstack(
+            (np.zeros(values.shape[1]), np.cumsum(values, axis=0))
+        )
+        bounds = np.arange(periods + 1) / ratio
+        old = np.arange(n + 1)
+        data = np.column_stack([
+            np.diff(np.interp(bounds, old, c)) * ratio for c in cumulated.T
+        ])
+    elif method == 'interpolate':
+        starts = np.arange(periods) / ratio
+        old = np.arange(n)
+        data = np.column_stack([
+            np.interp(starts, old, v) for v in values.T
+        ])
+    else:
+        raise ValueError('Unknown resampling method {0}.'.format(method))
+
+    return pd.DataFrame(data, columns=profiles.columns)
+
+
+def benchmark(freqs=('H', '15min', '5min'), hours=168, number=4,
+              repeats=3):
+    """
+    Construction time of an example's model at several resolutions.
+
+    Every resolution covers the same horizon of `hours`; the best of
+    `repeats` constructions is taken.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Timesteps, construction time, its ratio to the first resolution
+        and the ratio of the number of timesteps.
+    """
+    from tools.examples import build_energysystem
+
+    rows = []
+    for freq in freqs:
+        periods = int(round(hours / step_hours(freq)))
+        seconds = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            oim.Model(build_energysystem(number, periods=periods, freq=freq))
+            seconds.append(time.perf_counter() - start)
+        rows.append({
+            'freq': freq, 'periods': periods, 'construction': min(seconds)
+        })
+
+    df = pd.DataFrame(rows)
+    df['time_ratio'] = df['construction'] / df['construction'].iloc[0]
+    df['periods_ratio'] = df['periods'] / df['periods'].iloc[0]
+    return df
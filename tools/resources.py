@@ -0,0 +1,354 @@
+"""
+General description
+-------------------
+Thread and process budget for many solves on one node.
+
+Sweeps such as tools/pareto.py or tools/checkpoint.py run one solve per
+worker process. If every solver also starts threads, the node is
+oversubscribed. :func:`plan` splits the cores and memory of a node into
+
+* a number of worker processes,
+* solver threads per process,
+* a memory cap per process.
+
+:func:`run_jobs` runs jobs in a process pool with this budget, and
+:func:`executor` returns such a pool for the sweeps of tools/pareto.py,
+tools/checkpoint.py and tools/decomposition.py. Each worker is
+initialized once by :func:`initialize_worker`: the solver threads are
+stored in the environment variable `OPINMOD_SOLVER_THREADS`, the threads
+of numerical libraries are set to one, and, if the caller gave a memory
+budget, the address space of the worker is capped. Within a job,
+:func:`solve` solves a model like `om.solve` with the thread budget of
+its worker and deterministic thread settings and seeds, see
+:data:`THREAD_OPTIONS`. A report gives the achieved throughput in
+solves per hour, and :func:`compare_splits` measures it for several
+splits of the cores::
+
+    compare_splits(solve_example, {n: {'periods': 168} for n in range(32)})
+
+Memory is capped only if `memory` or `job_memory` is passed to
+:func:`plan`; by default the sweeps run uncapped. The cap limits the
+virtual address space (`RLIMIT_AS`) of every process, not its resident
+memory, so a job that maps more fails instead of driving the node into
+swap. Address space that is reserved but never used, e.g. thread stacks,
+counts against the cap, so an uncapped default avoids failing jobs that
+never come close to the memory of the node. Every solver process
+started by a worker inherits the full cap of its own, so a worker and its
+solver may together hold up to twice the cap. Give `job_memory` as the
+combined peak of a job, e.g. 'peak_rss' plus 'children_peak_rss' of
+tools/profiling.py. Memory caps rely on `resource.setrlimit`, which is
+available on Unix.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+import resource
+import time
+
+import pandas as pd
+from pyomo import environ as po
+
+from tools.examples import build_model
+
+
+THREADS_VARIABLE = 'OPINMOD_SOLVER_THREADS'
+
+# thread pools of numerical libraries in the workers
+LIBRARY_VARIABLES = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                     'MKL_NUM_THREADS')
+
+# share of the node memory kept free for the main process and the system
+MEMORY_RESERVE = 0.1
+
+# deterministic command line options per solver for threads and a seed;
+# cbc runs its parallel branch and bound in deterministic mode if 100 is
+# added to the number of threads
+THREAD_OPTIONS = {
+    'cbc': lambda threads, seed: {
+        'threads': threads + 100 if threads > 1 else threads,
+        'randomCbcSeed': seed + 1,
+        'randomSeed': seed + 1
+    },
+    'glpk': lambda threads, seed: {},
+    'gurobi': lambda threads, seed: {'Threads': threads, 'Seed': seed},
+    'cplex': lambda threads, seed: {
+        'threads': threads, 'parallel': 1, 'randomseed': seed
+    }
+}
+
+
+def node_resources():
+    """
+    Cores available to this process and physical memory of the node.
+
+    Returns
+    -------
+    dict
+        'cores' and 'memory' [bytes]; the memory is None if unknown.
+    """
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    try:
+        memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        memory = None
+    return {'cores': cores, 'memory': memory}
+
+
+def plan(jobs, cores=None, memory=None, job_memory=None, threads=None,
+         max_threads=4, processes=None):
+    """
+    Split the cores and memory of a node into processes and threads.
+
+    Independent solves scale better than the threads of one solve, so as
+    many processes as jobs are used unless `processes` is given; the
+    remaining cores go to the solver threads, at most `max_threads` per
+    solve.
+
+    Parameters
+    ----------
+    jobs : int
+        Number of jobs.
+    cores : int
+        Cores to use; those of the node if None.
+    memory : int
+        Memory [bytes] to split among the processes as cap of their
+        address space; no cap if neither `memory` nor `job_memory` is
+        given.
+    job_memory : int
+        Peak memory of one job [bytes], e.g. measured with
+        tools/profiling.py; limits the number of processes to those
+        fitting into `memory` or the memory of the node, which is then
+        split among them as cap.
+    threads : int
+        Fixed number of solver threads per process.
+    processes : int
+        Fixed number of processes.
+
+    Returns
+    -------
+    dict
+        'processes', 'threads' and 'memory', the cap of the address space
+        per process [bytes] or None if uncapped; solver processes get a
+        cap of their own.
+    """
+    node = node_resources()
+    cores = cores or node['cores']
+    capped = bool(memory or job_memory)
+    memory = memory or node['memory']
+
+    if processes is not None:
+        processes = max(1, processes)
+    else:
+        processes = max(1, min(jobs, cores // (threads or 1)))
+    if job_memory and memory:
+        processes = max(1, min(
+            processes, int(memory * (1 - MEMORY_RESERVE) // job_memory)
+        ))
+    if threads is None:
+        threads = max(1, min(max_threads, cores // processes))
+
+    cap = None
+    if capped and memory:
+        cap = int(memory * (1 - MEMORY_RESERVE) // processes)
+    return {'processes': processes, 'threads': threads, 'memory': cap}
+
+
+def solver_options(solver='cbc', threads=None, seed=0,
+                   cmdline_options=None):
+    """
+    Command line options with the thread settings of a solver.
+
+    The number of threads defaults to the budget of the worker process
+    set by :func:`run_jobs`, else one. Options given in `cmdline_options`
+    take precedence.
+    """
+    if threads is None:
+        threads = int(os.environ.get(THREADS_VARIABLE, 1))
+    options = THREAD_OPTIONS.get(solver, lambda threads, seed: {})(
+        threads, seed
+    )
+    options.update(cmdline_options or {})
+    return options
+
+
+def solve(om, solver='cbc', threads=None, seed=0, cmdline_options=None,
+          **kwargs):
+    """`om.solve` with the thread settings of :func:`solver_options`."""
+    return om.solve(
+        solver=solver,
+        cmdline_options=solver_options(
+            solver, threads=threads, seed=seed,
+            cmdline_options=cmdline_options
+        ),
+        **kwargs
+    )
+
+
+def initialize_worker(threads, memory):
+    """
+    Set the thread budget and the memory cap of a worker process, e.g. as
+    initializer of a process pool.
+
+    Parameters
+    ----------
+    threads : int
+        Solver threads used by :func:`solve` in this process.
+    memory : int
+        Cap of the address space [bytes]; no cap if None.
+    """
+    os.environ[THREADS_VARIABLE] = str(threads)
+    for variable in LIBRARY_VARIABLES:
+        os.environ[variable] = '1'
+    if memory:
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            memory = min(memory, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (memory, hard))
+
+
+def executor(budget):
+    """
+    Process pool with the workers initialized to a budget.
+
+    Parameters
+    ----------
+    budget : dict
+        See :func:`plan`.
+
+    Returns
+    -------
+    concurrent.futures.ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(
+        max_workers=budget['processes'], initializer=initialize_worker,
+        initargs=(budget['threads'], budget['memory'])
+    )
+
+
+def _timed(function, job):
+    start = time.perf_counter()
+    result = function(job)
+    return result, time.perf_counter() - start
+
+
+def run_jobs(function, jobs, budget=None, **kwargs):
+    """
+    Run jobs in a process pool within a thread and memory budget.
+
+    Parameters
+    ----------
+    function : callable
+        Called with one job in a worker process; must be picklable. Solve
+        with :func:`solve` to use the thread budget.
+    jobs : dict
+        Jobs keyed by a unique name.
+    budget : dict
+        See :func:`plan`; planned for the jobs with `kwargs` if None.
+
+    Returns
+    -------
+    tuple
+        (results, report); results by job name of all jobs that did not
+        fail, the report holds the budget, the number of jobs and
+        failures with their errors, the wall-clock time and the
+        throughput in solves per hour.
+    """
+    budget = budget or plan(len(jobs), **kwargs)
+    results, seconds, errors = {}, [], {}
+
+    start = time.perf_counter()
+    with executor(budget) as pool:
+        futures = {
+            pool.submit(_timed, function, job): name
+            for name, job in jobs.items()
+        }
+        for f in as_completed(futures):
+            try:
+                results[futures[f]], duration = f.result()
+                seconds.append(duration)
+            except Exception as e:
+                errors[futures[f]] = repr(e)
+    wall = time.perf_counter() - start
+
+    report = dict(budget)
+    report.update({
+        'jobs': len(jobs),
+        'failed': len(errors),
+        'errors': errors,
+        'seconds': wall,
+        'job_seconds_mean': sum(seconds) / len(seconds) if seconds else None,
+        'solves_per_hour': 3600 * len(results) / wall if wall else None
+    })
+    return results, report
+
+
+def solve_example(job):
+    """
+    Build and solve an example within the budget of the worker, e.g. as
+    job function for :func:`compare_splits`.
+
+    Parameters
+    ----------
+    job : dict
+        Passed to `tools.examples.build_model`, e.g. {'number': 4,
+        'periods': 168}; optional 'solver', 'seed' and 'cmdline_options'
+        are used for the solve.
+
+    Returns
+    -------
+    float
+        The objective value.
+    """
+    job = dict(job)
+    solveKwargs = {
+        k: job.pop(k) for k in ('solver', 'seed', 'cmdline_options')
+        if k in job
+    }
+    om = build_model(**job)
+    solve(om, **solveKwargs)
+    return po.value(om.objective)
+
+
+def compare_splits(function, jobs, splits=None, cores=None, **kwargs):
+    """
+    Throughput of several splits of the cores into processes and threads.
+
+    Parameters
+    ----------
+    function, jobs :
+        See :func:`run_jobs`.
+    splits : iterable
+        (processes, threads); by default every power of two of threads up
+        to the cores with as many processes as fit.
+    kwargs :
+        Passed to :func:`plan`, e.g. `memory` and `job_memory`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per split, the best throughput first.
+    """
+    cores = cores or node_resources()['cores']
+    if splits is None:
+        splits = []
+        threads = 1
+        while threads <= cores:
+            splits.append((cores // threads, threads))
+            threads *= 2
+
+    rows = []
+    for processes, threads in splits:
+        budget = plan(
+            min(len(jobs), processes), cores=processes * threads,
+            threads=threads, **kwargs
+        )
+        _, report = run_jobs(function, jobs, budget=budget)
+        report.pop('errors')
+        rows.append(report)
+
+    return pd.DataFrame(rows).sort_values(
+        'solves_per_hour', ascending=False
+    ).reset_index(drop=True)
@@ -0,0 +1,193 @@
+"""
+General description
+-------------------
+Solver-free screening of weather years for inertia adequacy.
+
+Before any model is built, the hours in which a fleet can not meet the
+inertia requirements even with all units committed are flagged from the
+fleet register and the 'demand_el', 'wind' and 'pv' profiles of
+input_data.csv-style weather data. Per hour the maximum available kinetic
+energy is
+
+* synchronous: apparent_power * inertia_constant of all synchronous
+  generators and storage units,
+* synthetic wind: apparent_power * emulated inertia constant of the wind
+  turbines. For the bound every turbine runs at rated rotor speed; the
+  estimate scales it with the squared rotor speed of the hour, see
+  :func:`rotor_speed`,
+* synthetic storage: apparent_power * emulated inertia constant of the
+  storage units, reduced if the storage has to discharge to cover load
+  the other units can not supply and less than inertia_power_share of its
+  nominal power is left as headroom.
+
+The state of charge is not tracked, so the screen is an upper bound: hours
+flagged 'infeasible' are infeasible in every dispatch, hours flagged
+'tight' are worth a closer look. The rotor speed estimate is a heuristic
+and not the characteristic OpInMod uses, so it only marks hours as
+'tight', never as 'infeasible'. All quantities are computed with array
+operations over all hours at once.
+"""
+
+import numpy as np
+import pandas as pd
+
+from tools.examples import (DEMAND, EXAMPLE_UNITS, INERTIA_REQUIREMENTS,
+                            REGISTER)
+from tools.fleet import read_fleet
+from tools.inertia import kinetic_energy
+from tools.kpi import SYNCHRONOUS
+
+
+# rotor speed of the NREL 5MW turbine at cut-in relative to rated speed
+# (6.9 rpm / 12.1 rpm)
+MINIMUM_ROTOR_SPEED = 6.9 / 12.1
+
+
+def rotor_speed(power):
+    """
+    Approximate normalized rotor speed of a wind turbine at normalized
+    power.
+
+    Below rated power the turbine is assumed to run at optimal tip speed
+    ratio, where the power grows with the cube of the rotor speed, between
+    the speed at cut-in and the rated speed; without feed-in the rotor
+    stands still. This is a heuristic, not OpInMod's characteristic.
+    """
+    power = np.clip(power, 0, 1)
+    speed = np.clip(np.cbrt(power), MINIMUM_ROTOR_SPEED, 1)
+    return np.where(power > 0, speed, 0.0)
+
+
+def screen(profiles, fleet=None, demand=DEMAND, tight=0.1,
+           minimum_synchronous_inertia=(
+               INERTIA_REQUIREMENTS['minimum_system_synchronous_inertia']),
+           minimum_system_inertia=(
+               INERTIA_REQUIREMENTS['minimum_system_inertia']),
+           emulated_inertia_constant=(
+               INERTIA_REQUIREMENTS['emulated_inertia_constant']),
+           frequency=50):
+    """
+    Maximum available inertia per hour and the hours at risk.
+
+    Parameters
+    ----------
+    profiles : pandas.DataFrame
+        'demand_el' and the profiles referenced by the fleet, e.g. 'wind'
+        and 'pv', one row per hour.
+    fleet : str or pandas.DataFrame
+        Fleet register, see `tools.fleet.read_fleet`; the units of
+        Example 4 if None.
+    demand : float
+        Nominal value of the load.
+    tight : float
+        Hours with less than this relative margin above a requirement are
+        flagged 'tight'.
+    minimum_synchronous_inertia, minimum_system_inertia : float
+        Moments of inertia [kg m^2] of the requirements.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Available kinetic energies [Ws] with the estimated wind inertia,
+        the power deficit [W] if the load can not be covered at all, the
+        relative margins of both requirements, the margin of the system
+        requirement with the wind turbines at rated speed and the status
+        'ok', 'tight' or 'infeasible'. Only the bound and the synchronous
+        margin decide 'infeasible'.
+    """
+    if fleet is None:
+        fleet = read_fleet(REGISTER)
+        fleet = fleet[fleet['label'].isin(EXAMPLE_UNITS[4])]
+    elif not isinstance(fleet, pd.DataFrame):
+        fleet = read_fleet(fleet)
+
+    types = fleet['provision_type'].to_numpy()
+    power = np.nan_to_num(fleet['apparent_power'].to_numpy(dtype=float))
+    constant = fleet['inertia_constant'].to_numpy(dtype=float)
+    constant = np.where(np.isnan(constant), emulated_inertia_constant,
+                        constant)
+    nominal = np.nan_to_num(fleet['nominal_value'].to_numpy(dtype=float))
+    share = fleet['inertia_power_share'].to_numpy(dtype=float)
+    component = fleet['component'].to_numpy()
+    profile = fleet['profile'].to_numpy()
+
+    # feed-in of sources with profile, maximum output of all other units
+    isFixed = np.array([isinstance(p, str) for p in profile])
+    isStorage = component == 'storage'
+    feedIn = np.zeros((len(profiles), len(fleet)))
+    for n in np.nonzero(isFixed)[0]:
+        feedIn[:, n] = profiles[profile[n]].to_numpy(dtype=float)
+
+    load = profiles['demand_el'].to_numpy(dtype=float) * demand
+    supply = feedIn @ nominal + nominal[~isFixed & ~isStorage].sum()
+    discharge = np.clip(load - supply, 0, None)
+    storagePower = nominal[isStorage].sum()
+    deficit = np.clip(discharge - storagePower, 0, None)
+
+    isSync = np.isin(types, SYNCHRONOUS)
+    sync = np.full(len(profiles), (power * constant)[isSync].sum())
+
+    isWind = (types == 'synthetic_wind') & isFixed
+    wind = (
+        rotor_speed(feedIn[:, isWind])**2
+        @ (power * constant)[isWind]
+    )
+    windBound = np.full(len(profiles), (power * constant)[isWind].sum())
+
+    # discharge is shared in proportion to the nominal power; the
+    # emulated inertia shrinks once the reserved power share is used
+    isSynStorage = (types == 'synthetic_storage') & isStorage
+    storage = np.zeros(len(profiles))
+    if storagePower > 0:
+        for n in np.nonzero(isSynStorage)[0]:
+            used = discharge * nominal[n] / storagePower
+            headroom = np.clip(nominal[n] - used, 0, None)
+            reserve = (share[n] if share[n] == share[n] else 0) * nominal[n]
+            available = (
+                np.clip(headroom / reserve, 0, 1) if reserve > 0
+                else (headroom > 0).astype(float)
+            )
+            storage += power[n] * constant[n] * available
+    else:
+        storage += (power * constant)[isSynStorage].sum()
+
+    minSync = kinetic_energy(minimum_synchronous_inertia, frequency)
+    minSys = kinetic_energy(minimum_system_inertia, frequency)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        marginSync = sync / minSync - 1
+        marginSys = (sync + wind + storage) / minSys - 1
+        marginSysBound = (sync + windBound + storage) / minSys - 1
+
+    infeasible = (
+        (np.minimum(marginSync, marginSysBound) < 0) | (deficit > 0)
+    )
+    status = np.where(
+        infeasible, 'infeasible',
+        np.where(np.minimum(marginSync, marginSys) < tight, 'tight', 'ok')
+    )
+
+    return pd.DataFrame({
+        'kinetic_energy_synchronous': sync,
+        'kinetic_energy_synthetic_wind': wind,
+        'kinetic_energy_synthetic_storage': storage,
+        'power_deficit': deficit,
+        'margin_synchronous': marginSync,
+        'margin_system': marginSys,
+        'margin_system_bound': marginSysBound,
+        'status': status
+    }, index=profiles.index)
+
+
+def summary(screened):
+    """Number of hours per status and the smallest margins."""
+    counts = screened['status'].value_counts()
+    return pd.Series({
+        'hours': len(screened),
+        'infeasible': int(counts.get('infeasible', 0)),
+        'tight': int(counts.get('tight', 0)),
+        'minimum_margin_synchronous': screened['margin_synchronous'].min(),
+        'minimum_margin_system': screened['margin_system'].min(),
+        'minimum_margin_system_bound': (
+            screened['margin_system_bound'].min()
+        )
+    })
@@ -0,0 +1,138 @@
+"""
+General description
+-------------------
+Shadow prices of the inertia requirements and the electricity bus balance.
+
+After the mixed-integer problem is solved, the commitment binaries (e.g.
+`source_inertia`) are fixed at their optimal values. The remaining problem is
+a linear program which is solved once more with dual values enabled. The
+duals of the per-timestep inertia constraints and of the bus balances are
+the hourly prices of inertia and electricity for the given commitment, i.e.
+two solves instead of one re-solve per perturbed requirement.
+"""
+
+import pandas as pd
+from pyomo import environ as po
+
+
+# constraints of OpInMod's system inertia requirements, indexed by timesteps
+SYSTEM_INERTIA_CONSTRAINTS = ('system_synchronous_inertia', 'system_inertia')
+
+
+def binary_variables(om):
+    """All binary variables of a model."""
+    return [
+        v for v in om.component_data_objects(po.Var, active=True)
+        if v.is_binary()
+    ]
+
+
+def inertia_constraints(om, names=SYSTEM_INERTIA_CONSTRAINTS):
+    """
+    Constraints of the inertia requirements.
+
+    The active constraint components with the given local names, by
+    default the synchronous and total system requirements of OpInMod.
+
+    Returns
+    -------
+    dict
+        Constraint components keyed by their name.
+    """
+    return {
+        c.name: c
+        for c in om.component_objects(po.Constraint, active=True)
+        if c.local_name in names
+    }
+
+
+def _check_solved(om, binaries):
+    """Raise if the mixed-integer solve of a model gave no solution."""
+    solverResults = getattr(om, 'solver_results', None)
+    if solverResults is None:
+        raise RuntimeError('The model has not been solved.')
+    termination = str(solverResults['Solver'][0]['Termination condition'])
+    if termination not in ('optimal', 'feasible'):
+        raise RuntimeError(
+            'The mixed-integer solve terminated with {0}, so there is no '
+            'commitment to fix.'.format(termination)
+        )
+    unset = [v.name for v in binaries if v.value is None]
+    if unset:
+        raise RuntimeError(
+            'The binaries {0} have no value.'.format(
+                ', '.join(unset[:5]) + (', ...' if len(unset) > 5 else '')
+            )
+        )
+
+
+def inertia_prices(om, solver='cbc', bus_inertia='bus_inertia',
+                   solve_kwargs=None):
+    """
+    Re-solve a solved model with fixed commitment and return shadow prices.
+
+    The binaries are unfixed again afterwards, so the model can be used
+    for further mixed-integer solves.
+
+    Parameters
+    ----------
+    om : oim.Model
+        Model solved as mixed-integer problem.
+    solver : str
+    bus_inertia : str
+        Label of the inertia bus the inertia prices are stored with in the
+        results.
+
+    Returns
+    -------
+    tuple
+        The results of the linear solve, which contain the duals of the bus
+        balances as 'duals' sequence of each bus and the inertia prices as
+        sequences of the inertia bus, and a DataFrame of all prices.
+
+    Raises
+    ------
+    RuntimeError
+        If the mixed-integer solve terminated without solution or left
+        binaries without value.
+    """
+    fixed = [v for v in binary_variables(om) if not v.fixed]
+    _check_solved(om, fixed)
+    for v in fixed:
+        v.fix(round(v.value))
+
+    if not isinstance(getattr(om, 'dual', None), po.Suffix):
+        om.receive_duals()
+    try:
+        om.solve(
+            solver=solver,
+            solve_kwargs=dict({'tee': False}, **(solve_kwargs or {}))
+        )
+        results = om.results()
+    finally:
+        for v in fixed:
+            v.unfix()
+
+    constraints = inertia_constraints(om)
+    prices = pd.DataFrame(index=om.es.timeindex)
+    for name, c in constraints.items():
+        prices[name] = [om.dual.get(c[t]) for t in om.TIMESTEPS]
+
+    for (bus, _), entry in results.items():
+        if 'duals' in entry['sequences']:
+            prices['balance_' + str(bus.label)] = entry['sequences']['duals']
+
+    busInertia = [n for n in om.es.nodes if str(n.label) == bus_inertia]
+    if busInertia:
+        key = (busInertia[0], None)
+        inertiaPrices = prices[list(constraints)]
+        if key in results:
+            for c in inertiaPrices.columns:
+                results[key]['sequences'][c] = inertiaPrices[c]
+        else:
+            results[key] = {
+                'scalars': pd.Series(dtype=float),
+                'sequences': inertiaPrices
+            }
+
+    return results, prices
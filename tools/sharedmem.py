@@ -0,0 +1,215 @@
+"""
+General description
+-------------------
+Input series shared by worker processes without copies.
+
+The profiles of a scenario study, e.g. 'demand_el', 'wind' and 'pv' of
+several years at 15 minute resolution and any scenario samples, are
+written once into one shared memory block, or into a memory-mapped file
+that any process on the node can open. Only a small :class:`Handle` with
+the name and the layout of the arrays is pickled to the workers, which
+map the block and get read-only NumPy views on it::
+
+    with SharedArrays({'profiles': profiles}) as shared:
+        run_points(function, {k: (shared.handle, k) for k in keys}, ...)
+
+    # in the worker
+    profiles = attach_frame(handle, 'profiles')
+
+Every worker maps a block once and keeps the mapping for further tasks.
+Only the parts used for one model, e.g. the profiles of a window, are
+copied when the nodes are created. tools/decomposition.py shares the
+profiles of its blocks this way.
+"""
+
+from multiprocessing import shared_memory
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+# offsets of the arrays in the block are aligned to cache lines
+ALIGNMENT = 64
+
+# mappings of the current process by block name and generation
+_ATTACHED = {}
+
+
+class Handle:
+    """
+    Picklable description of a block of shared arrays.
+
+    Attributes
+    ----------
+    name : str
+        Name of the shared memory block or path of the mapped file.
+    size : int
+        Size of the block in bytes.
+    layout : dict
+        (offset, shape, dtype) by array name.
+    columns : dict
+        Column names of the arrays created from DataFrames.
+    is_file : bool
+    generation : str
+        Unique id of the block; a file or block name written again gets
+        a new one, so stale mappings are not reused.
+    """
+
+    def __init__(self, name, size, layout, columns, is_file,
+                 generation=None):
+        self.name = name
+        self.size = size
+        self.layout = layout
+        self.columns = columns
+        self.is_file = is_file
+        self.generation = generation or uuid.uuid4().hex
+
+    @property
+    def key(self):
+        return (self.name, self.generation)
+
+
+def _layout(arrays):
+    layout = {}
+    offset = 0
+    for name, a in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = (offset, a.shape, a.dtype.str)
+        offset += a.nbytes
+    return layout, max(offset, 1)
+
+
+def _views(buffer, layout, readonly=True):
+    views = {}
+    for name, (offset, shape, dtype) in layout.items():
+        view = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        if readonly:
+            view.flags.writeable = False
+        views[name] = view
+    return views
+
+
+def _open_block(name):
+    """Attach to a shared memory block without tracking it; before Python
+    3.13 the block is tracked by the resource tracker the worker shares
+    with the process that created it, which is harmless."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedArrays:
+    """
+    Owner of a block of arrays shared with worker processes.
+
+    Parameters
+    ----------
+    arrays : dict
+        numpy.ndarray or pandas.DataFrame by name; DataFrames are stored
+        with their values as float and their column names.
+    path : str
+        Write the arrays into a memory-mapped file at this path instead of
+        a shared memory block, e.g. on a node-local disk for data larger
+        than /dev/shm. The file is kept after :meth:`close`.
+
+    The block is released by :meth:`close` or at the end of a with
+    statement.
+    """
+
+    def __init__(self, arrays, path=None):
+        columns = {}
+        values = {}
+        for name, a in arrays.items():
+            if isinstance(a, pd.DataFrame):
+                columns[name] = [str(c) for c in a.columns]
+                a = a.to_numpy(dtype=float)
+            values[name] = np.ascontiguousarray(a)
+        layout, size = _layout(values)
+
+        if path is None:
+            self._block = shared_memory.SharedMemory(create=True, size=size)
+            buffer = self._block.buf
+            name = self._block.name
+        else:
+            self._block = np.memmap(path, dtype=np.uint8, mode='w+',
+                                    shape=(size,))
+            buffer = self._block
+            name = os.path.abspath(path)
+
+        for key, view in _views(buffer, layout, readonly=False).items():
+            view[...] = values[key]
+        if path is not None:
+            self._block.flush()
+
+        self.handle = Handle(name, size, layout, columns, path is not None)
+        self.arrays = _views(buffer, layout)
+
+    def close(self):
+        """Release the block; the arrays must not be used afterwards."""
+        if self._block is None:
+            return
+        self.arrays = {}
+        if not self.handle.is_file:
+            self._block.unlink()
+            try:
+                self._block.close()
+            except BufferError:
+                # views still referenced elsewhere; the memory is freed
+                # with the last of them
+                pass
+        self._block = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def attach(handle):
+    """
+    Read-only views on all arrays of a block.
+
+    The block is mapped once per process and generation; further calls
+    return the same views.
+
+    Returns
+    -------
+    dict
+        numpy.ndarray by name.
+    """
+    if handle.key not in _ATTACHED:
+        if handle.is_file:
+            block = np.memmap(handle.name, dtype=np.uint8, mode='r',
+                              shape=(handle.size,))
+            buffer = block
+        else:
+            block = _open_block(handle.name)
+            buffer = block.buf
+        _ATTACHED[handle.key] = (block, _views(buffer, handle.layout))
+    return _ATTACHED[handle.key][1]
+
+
+def attach_frame(handle, name, start=None, stop=None):
+    """
+    DataFrame view on the rows start:stop of an array stored from a
+    DataFrame, e.g. the profiles of one window, without copy.
+    """
+    values = attach(handle)[name][start:stop]
+    return pd.DataFrame(values, columns=handle.columns[name], copy=False)
+
+
+def detach(handle=None):
+    """Drop the mappings of this process, of all blocks if `handle` is
+    None."""
+    keys = list(_ATTACHED) if handle is None else [handle.key]
+    for key in keys:
+        block, _ = _ATTACHED.pop(key, (None, None))
+        if isinstance(block, shared_memory.SharedMemory):
+            try:
+                block.close()
+            except BufferError:
+                pass
@@ -0,0 +1,224 @@
+"""
+General description
+-------------------
+Columnar on-disk store for the results of many runs.
+
+The sequences of a run are written to an Arrow dataset that is partitioned
+by scenario, component (source and target label of the result key) and
+variable, e.g.::
+
+    <root>/sequences/scenario=ex4/source=transformer_oil/target=bus_inertia/
+        variable=source_inertia/part.arrow
+
+Every file holds the columns 'timestamp' and 'value' in the uncompressed
+Arrow IPC format. Files are read through memory maps, so selecting a few
+components and variables of thousands of runs only touches these files and
+the values are not copied. The scalars of a run are stored separately under
+`<root>/scalars`.
+
+Installation requirements
+-------------------------
+The pyarrow library has to be installed.
+"""
+
+import os
+import shutil
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+
+PARTITIONS = ('scenario', 'source', 'target', 'variable')
+
+SCALARS_SCHEMA = pa.schema([
+    ('source', pa.string()),
+    ('target', pa.string()),
+    ('variable', pa.string()),
+    ('value', pa.float64())
+])
+
+
+def _partition(**keys):
+    return os.path.join(
+        *['{0}={1}'.format(k, quote(str(keys[k]), safe=''))
+          for k in PARTITIONS if k in keys]
+    )
+
+
+def _write(table, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def write_results(results, root, scenario, variables=None):
+    """
+    Write the results of one run.
+
+    Parameters
+    ----------
+    results : dict
+        Results as returned by `om.results()`, with node or string keys.
+    root : str
+        Root directory of the store.
+    scenario : str
+        Name of the run; an existing run of the same name is removed
+        before writing.
+    variables : iterable
+        Sequences to write, e.g. ('flow', 'source_inertia'); all if None.
+    """
+    for kind in ('sequences', 'scalars'):
+        shutil.rmtree(
+            os.path.join(root, kind, _partition(scenario=scenario)),
+            ignore_errors=True
+        )
+
+    scalars = []
+    for key, entry in results.items():
+        source, target = (str(k) for k in key)
+        sequences = entry['sequences']
+        timestamp = pa.array(sequences.index.values, pa.timestamp('ns'))
+        for variable in sequences.columns:
+            if variables is not None and variable not in variables:
+                continue
+            table = pa.table({
+                'timestamp': timestamp,
+                'value': pa.array(
+                    sequences[variable].to_numpy(dtype='float64')
+                )
+            })
+            _write(table, os.path.join(
+                root, 'sequences',
+                _partition(
+                    scenario=scenario, source=source, target=target,
+                    variable=variable
+                ),
+                'part.arrow'
+            ))
+        for variable, value in entry.get('scalars', {}).items():
+            scalars.append((source, target, variable, float(value)))
+
+    scalars = pd.DataFrame(scalars, columns=SCALARS_SCHEMA.names)
+    _write(
+        pa.Table.from_pandas(
+            scalars, schema=SCALARS_SCHEMA, preserve_index=False
+        ),
+        os.path.join(
+            root, 'scalars', _partition(scenario=scenario), 'part.arrow'
+        )
+    )
+
+
+def dataset(root, kind='sequences'):
+    """Open the memory-mapped Arrow dataset of a store."""
+    fields = PARTITIONS if kind == 'sequences' else PARTITIONS[:1]
+    return ds.dataset(
+        os.path.join(root, kind),
+        format='ipc',
+        partitioning=ds.partitioning(
+            pa.schema([(f, pa.string()) for f in fields]), flavor='hive'
+        ),
+        filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
+
+
+def read_table(root, scenario=None, source=None, target=None,
+               variable=None, kind='sequences'):
+    """
+    Read the selected part of a store as Arrow table.
+
+    Every selection argument is a single value, a list of values or None
+    for no selection.
+    """
+    expression = None
+    selection = {
+        'scenario': scenario, 'source': source, 'target': target,
+        'variable': variable
+    }
+    for name, value in selection.items():
+        if value is None or (kind == 'scalars' and name != 'scenario'):
+            continue
+        if isinstance(value, (list, tuple, set)):
+            e = ds.field(name).isin(list(value))
+        else:
+            e = ds.field(name) == value
+        expression = e if expression is None else expression & e
+
+    return dataset(root, kind).to_table(filter=expression)
+
+
+def read_sequences(root, scenario=None, source=None, target=None,
+                   variable=None):
+    """
+    Read the selected sequences as long DataFrame.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns timestamp, value, scenario, source, target and variable.
+    """
+    return read_table(
+        root, scenario=scenario, source=source, target=target,
+        variable=variable
+    ).to_pandas()
+
+
+def read_sequence(root, scenario, source, target, variable):
+    """
+    Read one sequence as a read-only numpy view of the memory-mapped file.
+
+    Returns
+    -------
+    pandas.Series
+        The values indexed by timestamp; the values are not copied.
+    """
+    path = os.path.join(
+        root, 'sequences',
+        _partition(
+            scenario=scenario, source=source, target=target,
+            variable=variable
+        ),
+        'part.arrow'
+    )
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    values = table.column('value').chunk(0).to_numpy(zero_copy_only=True)
+
+    return pd.Series(
+        values,
+        index=pd.DatetimeIndex(table.column('timestamp').to_numpy()),
+        name=variable
+    )
+
+
+def read_results(root, scenario, variable=None):
+    """
+    Read one run as result dict with string keys.
+
+    The dict has the structure of `convert_keys_to_strings(om.results())`,
+    so the tools working on results can be used on stored runs.
+    """
+    df = read_sequences(root, scenario=scenario, variable=variable)
+    scalars = read_table(root, scenario=scenario, kind='scalars').to_pandas()
+
+    results = {}
+    for (source, target), group in df.groupby(['source', 'target']):
+        sequences = group.pivot(
+            index='timestamp', columns='variable', values='value'
+        )
+        sequences.columns.name = None
+        sequences.index.name = None
+        results[(source, target)] = {
+            'sequences': sequences,
+            'scalars': pd.Series(dtype=float)
+        }
+    for (source, target), group in scalars.groupby(['source', 'target']):
+        entry = results.setdefault(
+            (source, target), {'sequences': pd.DataFrame()}
+        )
+        entry['scalars'] = group.set_index('variable')['value']
+
+    return results
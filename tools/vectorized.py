@@ -0,0 +1,205 @@
+"""
+General description
+-------------------
+Array based construction of inertia requirement constraints.
+
+The coefficients of an inertia requirement, the kinetic energy
+apparent_power * inertia_constant of the selected units in every
+timestep, are stored in compressed sparse row form with one row per
+timestep. Only the columns of the selected units are computed. Each row
+is handed to pyomo as a `LinearExpression` built directly from the
+coefficient and variable lists, so no expression tree is created term by
+term. :func:`add_requirement` builds the per-area requirements of
+tools/multiarea.py this way; :func:`benchmark` compares it with the term
+by term construction.
+
+The inertia constraints of the single units and the system requirements
+are built by OpInMod inside `oim.Model` and stay as OpInMod built them.
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from pyomo import environ as po
+from pyomo.core.expr.numeric_expr import LinearExpression
+
+from tools.inertia import SYNCHRONOUS, SYNTHETIC, InertiaTerms, kinetic_energy
+
+
+class RowMatrix:
+    """
+    Coefficients of one constraint per timestep in compressed sparse row
+    form.
+
+    Row n holds the coefficients data[indptr[n]:indptr[n + 1]] of the
+    commitment variables of the keys indices[indptr[n]:indptr[n + 1]] in
+    the n-th timestep.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Coefficients of shape (timesteps, columns).
+    columns : numpy.ndarray
+        Key of every column; all keys in order if None.
+    """
+
+    def __init__(self, values, columns=None):
+        rows, cols = np.nonzero(values)
+        self.data = values[rows, cols]
+        self.indices = cols if columns is None else np.asarray(columns)[cols]
+        self.indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(rows, minlength=values.shape[0])))
+        )
+
+    def row(self, n):
+        lo, hi = self.indptr[n], self.indptr[n + 1]
+        return self.data[lo:hi], self.indices[lo:hi]
+
+
+def requirement_matrix(terms, provision_types, nodes=None):
+    """Sparse row matrix of the kinetic energy of the units with the given
+    provision types and nodes."""
+    columns = np.nonzero(terms.mask(provision_types, nodes=nodes))[0]
+    energy = terms.apparent_power[columns] * terms.inertia_constant[columns]
+    return RowMatrix(energy.T, columns)
+
+
+def add_requirement(om, block, name, terms, matrix, energy, index=None):
+    """
+    Add the constraint matrix * commitment >= energy to a block.
+
+    Parameters
+    ----------
+    block : pyomo.Block
+    name : str
+        Name of the constraint in the block.
+    terms : InertiaTerms
+    matrix : RowMatrix
+    energy : float or numpy.ndarray
+        Minimum kinetic energy [Ws], scalar or per timestep.
+    index : pyomo.Set
+        Additional first index of the constraint, e.g. areas; `matrix`
+        and `energy` are then dicts by index.
+    """
+    keys = terms.keys
+    commitment = terms.commitment
+
+    def _row(m, e, t):
+        n = terms.position(t)
+        coefs, cols = m.row(n)
+        required = e if np.isscalar(e) else e[n]
+        if not len(cols):
+            if required > 0:
+                raise ValueError(
+                    'No units provide the inertia required by {0} in '
+                    'timestep {1}.'.format(name, t)
+                )
+            return po.Constraint.Skip
+        expr = LinearExpression(
+            constant=0,
+            linear_coefs=coefs.tolist(),
+            linear_vars=[
+                commitment[keys[c][0], keys[c][1], t] for c in cols
+            ]
+        )
+        return (required, expr, None)
+
+    if index is None:
+        constraint = po.Constraint(
+            om.TIMESTEPS, rule=lambda b, t: _row(matrix, energy, t)
+        )
+    else:
+        constraint = po.Constraint(
+            index, om.TIMESTEPS,
+            rule=lambda b, a, t: _row(matrix[a], energy[a], t)
+        )
+    block.add_component(name, constraint)
+
+    return constraint
+
+
+def _add_termwise(om, block, name, terms, mask, energy):
+    """The requirement of :func:`add_requirement` built term by term, as
+    pyomo rules usually are; the reference of :func:`benchmark`."""
+    def _rule(b, t):
+        coefs = terms.energy(t)
+        expr = sum(
+            coefs[k] * terms.commitment[i, o, t]
+            for k, (i, o) in enumerate(terms.keys)
+            if mask[k] and coefs[k] != 0
+        )
+        return expr >= energy
+
+    constraint = po.Constraint(om.TIMESTEPS, rule=_rule)
+    block.add_component(name, constraint)
+
+    return constraint
+
+
+def benchmark(numbers=(1, 4), periods=(168, 720, 8760), frequency=50):
+    """
+    Compare the term by term and the array based construction of the
+    synchronous and total system requirement rows.
+
+    The rows are added to a block of the model of every example and
+    horizon, once per construction; the profiles are repeated to cover
+    long horizons.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Construction time [s] and peak of the memory allocated by python
+        during the construction [MB] per example, horizon and
+        construction.
+    """
+    # imported here, tools.examples imports the fleet and OpInMod
+    from tools.examples import build_model, read_profiles
+
+    rows = []
+    for number in numbers:
+        for p in periods:
+            om = build_model(
+                number, profiles=read_profiles(number, periods=p), periods=p
+            )
+            terms = InertiaTerms(om)
+            es = om.es
+            requirements = {
+                'synchronous': (
+                    SYNCHRONOUS, es.minimum_system_synchronous_inertia
+                ),
+                'total': (SYNCHRONOUS + SYNTHETIC, es.minimum_system_inertia)
+            }
+            for construction in ('termwise', 'arrays'):
+                block = po.Block()
+                om.add_component('Benchmark', block)
+                tracemalloc.start()
+                start = time.perf_counter()
+                for name, (types, moment) in requirements.items():
+                    energy = kinetic_energy(moment, frequency)
+                    if construction == 'termwise':
+                        _add_termwise(
+                            om, block, name, terms, terms.mask(types), energy
+                        )
+                    else:
+                        add_requirement(
+                            om, block, name, terms,
+                            requirement_matrix(terms, types), energy
+                        )
+                seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                rows.append({
+                    'example': number,
+                    'periods': p,
+                    'construction': construction,
+                    'build': seconds,
+                    'memory': peak / 2**20,
+                    'rows': sum(
+                        len(getattr(block, n)) for n in requirements
+                    )
+                })
+                om.del_component(block)
+
+    return pd.DataFrame(rows)